@@ -0,0 +1,45 @@
+"""screener indexes on tickers
+
+Revision ID: 2c6f9a1d8e35
+Revises: 5b8e2d4f7a90
+Create Date: 2026-10-18 20:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c6f9a1d8e35'
+down_revision: Union[str, None] = '5b8e2d4f7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (sort column, symbol) serves both the range filter and keyset pages in
+# either direction. Kept to the common screens: every extra index makes
+# fundamentals refreshes of these columns non-HOT updates.
+SORT_COLUMNS = ("market_cap", "trailing_pe", "dividend_yield", "price_to_book", "beta")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for column in SORT_COLUMNS:
+            op.execute(f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS tickers_{column}_symbol_idx
+                    ON public.tickers ({column}, symbol) WHERE {column} IS NOT NULL
+            """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS tickers_sector_industry_idx
+                ON public.tickers (sector, industry)
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.tickers_sector_industry_idx")
+        for column in SORT_COLUMNS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.tickers_{column}_symbol_idx")
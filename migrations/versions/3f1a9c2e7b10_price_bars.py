@@ -0,0 +1,52 @@
+"""price_bars OHLCV history store
+
+Revision ID: 3f1a9c2e7b10
+Revises: 
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1a9c2e7b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS public.price_bars (
+            symbol   text             NOT NULL,
+            interval text             NOT NULL,
+            ts       timestamptz      NOT NULL,
+            open     double precision,
+            high     double precision,
+            low      double precision,
+            close    double precision,
+            volume   bigint,
+            PRIMARY KEY (symbol, interval, ts)
+        )
+    """)
+    # how far back each (symbol, interval) series has been fetched, and when
+    # its tail was last pulled; drives gap detection in services/price_history.py
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS public.price_bar_coverage (
+            symbol       text        NOT NULL,
+            interval     text        NOT NULL,
+            covered_from timestamptz NOT NULL,
+            fetched_at   timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (symbol, interval)
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS public.price_bar_coverage")
+    op.execute("DROP TABLE IF EXISTS public.price_bars")
@@ -0,0 +1,38 @@
+"""covering index for watchlist sparklines
+
+Revision ID: 5b8e2d4f7a90
+Revises: a9d3f6b2c1e7
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2d4f7a90'
+down_revision: Union[str, None] = 'a9d3f6b2c1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the watchlist overview reads (symbol, interval, ts) ranges and only
+    # needs close: INCLUDE makes that an index-only scan. Bars are appended
+    # day by day across symbols, so through the primary key each bar is a
+    # heap page of its own: 185k buffers for a year of a 500-symbol
+    # watchlist, 2.5k with this index (PostgreSQL 16)
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS price_bars_sparkline_idx
+                ON public.price_bars (symbol, interval, ts) INCLUDE (close)
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.price_bars_sparkline_idx")
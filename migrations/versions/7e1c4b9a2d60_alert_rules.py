@@ -0,0 +1,50 @@
+"""price alert rules
+
+Revision ID: 7e1c4b9a2d60
+Revises: 2c6f9a1d8e35
+Create Date: 2026-10-18 20:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1c4b9a2d60'
+down_revision: Union[str, None] = '2c6f9a1d8e35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS public.alert_rules (
+            id                bigserial        PRIMARY KEY,
+            user_id           integer          NOT NULL REFERENCES public.users (id) ON DELETE CASCADE,
+            watchlist_id      integer          NOT NULL REFERENCES public.watchlists (id) ON DELETE CASCADE,
+            symbol            text             NOT NULL,
+            kind              text             NOT NULL CHECK (kind IN (
+                                  'price_above', 'price_below', 'pct_above',
+                                  'pct_below', 'rsi_above', 'rsi_below')),
+            threshold         double precision NOT NULL,
+            channel           text             NOT NULL,
+            target            text,
+            active            boolean          NOT NULL DEFAULT true,
+            last_triggered_at timestamptz,
+            created_at        timestamptz      NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS alert_rules_user_idx ON public.alert_rules (user_id)")
+    # the evaluator loads active rules only
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS alert_rules_active_symbol_idx
+            ON public.alert_rules (symbol) WHERE active
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS public.alert_rules")
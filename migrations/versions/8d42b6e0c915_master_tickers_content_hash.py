@@ -0,0 +1,28 @@
+"""master_tickers content hash for change-skipping bulk ingest
+
+Revision ID: 8d42b6e0c915
+Revises: 3f1a9c2e7b10
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d42b6e0c915'
+down_revision: Union[str, None] = '3f1a9c2e7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE public.master_tickers ADD COLUMN IF NOT EXISTS content_hash text")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE public.master_tickers DROP COLUMN IF EXISTS content_hash")
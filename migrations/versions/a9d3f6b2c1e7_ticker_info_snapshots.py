@@ -0,0 +1,61 @@
+"""compressed, append-only ticker_info_snapshots for raw provider payloads
+
+Revision ID: a9d3f6b2c1e7
+Revises: e4b7a1c3d8f2
+Create Date: 2026-10-18 18:40:00.000000
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f6b2c1e7'
+down_revision: Union[str, None] = 'e4b7a1c3d8f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # payload is zlib-compressed JSON written by services/ticker_repo.py;
+    # EXTERNAL storage stops TOAST from trying to compress it a second time
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS public.ticker_info_snapshots (
+            id          bigserial   PRIMARY KEY,
+            symbol      text        NOT NULL,
+            captured_at timestamptz NOT NULL DEFAULT now(),
+            info_hash   text        NOT NULL,
+            payload     bytea       NOT NULL
+        )
+    """)
+    op.execute("ALTER TABLE public.ticker_info_snapshots ALTER COLUMN payload SET STORAGE EXTERNAL")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ticker_info_snapshots_symbol_captured_idx
+            ON public.ticker_info_snapshots (symbol, captured_at DESC)
+    """)
+    # the hot row no longer has to carry the payload
+    op.execute("ALTER TABLE public.tickers ALTER COLUMN raw_info DROP NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # put the newest snapshot back on rows written in snapshot mode; rows
+    # without one get an empty object so raw_info can be NOT NULL again
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("""
+        SELECT DISTINCT ON (s.symbol) s.symbol, s.payload
+          FROM public.ticker_info_snapshots s
+          JOIN public.tickers t ON t.symbol = s.symbol AND t.raw_info IS NULL
+         ORDER BY s.symbol, s.captured_at DESC
+    """))
+    restore = sa.text("UPDATE public.tickers SET raw_info = CAST(:info AS jsonb) WHERE symbol = :symbol")
+    for symbol, payload in rows.fetchall():
+        info = zlib.decompress(bytes(payload)).decode()
+        bind.execute(restore, {"symbol": symbol, "info": info})
+    op.execute("UPDATE public.tickers SET raw_info = '{}'::jsonb WHERE raw_info IS NULL")
+    op.execute("ALTER TABLE public.tickers ALTER COLUMN raw_info SET NOT NULL")
+    op.execute("DROP TABLE IF EXISTS public.ticker_info_snapshots")
@@ -0,0 +1,44 @@
+"""hydration_jobs: background hydration status visible to every worker
+
+Revision ID: b6e1d4a9c3f7
+Revises: f2c9e6a4b8d1
+Create Date: 2026-10-19 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e1d4a9c3f7'
+down_revision: Union[str, None] = 'f2c9e6a4b8d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS public.hydration_jobs (
+            id           text        PRIMARY KEY,
+            watchlist_id integer     NOT NULL REFERENCES public.watchlists (id) ON DELETE CASCADE,
+            state        text        NOT NULL,
+            total        integer     NOT NULL,
+            done         integer     NOT NULL DEFAULT 0,
+            failed       text[]      NOT NULL DEFAULT '{}',
+            seconds      double precision,
+            updated_at   timestamptz NOT NULL DEFAULT now()
+        )
+    """)
+    # expired jobs are swept by age
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS hydration_jobs_updated_at_idx
+            ON public.hydration_jobs (updated_at)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE IF EXISTS public.hydration_jobs")
@@ -0,0 +1,34 @@
+"""news (ticker_id, published_at DESC) index for keyset pagination
+
+Revision ID: c7e05d91a4b2
+Revises: 8d42b6e0c915
+Create Date: 2026-10-18 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e05d91a4b2'
+down_revision: Union[str, None] = '8d42b6e0c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS news_ticker_published_idx
+                ON public.news (ticker_id, published_at DESC, article_id DESC)
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.news_ticker_published_idx")
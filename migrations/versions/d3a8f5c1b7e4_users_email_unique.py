@@ -0,0 +1,46 @@
+"""unique users.email for ON CONFLICT registration
+
+Revision ID: d3a8f5c1b7e4
+Revises: 7e1c4b9a2d60
+Create Date: 2026-10-18 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a8f5c1b7e4'
+down_revision: Union[str, None] = '7e1c4b9a2d60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # /auth/register relies on INSERT ... ON CONFLICT (email). A UNIQUE
+    # constraint declared on the column already has this default name, in
+    # which case this is a no-op.
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS users_email_key
+                ON public.users (email)
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # a UNIQUE constraint of the same name owns its index and is left to
+    # the schema that declared it; only the index created above is dropped
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint
+                            WHERE conname = 'users_email_key'
+                              AND conrelid = 'public.users'::regclass) THEN
+                DROP INDEX IF EXISTS public.users_email_key;
+            END IF;
+        END $$
+    """)
@@ -0,0 +1,28 @@
+"""tickers raw_info hash for change-skipping upserts
+
+Revision ID: e4b7a1c3d8f2
+Revises: c7e05d91a4b2
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a1c3d8f2'
+down_revision: Union[str, None] = 'c7e05d91a4b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE public.tickers ADD COLUMN IF NOT EXISTS raw_info_hash text")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE public.tickers DROP COLUMN IF EXISTS raw_info_hash")
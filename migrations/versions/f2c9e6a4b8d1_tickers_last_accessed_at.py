@@ -0,0 +1,33 @@
+"""tickers.last_accessed_at for refresher recency
+
+Revision ID: f2c9e6a4b8d1
+Revises: d3a8f5c1b7e4
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9e6a4b8d1'
+down_revision: Union[str, None] = 'd3a8f5c1b7e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # written in batches by the API workers, read by the standalone
+    # refresher to rank recently viewed symbols first
+    op.execute("""
+        ALTER TABLE public.tickers
+            ADD COLUMN IF NOT EXISTS last_accessed_at timestamptz
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE public.tickers DROP COLUMN IF EXISTS last_accessed_at")
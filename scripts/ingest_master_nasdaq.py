@@ -1,10 +1,23 @@
 # scripts/ingest_master.py
+"""Bulk-load a listing CSV into public.master_tickers.
 
+The CSV is streamed into a temp staging table with COPY FROM STDIN and
+merged with one set-based upsert. Rows whose content hash is unchanged
+are skipped, so a daily re-run of the same file writes nothing. Symbols
+of the ingested exchange that are missing from the file are deleted as
+delisted (disable with --keep-delisted).
+
+    python scripts/ingest_master_nasdaq.py
+    python scripts/ingest_master_nasdaq.py --csv scripts/nasdaq_list.csv --exchange NYSE
+"""
+import argparse
 import csv
+import io
+import os
+import time
+
 import psycopg2
-from datetime import datetime
 from dotenv import load_dotenv
-import os
 
 # 1) load env/dev.env
 here = os.path.dirname(__file__)
@@ -14,39 +27,138 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL not set in env/dev.env")
 
-print("🔗 Connecting to:", DATABASE_URL)
+DEFAULT_CSV = os.path.join(here, "flat-ui__data-Mon May 19 2025.csv")
+
+# the autocomplete index in the web app reloads on this notification
+CHANNEL = "master_tickers_changed"
+
 
-# 2) point at your uploaded CSV
-csv_path = os.path.join(here, "flat-ui__data-Mon May 19 2025.csv")
-print("📄 Looking for CSV at:", csv_path)
-print("🗂️  Exists?", os.path.exists(csv_path))
+class CsvStream(io.TextIOBase):
+    """File-like view over normalised CSV rows, consumed lazily by COPY."""
 
-# 3) Run the upsert
-conn = psycopg2.connect(DATABASE_URL)
-with conn, conn.cursor() as cur, open(csv_path, newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    print("CSV columns:", reader.fieldnames)
+    def __init__(self, reader, default_exchange):
+        self._rows = self._encode(reader, default_exchange)
+        self._buf = ""
+        self.rows = 0
 
-    for i, row in enumerate(reader, start=1):
-        symbol = row["Symbol"].strip().upper()
-        name   = row["Security Name"].strip()
-        # default exchange
-        exchange = "NASDAQ"
+    def _encode(self, reader, default_exchange):
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for row in reader:
+            symbol = (row.get("Symbol") or "").strip().upper()
+            if not symbol:
+                continue
+            name = (row.get("Security Name") or row.get("Name") or "").strip()
+            exchange = (row.get("Exchange") or "").strip() or default_exchange
+            writer.writerow((symbol, name, exchange))
+            self.rows += 1
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
 
-        print(f"Ingesting row {i}: {symbol} – {name}")
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buf) < size:
+            chunk = next(self._rows, None)
+            if chunk is None:
+                break
+            self._buf += chunk
+        if size < 0:
+            data, self._buf = self._buf, ""
+        else:
+            data, self._buf = self._buf[:size], self._buf[size:]
+        return data
+
+
+
+def ingest(conn, csv_path, exchange, prune=True):
+    """Stage + merge one listing file; returns a dict of row counts."""
+    with conn, conn.cursor() as cur, open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        print("CSV columns:", reader.fieldnames)
 
         cur.execute("""
-          INSERT INTO public.master_tickers(symbol, name, exchange, last_updated)
-          VALUES (%s,%s,%s,%s)
-          ON CONFLICT(symbol) DO UPDATE SET
-            name         = EXCLUDED.name,
-            exchange     = EXCLUDED.exchange,
-            last_updated = EXCLUDED.last_updated
-        """, (symbol, name, exchange, datetime.utcnow()))
-
-    # 4) verify count
-    cur.execute("SELECT COUNT(*) FROM public.master_tickers")
-    total = cur.fetchone()[0]
-    print("✅ master_tickers now has", total, "rows")
-
-    conn.commit()
+            CREATE TEMP TABLE master_stage (
+              symbol   text,
+              name     text,
+              exchange text
+            ) ON COMMIT DROP
+        """)
+        stream = CsvStream(reader, exchange)
+        cur.copy_expert(
+            "COPY master_stage (symbol, name, exchange) FROM STDIN WITH (FORMAT csv)",
+            stream)
+        if stream.rows == 0:
+            raise RuntimeError(f"no rows read from {csv_path}; refusing to merge")
+
+        # 2) one set-based upsert; unchanged rows (same hash) are skipped
+        cur.execute("""
+            WITH src AS (
+              SELECT DISTINCT ON (symbol)
+                     symbol, name, exchange,
+                     md5(concat_ws(E'\\x1f', name, exchange)) AS content_hash
+                FROM master_stage
+               ORDER BY symbol
+            ), merged AS (
+              INSERT INTO public.master_tickers AS m
+                (symbol, name, exchange, content_hash, last_updated)
+              SELECT symbol, name, exchange, content_hash, now() FROM src
+              ON CONFLICT (symbol) DO UPDATE SET
+                name         = EXCLUDED.name,
+                exchange     = EXCLUDED.exchange,
+                content_hash = EXCLUDED.content_hash,
+                last_updated = EXCLUDED.last_updated
+              WHERE m.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+              RETURNING (xmax = 0) AS inserted
+            )
+            SELECT COUNT(*) FILTER (WHERE inserted)     AS inserted,
+                   COUNT(*) FILTER (WHERE NOT inserted) AS updated,
+                   (SELECT COUNT(*) FROM src)           AS total
+              FROM merged
+        """)
+        counts = dict(zip(("inserted", "updated", "total"), cur.fetchone()))
+
+        # 3) delisted: symbols of this exchange that are no longer in the file
+        counts["removed"] = 0
+        if prune:
+            cur.execute("""
+                DELETE FROM public.master_tickers m
+                 WHERE m.exchange = %s
+                   AND NOT EXISTS (SELECT 1 FROM master_stage s WHERE s.symbol = m.symbol)
+            """, (exchange,))
+            counts["removed"] = cur.rowcount
+
+        counts["unchanged"] = counts["total"] - counts["inserted"] - counts["updated"]
+        if counts["inserted"] or counts["updated"] or counts["removed"]:
+            cur.execute(f"NOTIFY {CHANNEL}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a listing CSV into master_tickers.")
+    parser.add_argument("--csv", default=DEFAULT_CSV, help="listing CSV (Symbol, Security Name|Name[, Exchange])")
+    parser.add_argument("--exchange", default="NASDAQ", help="exchange for rows without one")
+    parser.add_argument("--keep-delisted", action="store_true",
+                        help="don't delete symbols missing from the file")
+    args = parser.parse_args()
+
+    print("🔗 Connecting to:", DATABASE_URL)
+    print("📄 Looking for CSV at:", args.csv)
+    print("🗂️  Exists?", os.path.exists(args.csv))
+
+    started = time.monotonic()
+    conn = psycopg2.connect(DATABASE_URL)
+    try:
+        counts = ingest(conn, args.csv, args.exchange, prune=not args.keep_delisted)
+    finally:
+        conn.close()
+
+    print(f"✅ {counts['total']} rows in {time.monotonic() - started:.2f}s: "
+          f"{counts['inserted']} inserted, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+
+
+if __name__ == "__main__":
+    main()
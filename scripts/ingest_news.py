@@ -1,74 +1,38 @@
 #!/usr/bin/env python3
+"""Fetch NewsAPI articles for every ticker into public.news.
+
+    python scripts/ingest_news.py
+    python scripts/ingest_news.py --workers 8 --symbols AAPL,MSFT
+    NEWSAPI_URL=http://127.0.0.1:8765/v2/everything python scripts/ingest_news.py
+"""
+import argparse
+import logging
 import os
-import requests
-import psycopg2
-from psycopg2.extras import Json
-from dotenv import load_dotenv
+import sys
 
-
-# 1) Compute path to env/dev.env, relative to this script
+# reuse the backend's pool, rate limiter and news pipeline
 here = os.path.dirname(__file__)
-dotenv_path = os.path.join(here, "../env/dev.env")
+sys.path.insert(0, os.path.join(here, "..", "src", "backend"))
+
+from config.settings import API_KEY, NEWSAPI_KEY, NEWS_INGEST_WORKERS  # noqa: E402
+from services.news_ingest import ingest  # noqa: E402
 
-# 2) Load it explicitly
-load_dotenv(dotenv_path)
-API_KEY = os.getenv("API_KEY")
-if not API_KEY:
-    raise RuntimeError("API_KEY not set in env/dev.env")
 
-# # Load environment variables
-api_key = os.getenv("API_KEY")
-db_url  = os.getenv("DATABASE_URL")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=NEWS_INGEST_WORKERS)
+    parser.add_argument("--symbols", help="comma-separated subset of public.tickers")
+    args = parser.parse_args()
 
-# if not api_key:
-#     raise RuntimeError("API_KEY not set in env/dev.env")
+    if not (NEWSAPI_KEY or API_KEY):
+        raise RuntimeError("API_KEY not set in env/dev.env")
 
-# Connect to the database
-conn = psycopg2.connect(db_url)
-cur  = conn.cursor()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else None
+    stats = ingest(workers=args.workers, symbols=symbols)
+    print(f"Done. {stats['articles']} articles upserted for {stats['tickers']} tickers "
+          f"({stats['failed']} failed) in {stats['seconds']}s.")
 
-# For each ticker symbol
-cur.execute("SELECT id, symbol FROM public.tickers")
-for ticker_id, symbol in cur.fetchall():
-    print(f"Fetching news for {symbol}...")
-    params = {
-        "apiKey": api_key,
-        "q": symbol,
-        "pageSize": 20,
-        "language": "en",
-    }
-    r = requests.get("https://newsapi.org/v2/everything", params=params)
-    data = r.json().get("articles", [])
-    for art in data:
-        # use URL+publishedAt as a unique key, or generate a hash
-        article_uid = hash(art['url'] + art['publishedAt'])
-        cur.execute("""
-            INSERT INTO public.news
-              (article_id, ticker_id, title, url,
-               description, published_at, crawl_date,
-               source, tickers, tags, raw_json)
-            VALUES (%s, %s, %s, %s, %s, %s, now(),
-                    %s, %s, %s, %s)
-            ON CONFLICT (article_id) DO UPDATE SET
-              title       = EXCLUDED.title,
-              description = EXCLUDED.description,
-              updated_at  = now(),
-              raw_json    = EXCLUDED.raw_json;
-        """, [
-            article_uid,
-            ticker_id,
-            art.get("title"),
-            art.get("url"),
-            art.get("description"),
-            art.get("publishedAt"),
-            art.get("source",{}).get("name"),
-            [symbol],    # tickers array
-            [],          # no tags field
-            Json(art),
-        ])
-    conn.commit()
-    print(f"  {len(data)} articles upserted.")
 
-cur.close()
-conn.close()
-print("Done.")
+if __name__ == "__main__":
+    main()
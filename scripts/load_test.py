@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Closed-loop HTTP load test for comparing serving modes.
+
+Run the same workload against the dev server and gunicorn, e.g. with the
+offline provider so upstream latency is controlled:
+
+    # WSGI path (what app.py runs today)
+    MARKET_DATA_PROVIDER=fake FAKE_PROVIDER_LATENCY_MS=200 python app.py
+    python scripts/load_test.py --url http://127.0.0.1:5000 -c 200 -d 30
+
+    # gevent workers
+    MARKET_DATA_PROVIDER=fake FAKE_PROVIDER_LATENCY_MS=200 \\
+        gunicorn -c gunicorn.conf.py app:app
+    python scripts/load_test.py --url http://127.0.0.1:8000 -c 200 -d 30
+
+Pass ``--url`` more than once to run the workload against each target in
+turn and print the results side by side.
+"""
+import argparse
+import itertools
+import threading
+import time
+
+import requests
+
+DEFAULT_PATHS = [
+    "/tickers/AAPL/basic",
+    "/tickers/batch?symbols=AAPL,MSFT,NVDA,AMZN,GOOGL",
+    "/tickers?search=a",
+]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run(base_url, paths, concurrency, duration, headers):
+    """Hit ``paths`` round-robin from ``concurrency`` clients for ``duration`` s."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    cycle = itertools.cycle(paths)
+
+    def client():
+        session = requests.Session()
+        session.headers.update(headers)
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            with lock:
+                path = next(cycle)
+            started = time.perf_counter()
+            try:
+                r = session.get(base_url + path, timeout=30)
+                ok = r.status_code < 500
+            except requests.RequestException:
+                ok = False
+            local.append(time.perf_counter() - started)
+            failed += not ok
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        "url":      base_url,
+        "requests": len(latencies),
+        "errors":   errors[0],
+        "rps":      round(len(latencies) / elapsed, 1),
+        "p50_ms":   round(1000 * percentile(latencies, 0.50), 1),
+        "p95_ms":   round(1000 * percentile(latencies, 0.95), 1),
+        "p99_ms":   round(1000 * percentile(latencies, 0.99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", action="append", required=True,
+                        help="base URL of a running backend (repeatable)")
+    parser.add_argument("--path", action="append",
+                        help=f"request path (repeatable; default {DEFAULT_PATHS})")
+    parser.add_argument("-c", "--concurrency", type=int, default=100)
+    parser.add_argument("-d", "--duration", type=float, default=20.0,
+                        help="seconds per target")
+    parser.add_argument("--token", help="JWT for authenticated paths")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    paths = args.path or DEFAULT_PATHS
+    results = []
+    for url in args.url:
+        print(f"⏱  {url}: {args.concurrency} clients for {args.duration:g}s …")
+        results.append(run(url.rstrip("/"), paths, args.concurrency, args.duration, headers))
+
+    cols = ["url", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in results)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in cols))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Evaluate price-alert rules against live quotes and deliver the alerts.
+
+    python scripts/run_alerts.py
+
+Run exactly one instance: it listens to NOTIFY ticker_quotes (sent by every
+process that refreshes tickers), so the web workers never evaluate rules
+themselves and each alert goes out once.
+"""
+import argparse
+import logging
+import os
+import sys
+
+# reuse the backend's pool, price feed and alert engine
+here = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(here, "..", "src", "backend"))
+
+from services.alert_channels import Outbox, build_channels  # noqa: E402
+from services.alerts import AlertEngine, run_forever  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    channels = build_channels()
+    print("📣 channels:", ", ".join(c.name for c in channels))
+    outbox = Outbox(channels)
+    outbox.start()
+    try:
+        run_forever(AlertEngine(outbox))
+    except KeyboardInterrupt:
+        outbox.stop()
+        print("outbox:", outbox.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Keep public.tickers warm for every watched symbol.
+
+    python scripts/run_refresher.py            # loop forever
+    python scripts/run_refresher.py --once     # single pass, then exit
+    MARKET_DATA_PROVIDER=fake python scripts/run_refresher.py --once
+"""
+import argparse
+import logging
+import os
+import sys
+
+# reuse the backend's pool, provider and refresh logic
+here = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(here, "..", "src", "backend"))
+
+from services.refresher import Refresher  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true",
+                        help="run a single scheduling pass and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    refresher = Refresher()
+    if args.once:
+        n = refresher.run_once()
+        refresher.stop(wait=True)
+        print(f"{n} symbols refreshed:", refresher.stats())
+        return
+    try:
+        refresher.run_forever()
+    except KeyboardInterrupt:
+        refresher.stop(wait=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Bulk-seed public.price_bars with COPY instead of row-by-row inserts.
+
+    python scripts/seed_price_history.py --universe watched --period 1y
+    python scripts/seed_price_history.py --universe master --period 5y --chunk 200
+    python scripts/seed_price_history.py --symbols AAPL,MSFT --interval 1h --period 1mo
+"""
+import argparse
+import os
+import sys
+import time
+
+# reuse the backend's pool, provider and price-history store
+here = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(here, "..", "src", "backend"))
+
+from services.db import get_conn  # noqa: E402
+from services.price_history import seed  # noqa: E402
+
+UNIVERSES = {
+    "watched": """
+        SELECT DISTINCT t.symbol
+          FROM public.watchlist_items wi
+          JOIN public.tickers t ON t.id = wi.ticker_id
+         ORDER BY 1
+    """,
+    "tickers": "SELECT symbol FROM public.tickers ORDER BY 1",
+    "master":  "SELECT symbol FROM public.master_tickers ORDER BY 1",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--symbols", help="comma-separated symbols")
+    src.add_argument("--universe", choices=sorted(UNIVERSES))
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--chunk", type=int, default=100,
+                        help="symbols per upstream download / COPY")
+    args = parser.parse_args()
+
+    if args.symbols:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    else:
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute(UNIVERSES[args.universe])
+            symbols = [r["symbol"] for r in cur.fetchall()]
+
+    started = time.monotonic()
+    rows = seed(symbols, period=args.period, interval=args.interval, chunk=args.chunk)
+    print(f"✅ {rows} bars for {len(symbols)} symbols "
+          f"in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Report tickers / raw_info storage and measure refresh write amplification.
+
+    python scripts/storage_report.py                  # sizes + update stats
+    python scripts/storage_report.py --compact        # move inline raw_info into snapshots
+    python scripts/storage_report.py --measure 20 --symbols AAPL,MSFT,NVDA
+
+``--measure`` runs N simulated refresh rounds (offline fake provider) in
+each storage mode inside a transaction that is rolled back. It reports
+the WAL bytes each mode generated, read from ``pg_current_wal_insert_lsn()``, so
+run it on a quiet database for clean numbers.
+"""
+import argparse
+import os
+import sys
+
+# reuse the backend's pool, provider and ticker repository
+here = os.path.dirname(__file__)
+sys.path.insert(0, os.path.join(here, "..", "src", "backend"))
+
+from services.db import get_conn  # noqa: E402
+from services.providers import FakeProvider  # noqa: E402
+from services.ticker_repo import upsert_many, write_snapshots  # noqa: E402
+
+TABLES = ("public.tickers", "public.ticker_info_snapshots")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def human(n):
+    for unit in ("B", "kB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def sizes(cur):
+    out = {}
+    for table in TABLES:
+        cur.execute("""
+            SELECT pg_relation_size(c.oid)                           AS heap,
+                   COALESCE(pg_total_relation_size(c.reltoastrelid), 0) AS toast,
+                   pg_indexes_size(c.oid)                            AS indexes,
+                   pg_total_relation_size(c.oid)                     AS total,
+                   s.n_tup_upd, s.n_tup_hot_upd, s.n_dead_tup
+              FROM pg_class c
+              LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+             WHERE c.oid = to_regclass(%s)
+        """, (table,))
+        out[table] = cur.fetchone()
+    cur.execute("""
+        SELECT count(*) FILTER (WHERE raw_info IS NOT NULL) AS inline_rows,
+               COALESCE(sum(pg_column_size(raw_info)), 0)   AS inline_bytes
+          FROM public.tickers
+    """)
+    out["raw_info"] = cur.fetchone()
+    return out
+
+
+def print_sizes(s):
+    for table in TABLES:
+        r = s[table]
+        if r is None:
+            print(f"{table}: missing (run alembic upgrade head)")
+            continue
+        print(f"{table}: total {human(r['total'])} "
+              f"(heap {human(r['heap'])}, toast {human(r['toast'])}, "
+              f"indexes {human(r['indexes'])}); updates {r['n_tup_upd']} "
+              f"({r['n_tup_hot_upd']} HOT), dead tuples {r['n_dead_tup']}")
+    r = s["raw_info"]
+    print(f"inline raw_info: {r['inline_rows']} rows, {human(r['inline_bytes'])}")
+
+
+def compact(cur):
+    """Snapshot every inline raw_info payload, then drop it from the hot row."""
+    cur.execute("SELECT symbol, raw_info FROM public.tickers WHERE raw_info IS NOT NULL")
+    infos = {r["symbol"]: r["raw_info"] for r in cur.fetchall()}
+    if infos:
+        write_snapshots(cur, infos)
+        cur.execute("UPDATE public.tickers SET raw_info = NULL WHERE raw_info IS NOT NULL")
+    return len(infos)
+
+
+def wal_bytes(cur, storage, symbols, rounds):
+    provider = FakeProvider(latency_ms=0)
+    cur.execute("SELECT pg_current_wal_insert_lsn() AS lsn")
+    start = cur.fetchone()["lsn"]
+    for i in range(rounds):
+        infos = {}
+        for s in symbols:
+            info = provider.info(s)
+            info["regularMarketPrice"] = info["regularMarketPrice"] + 0.01 * (i + 1)
+            infos[s] = info
+        upsert_many(cur, infos, storage=storage)
+    cur.execute("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s) AS bytes", (start,))
+    return int(cur.fetchone()["bytes"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--compact", action="store_true",
+                        help="move inline raw_info payloads into ticker_info_snapshots")
+    parser.add_argument("--measure", type=int, metavar="ROUNDS",
+                        help="measure WAL written per storage mode over ROUNDS refreshes")
+    parser.add_argument("--symbols", default="AAPL,MSFT,GOOGL,AMZN,NVDA",
+                        help="symbols used by --measure")
+    args = parser.parse_args()
+
+    with get_conn() as conn, conn.cursor() as cur:
+        before = sizes(cur)
+    print("📊 before" if args.compact else "📊 storage")
+    print_sizes(before)
+
+    if args.compact:
+        with get_conn() as conn, conn.cursor() as cur:
+            n = compact(cur)
+        print(f"✅ moved {n} payloads into ticker_info_snapshots "
+              "(run VACUUM on public.tickers to reclaim the space)")
+        with get_conn() as conn, conn.cursor() as cur:
+            after = sizes(cur)
+        print("📊 after")
+        print_sizes(after)
+
+    if args.measure:
+        symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+        results = {}
+        for storage in ("inline", "snapshot"):
+            try:
+                with get_conn() as conn, conn.cursor() as cur:
+                    results[storage] = wal_bytes(cur, storage, symbols, args.measure)
+                    raise _Rollback     # leave the table as it was
+            except _Rollback:
+                pass
+        per = {k: v / (args.measure * len(symbols)) for k, v in results.items()}
+        print(f"📝 WAL over {args.measure} rounds × {len(symbols)} symbols:")
+        for storage, total in results.items():
+            print(f"   {storage:8s} {human(total)} total, {human(per[storage])} per refresh")
+        if results["inline"]:
+            print(f"   reduction: {100 * (1 - results['snapshot'] / results['inline']):.1f}%")
+
+
+if __name__ == "__main__":
+    main()
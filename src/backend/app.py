@@ -1,38 +1,71 @@
 import os
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from config.settings import DATABASE_URL, JWT_SECRET_KEY
+from config.settings import (
+    JWT_SECRET_KEY, REFRESHER_IN_PROCESS, DETAIL_TIMEOUTS,
+    ACCESS_TOKEN_EXPIRES, REFRESH_TOKEN_EXPIRES,
+)
 import pprint
-import psycopg2
-from psycopg2.extras import RealDictCursor
 
 app = Flask(__name__)
 
 app.config["JWT_SECRET_KEY"] = JWT_SECRET_KEY
+# headers only; the SSE stream alone also reads ?jwt= (a stream-scoped token)
+app.config["JWT_TOKEN_LOCATION"] = ["headers"]
+app.config["JWT_ACCESS_TOKEN_EXPIRES"] = ACCESS_TOKEN_EXPIRES
+app.config["JWT_REFRESH_TOKEN_EXPIRES"] = REFRESH_TOKEN_EXPIRES
 jwt = JWTManager(app)
 
+
+@jwt.token_verification_loader
+def stream_tokens_only_stream(_header, claims):
+    # tokens from POST .../stream/token open that price stream and nothing else
+    return claims.get("scope") != "stream" or request.endpoint == "items.stream_prices"
+
+
+@jwt.token_verification_failed_loader
+def stream_token_rejected(_header, _claims):
+    return jsonify({"error": "stream tokens only open the price stream"}), 401
+
 # allow all origins for all routes (moved after JWT config)
 CORS(app)
 
 # Import your service functions
 from services.ticker_service import (
-    fetch_basic, fetch_news, compute_indicators, fetch_chart_data
+    RefreshBusy, fetch_basic, fetch_news, compute_indicators, fetch_chart_data
 )
 
-# DB
-conn = psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+
+@app.errorhandler(RefreshBusy)
+def refresh_busy(exc):
+    resp = jsonify({"error": f"{exc} is being fetched by another worker, retry shortly"})
+    resp.headers["Retry-After"] = "1"
+    return resp, 503
+
+from services.fanout import gather, server_timing
+
+# DB: every blueprint borrows from the shared pool in services/db.py
+from services.db import get_pool
+from services.response_cache import cache as response_cache
+from services.shared_cache import get_shared_cache
+from services.ownership import cache as ownership_cache
+from services import metrics
 
 # register blueprints (you'll create these next)
 from routes.watchlists import bp as watchlists_bp
 from routes.watchlist_items import bp as items_bp
 from routes.auth import bp as auth_bp
 from routes.tickers import bp as tickers_bp
+from routes.screener import bp as screener_bp
+from routes.alerts import bp as alerts_bp
 
 
 app.register_blueprint(watchlists_bp)
 app.register_blueprint(items_bp)
 app.register_blueprint(tickers_bp)
+app.register_blueprint(screener_bp)
+app.register_blueprint(alerts_bp)
 app.register_blueprint(auth_bp)
 
 # <<< Add this block right here >>>
@@ -41,19 +74,79 @@ for rule in app.url_map.iter_rules():
     pprint.pprint(f"{rule.methods} -> {rule.rule}")
 print("---------------------")
 
-# Single-detail endpoint
+# Autocomplete index: reload whenever master_tickers is re-ingested
+from services import autocomplete
+autocomplete.start_listener()
+
+# Live prices: NOTIFY ticker_quotes -> in-process hub -> SSE subscribers
+from services import pricefeed
+pricefeed.start_listener()
+
+# Instrumentation: per-endpoint latency histograms, ?__profile=1 for
+# PROFILE_ADMINS, and the health gauges below exported on /metrics
+metrics.init_app(app)
+metrics.registry.register_collector("db_pool", "Connection pool", lambda: get_pool().stats())
+metrics.registry.register_collector("response_cache", "Response cache", response_cache.stats)
+metrics.registry.register_collector("shared_cache", "Shared cache leases",
+                                    lambda: get_shared_cache().stats())
+metrics.registry.register_collector("ownership_cache", "Watchlist owner cache",
+                                    ownership_cache.stats)
+metrics.registry.register_collector("price_hub", "Live price hub", pricefeed.hub.stats)
+
+# Optional in-process refresher; prefer scripts/run_refresher.py when
+# running more than one worker process.
+if REFRESHER_IN_PROCESS:
+    from services.refresher import Refresher
+    Refresher().start()
+
+# Single-detail endpoint: the four parts are fetched concurrently, each
+# with its own time budget; a slow part degrades to null + "partial": true
 @app.route("/tickers/<symbol>")
 def ticker_detail(symbol):
-    t = fetch_basic(symbol)
-    if not t:
+    symbol = symbol.upper()
+    results, timings, failed = gather({
+        "basic":      (fetch_basic, (symbol,)),
+        "news":       (fetch_news, (symbol, 20)),
+        "indicators": (compute_indicators, (symbol,)),
+        "chart":      (fetch_chart_data, (symbol, 30)),
+    }, DETAIL_TIMEOUTS)
+
+    t = results["basic"]
+    if not t and "basic" not in failed:
         return jsonify({"error":"Ticker not found"}), 404
 
-    return jsonify({
-        **t,
-        "news":       fetch_news(symbol, limit=20),
-        "indicators": compute_indicators(symbol),
-        "chart_data": fetch_chart_data(symbol, days=30)
+    resp = jsonify({
+        **(t or {"symbol": symbol}),
+        "news":       results["news"],
+        "indicators": results["indicators"],
+        "chart_data": results["chart"],
+        "partial":    bool(failed),
+        "degraded":   failed,
     })
+    resp.headers["Server-Timing"] = server_timing(timings)
+    return resp
+
+@app.route("/health/db")
+def db_health():
+    """Connection-pool gauges: in use, waiting, checkout latency."""
+    return jsonify(get_pool().stats())
+
+@app.route("/health/cache")
+def cache_health():
+    """Response cache counters: hits, misses, evictions, invalidations."""
+    return jsonify({**response_cache.stats(), "shared": get_shared_cache().stats(),
+                    "ownership": ownership_cache.stats()})
+
+@app.route("/metrics")
+def prometheus_metrics():
+    """Latency histograms, query/upstream/cache counters and the health gauges
+    above, in Prometheus text format (this worker process only)."""
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/health/stream")
+def stream_health():
+    """Price hub gauges: open subscriptions, symbols watched, fan-out counts."""
+    return jsonify(pricefeed.hub.stats())
 
 if __name__ == "__main__":
     app.run(debug=True)
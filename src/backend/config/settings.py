@@ -1,5 +1,6 @@
 # src/backend/config/settings.py
 import os, pathlib
+from datetime import timedelta
 from dotenv import load_dotenv
 
 BASE = pathlib.Path(__file__).parents[3]   # project-root/src/backend
@@ -10,3 +11,131 @@ API_KEY = os.getenv("API_KEY")
 NEWSAPI_KEY    = os.getenv("NEWSAPI_KEY")
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
+
+# Shared psycopg2 connection pool (see services/db.py)
+DB_POOL_SIZE          = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_MAX_OVERFLOW  = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT       = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE       = float(os.getenv("DB_POOL_RECYCLE", "1800"))
+# ping connections that sat idle longer than this many seconds (-1 disables)
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+# Serve stale ticker rows immediately and refresh them in the background
+STALE_WHILE_REVALIDATE = os.getenv("STALE_WHILE_REVALIDATE", "1").lower() not in ("0", "false", "no")
+REFRESH_WORKERS        = int(os.getenv("REFRESH_WORKERS", "4"))
+# /tickers/batch waits at most this many seconds for a bulk quote download
+BATCH_REFRESH_TIMEOUT  = float(os.getenv("BATCH_REFRESH_TIMEOUT", "5"))
+
+# Upstream market data: "yfinance" or the offline "fake" feed
+MARKET_DATA_PROVIDER     = os.getenv("MARKET_DATA_PROVIDER", "yfinance").lower()
+FAKE_PROVIDER_LATENCY_MS = float(os.getenv("FAKE_PROVIDER_LATENCY_MS", "0"))
+# under gevent, yfinance calls run on this many native threads per worker
+PROVIDER_THREADS         = int(os.getenv("PROVIDER_THREADS", "8"))
+
+# Background refresher (services/refresher.py)
+REFRESHER_IN_PROCESS     = os.getenv("REFRESHER_IN_PROCESS", "0").lower() in ("1", "true", "yes")
+REFRESHER_RATE           = float(os.getenv("REFRESHER_RATE", "2"))      # upstream calls / second
+REFRESHER_BURST          = int(os.getenv("REFRESHER_BURST", "5"))
+REFRESHER_WORKERS        = int(os.getenv("REFRESHER_WORKERS", "4"))
+REFRESHER_POLL_INTERVAL  = float(os.getenv("REFRESHER_POLL_INTERVAL", "15"))  # seconds
+# refresh once a row has used this fraction of CACHE_TTL
+REFRESHER_REFRESH_AHEAD  = float(os.getenv("REFRESHER_REFRESH_AHEAD", "0.8"))
+REFRESHER_BACKOFF        = float(os.getenv("REFRESHER_BACKOFF", "60"))  # seconds after a 429
+# request handlers batch tickers.last_accessed_at updates at most this often (s)
+ACCESS_FLUSH_INTERVAL    = float(os.getenv("ACCESS_FLUSH_INTERVAL", "30"))
+
+# Chart history (services/price_history.py): how often the newest bars of a
+# series may be re-pulled from upstream
+CHART_TAIL_TTL = timedelta(seconds=float(os.getenv("CHART_TAIL_TTL", "300")))
+
+# Autocomplete index (services/autocomplete.py): periodic reload, in seconds
+AUTOCOMPLETE_RELOAD_INTERVAL = float(os.getenv("AUTOCOMPLETE_RELOAD_INTERVAL", "3600"))
+
+# News ingestion (services/news_ingest.py); NEWSAPI_URL may point at a stub
+NEWSAPI_URL         = os.getenv("NEWSAPI_URL", "https://newsapi.org/v2/everything")
+NEWSAPI_RATE        = float(os.getenv("NEWSAPI_RATE", "1"))   # requests / second
+NEWSAPI_BURST       = int(os.getenv("NEWSAPI_BURST", "5"))
+NEWS_INGEST_WORKERS = int(os.getenv("NEWS_INGEST_WORKERS", "4"))
+NEWS_PAGE_SIZE      = int(os.getenv("NEWS_PAGE_SIZE", "20"))
+
+# Composite /tickers/<symbol> endpoint: sub-fetch pool and per-part budgets (s)
+DETAIL_WORKERS  = int(os.getenv("DETAIL_WORKERS", "16"))
+DETAIL_TIMEOUTS = {
+    part: float(os.getenv(f"DETAIL_TIMEOUT_{part.upper()}", default))
+    for part, default in (("basic", "5"), ("news", "2"),
+                          ("indicators", "3"), ("chart", "3"))
+}
+
+# Live price stream (/watchlists/<id>/tickers/stream): minimum seconds
+# between pushes per connection, and keep-alive comment interval
+STREAM_MIN_INTERVAL = float(os.getenv("STREAM_MIN_INTERVAL", "1"))
+STREAM_HEARTBEAT    = float(os.getenv("STREAM_HEARTBEAT", "15"))
+# lifetime (s) of the stream-scoped ?jwt= token; only checked when connecting
+STREAM_TOKEN_TTL    = timedelta(seconds=float(os.getenv("STREAM_TOKEN_TTL", "60")))
+
+# In-process response cache for /tickers/<symbol>/* (services/response_cache.py):
+# max entries, and per-endpoint TTLs in seconds (0 disables an endpoint)
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+# streaming indicator states kept per process, least recently used dropped first
+INDICATOR_STATE_CACHE_SIZE = int(os.getenv("INDICATOR_STATE_CACHE_SIZE", "2000"))
+RESPONSE_CACHE_TTLS = {
+    endpoint: float(os.getenv(f"RESPONSE_CACHE_TTL_{endpoint.upper()}", default))
+    for endpoint, default in (("basic", "30"), ("indicators", "60"), ("chart", "60"))
+}
+
+# Cross-process cache/lease backend (services/shared_cache.py):
+# "" (in-process), file:///var/tmp/finapp-cache or redis://host:6379/0.
+# A refresh lease is held at most this many seconds.
+SHARED_CACHE_URL  = os.getenv("SHARED_CACHE_URL", "")
+REFRESH_LEASE_TTL = float(os.getenv("REFRESH_LEASE_TTL", "30"))
+
+# Raw provider payloads (services/ticker_repo.py): "snapshot" keeps only typed
+# columns on tickers and appends compressed payloads to ticker_info_snapshots
+# when they change; "inline" writes raw_info JSONB on every refresh (legacy).
+RAW_INFO_STORAGE        = os.getenv("RAW_INFO_STORAGE", "snapshot")
+RAW_INFO_RETENTION_DAYS = int(os.getenv("RAW_INFO_RETENTION_DAYS", "90"))
+RAW_INFO_PRUNE_INTERVAL = float(os.getenv("RAW_INFO_PRUNE_INTERVAL", "3600"))  # seconds
+
+# /screener (services/screener.py): "sql" compiles filters to indexed queries,
+# "snapshot" scans an in-memory NumPy copy of tickers rebuilt every TTL seconds
+SCREENER_MODE         = os.getenv("SCREENER_MODE", "sql")
+SCREENER_SNAPSHOT_TTL = float(os.getenv("SCREENER_SNAPSHOT_TTL", "60"))
+
+# Price alerts (services/alerts.py, scripts/run_alerts.py): a rule fires at
+# most once per cooldown; deliveries are sent in batches and retried with
+# exponential backoff (ALERT_RETRY_BACKOFF ** attempt seconds)
+ALERT_COOLDOWN       = float(os.getenv("ALERT_COOLDOWN", "300"))
+ALERT_BATCH_SIZE     = int(os.getenv("ALERT_BATCH_SIZE", "50"))
+ALERT_FLUSH_INTERVAL = float(os.getenv("ALERT_FLUSH_INTERVAL", "1"))
+ALERT_MAX_ATTEMPTS   = int(os.getenv("ALERT_MAX_ATTEMPTS", "5"))
+ALERT_RETRY_BACKOFF  = float(os.getenv("ALERT_RETRY_BACKOFF", "2"))
+
+# Alert channels: email needs SMTP_HOST, sms needs the Twilio credentials;
+# discord posts to the webhook URL stored on each rule
+SMTP_HOST          = os.getenv("SMTP_HOST", "")
+SMTP_PORT          = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER          = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD      = os.getenv("SMTP_PASSWORD", "")
+ALERT_EMAIL_FROM   = os.getenv("ALERT_EMAIL_FROM", "alerts@finapp.local")
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID", "")
+TWILIO_AUTH_TOKEN  = os.getenv("TWILIO_AUTH_TOKEN", "")
+TWILIO_FROM        = os.getenv("TWILIO_FROM", "")
+
+# Auth (routes/auth.py, services/passwords.py): bcrypt runs on AUTH_HASH_WORKERS
+# native threads; at most AUTH_HASH_QUEUE more hashes may wait before
+# logins get 503.
+AUTH_HASH_WORKERS    = int(os.getenv("AUTH_HASH_WORKERS", "2"))
+AUTH_HASH_QUEUE      = int(os.getenv("AUTH_HASH_QUEUE", "32"))
+AUTH_HASH_TIMEOUT    = float(os.getenv("AUTH_HASH_TIMEOUT", "10"))  # seconds
+ACCESS_TOKEN_EXPIRES  = timedelta(minutes=float(os.getenv("ACCESS_TOKEN_MINUTES", "15")))
+REFRESH_TOKEN_EXPIRES = timedelta(days=float(os.getenv("REFRESH_TOKEN_DAYS", "30")))
+
+# watchlist id -> owner cache in front of the per-request ownership check
+# (services/ownership.py); a deleted watchlist may linger this many seconds
+# in other workers
+OWNERSHIP_CACHE_TTL  = float(os.getenv("OWNERSHIP_CACHE_TTL", "60"))
+OWNERSHIP_CACHE_SIZE = int(os.getenv("OWNERSHIP_CACHE_SIZE", "10000"))
+
+# ?__profile=1 returns a cProfile summary instead of the response for these
+# user ids (comma-separated); empty disables profiling
+PROFILE_ADMINS = frozenset(u.strip() for u in os.getenv("PROFILE_ADMINS", "").split(",") if u.strip())
@@ -0,0 +1,47 @@
+# src/backend/gunicorn.conf.py
+"""Production serving config: ``gunicorn -c gunicorn.conf.py app:app``.
+
+The default worker class is gevent. Every worker is monkey-patched, so
+socket I/O to NewsAPI and Postgres yields to other greenlets instead of
+blocking the process. psycopg2 is made cooperative with psycogreen.
+yfinance's ``curl_cffi`` transport cannot be patched; its calls run on
+native threads instead (``PROVIDER_THREADS``, ``services/native.py``).
+That way each worker holds ``WORKER_CONNECTIONS`` concurrent requests
+while the same Flask blueprints run unchanged.
+
+Tuning (environment variables):
+
+* ``WEB_CONCURRENCY``     – worker processes (default: CPU count)
+* ``WORKER_CLASS``        – ``gevent`` (default) or ``sync``/``gthread`` for
+  the plain WSGI path
+* ``WORKER_CONNECTIONS``  – concurrent requests per gevent worker (1000)
+* ``THREADS``             – threads per worker for ``gthread`` (8)
+* ``TIMEOUT``             – seconds before a silent worker is restarted (60)
+* ``BIND``                – listen address (``0.0.0.0:8000``)
+
+Postgres connections are bounded per process by ``DB_POOL_SIZE +
+DB_POOL_MAX_OVERFLOW``, not by ``WORKER_CONNECTIONS``. Greenlets beyond that
+queue on the pool. Size the database for ``WEB_CONCURRENCY x (size +
+overflow)`` connections, plus the refresher and autocomplete listener.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = os.getenv("WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+threads = int(os.getenv("THREADS", "8"))
+timeout = int(os.getenv("TIMEOUT", "60"))
+keepalive = 5
+accesslog = "-"
+# path without the query string: keeps ?jwt= stream tokens out of the logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def post_fork(server, worker):
+    # gunicorn has already monkey-patched sockets for gevent workers; psycopg2
+    # talks to libpq directly and needs its own wait callback
+    if worker_class == "gevent":
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
@@ -0,0 +1,81 @@
+# src/backend/routes/alerts.py
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.db import get_conn
+from services.alert_channels import available, is_discord_webhook
+from services.alerts import KINDS, RULE_COLUMNS, notify_rules_changed
+
+bp = Blueprint("alerts", __name__, url_prefix="/alerts")
+
+# channels whose rules must say where to deliver
+TARGETED = {"discord", "email", "sms"}
+
+
+@bp.route("", methods=["GET"])
+@jwt_required()
+def list_alerts():
+    user_id = get_jwt_identity()
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT {RULE_COLUMNS}, active, created_at
+              FROM public.alert_rules WHERE user_id=%s ORDER BY id
+        """, (user_id,))
+        return jsonify(cur.fetchall())
+
+
+@bp.route("", methods=["POST"])
+@jwt_required()
+def create_alert():
+    """``{"watchlist_id", "symbol", "kind", "threshold", "channel", "target"}``.
+
+    The symbol must be on one of the caller's watchlists; ``kind`` is one
+    of ``services.alerts.KINDS``.
+    """
+    user_id = get_jwt_identity()
+    data    = request.get_json() or {}
+    symbol  = (data.get("symbol") or "").upper().strip()
+    kind    = data.get("kind")
+    channel = data.get("channel")
+    target  = (data.get("target") or "").strip() or None
+    if kind not in KINDS:
+        return jsonify({"error": f"`kind` must be one of {sorted(KINDS)}"}), 400
+    if channel not in available():
+        return jsonify({"error": f"`channel` must be one of {available()}"}), 400
+    if channel in TARGETED and not target:
+        return jsonify({"error": f"`target` required for {channel}"}), 400
+    if channel == "discord" and not is_discord_webhook(target):
+        return jsonify({"error": "`target` must be a Discord webhook URL"}), 400
+    try:
+        threshold = float(data.get("threshold"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "`threshold` must be a number"}), 400
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            INSERT INTO public.alert_rules
+                (user_id, watchlist_id, symbol, kind, threshold, channel, target)
+            SELECT w.user_id, w.id, t.symbol, %s, %s, %s, %s
+              FROM public.watchlists w
+              JOIN public.watchlist_items wi ON wi.watchlist_id = w.id
+              JOIN public.tickers t          ON t.id = wi.ticker_id
+             WHERE w.id = %s AND w.user_id = %s AND t.symbol = %s
+            RETURNING {RULE_COLUMNS}, active, created_at
+        """, (kind, threshold, channel, target, data.get("watchlist_id"), user_id, symbol))
+        rule = cur.fetchone()
+        if not rule:
+            return jsonify({"error": "symbol not on this watchlist"}), 404
+        notify_rules_changed(cur, rule["id"])
+    return jsonify(rule), 201
+
+
+@bp.route("/<int:rule_id>", methods=["DELETE"])
+@jwt_required()
+def delete_alert(rule_id):
+    user_id = get_jwt_identity()
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("DELETE FROM public.alert_rules WHERE id=%s AND user_id=%s",
+                    (rule_id, user_id))
+        if cur.rowcount == 0:
+            return jsonify({"error": "Not found"}), 404
+        notify_rules_changed(cur, rule_id)
+    return ("", 204)
@@ -1,17 +1,26 @@
 # src/backend/routes/auth.py
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token
-from passlib.hash import bcrypt
-from config.settings import DATABASE_URL
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from passlib.context import CryptContext
-
-pwd_ctx = CryptContext(schemes=["bcrypt","pbkdf2_sha256"], deprecated="auto")
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, get_jwt_identity, jwt_required,
+)
+from services.db import get_conn
+from services.passwords import Busy, hash_password, verify_password
+
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
-def get_conn():
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+
+@bp.errorhandler(Busy)
+def busy(_):
+    resp = jsonify({"error": "too many sign-ins in progress, retry shortly"})
+    resp.headers["Retry-After"] = "1"
+    return resp, 503
+
+
+def _tokens(user_id):
+    identity = str(user_id)   # JWT subjects must be strings
+    return {"access_token":  create_access_token(identity=identity),
+            "refresh_token": create_refresh_token(identity=identity)}
+
 
 @bp.route("/register", methods=["POST"])
 def register():
@@ -21,18 +30,18 @@ def register():
     if not email or not password:
         return jsonify({"error":"email and password required"}), 400
 
-    pw_hash = pwd_ctx.hash(password)
+    pw_hash = hash_password(password)
     with get_conn() as conn, conn.cursor() as cur:
-        cur.execute("SELECT 1 FROM public.users WHERE email=%s", (email,))
-        if cur.fetchone():
-            return jsonify({"error":"email already registered"}), 409
-        cur.execute(
-            "INSERT INTO public.users (email,password_hash) VALUES (%s,%s) RETURNING id",
-            (email, pw_hash)
-        )
-        user_id = cur.fetchone()["id"]
-        conn.commit()
-    return jsonify({"msg":"user created","user_id":user_id}), 201
+        # one statement: concurrent sign-ups for the same e-mail cannot both win
+        cur.execute("""
+            INSERT INTO public.users (email, password_hash) VALUES (%s, %s)
+            ON CONFLICT (email) DO NOTHING
+            RETURNING id
+        """, (email, pw_hash))
+        row = cur.fetchone()
+    if row is None:
+        return jsonify({"error":"email already registered"}), 409
+    return jsonify({"msg":"user created","user_id":row["id"]}), 201
 
 @bp.route("/login", methods=["POST"])
 def login():
@@ -45,8 +54,21 @@ def login():
     with get_conn() as conn, conn.cursor() as cur:
         cur.execute("SELECT id,password_hash FROM public.users WHERE email=%s", (email,))
         user = cur.fetchone()
-        if not pwd_ctx.verify(password, user["password_hash"]):
-            return jsonify({"error":"invalid credentials"}), 401
 
-    token = create_access_token(identity=user["id"])
-    return jsonify({"access_token": token}), 200
+    # verified after the connection went back to the pool
+    ok, new_hash = verify_password(password, user and user["password_hash"])
+    if not ok:
+        return jsonify({"error":"invalid credentials"}), 401
+    if new_hash:
+        # stored with a deprecated scheme: upgrade it now that we know the password
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("UPDATE public.users SET password_hash=%s WHERE id=%s",
+                        (new_hash, user["id"]))
+
+    return jsonify(_tokens(user["id"])), 200
+
+@bp.route("/refresh", methods=["POST"])
+@jwt_required(refresh=True)
+def refresh():
+    """New access token for a valid refresh token (``Authorization: Bearer <refresh>``)."""
+    return jsonify({"access_token": create_access_token(identity=get_jwt_identity())}), 200
@@ -0,0 +1,31 @@
+# src/backend/routes/screener.py
+from flask import Blueprint, jsonify, request, url_for
+from config.settings import SCREENER_MODE
+from services import screener
+
+bp = Blueprint("screener", __name__, url_prefix="/screener")
+
+
+@bp.route("", methods=["GET"])
+def screen():
+    """Filter the ticker universe, e.g.
+    ``?market_cap.gte=1e10&trailing_pe.lte=20&sector=Technology&sort=-dividend_yield``.
+
+    See ``services/screener.py`` for the filter DSL. The next page's cursor
+    comes back in ``X-Next-Cursor`` and a ``Link`` header.
+    """
+    mode = request.args.get("mode", SCREENER_MODE)
+    if mode not in ("sql", "snapshot"):
+        return jsonify({"error": "mode must be sql or snapshot"}), 400
+    try:
+        spec = screener.parse(request.args)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    rows, next_cursor = screener.run(spec, mode)
+    resp = jsonify(rows)
+    if next_cursor:
+        args = {**request.args.to_dict(), "cursor": next_cursor}
+        resp.headers["X-Next-Cursor"] = next_cursor
+        resp.headers["Link"] = f'<{url_for("screener.screen", **args)}>; rel="next"'
+    return resp
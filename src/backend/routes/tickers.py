@@ -1,21 +1,73 @@
 # src/backend/routes/tickers.py
-import psycopg2
-from psycopg2.extras import RealDictCursor, Json
-from flask import Blueprint, jsonify, request
-from datetime import datetime, timedelta, timezone
-import yfinance as yf
-from config.settings import DATABASE_URL
+import hashlib
+import logging
+from functools import wraps
+from flask import Blueprint, Response, jsonify, request, url_for
+from services import autocomplete, chart_codec
+from services.db import get_conn
+from services.metrics import cache_result
+from services.price_history import get_bar_arrays, get_chart
+from services.response_cache import cache
+from services.ticker_service import (
+    compute_indicators, fetch_basic, fetch_basic_many, fetch_live_news, fetch_news_page,
+    record_access,
+)
+
+log = logging.getLogger(__name__)
 
 bp = Blueprint("tickers", __name__, url_prefix="/tickers")
 
-CACHE_TTL = timedelta(minutes=5)
+BATCH_MAX_SYMBOLS = 200
+NEWS_MAX_LIMIT = 100
+
+
+def cached(endpoint, negotiate=None):
+    """Serve 200 responses of a ``/<symbol>/...`` view from ``cache``.
 
-def get_conn():
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+    Hits return the stored bytes directly (``X-Cache: HIT``) without
+    touching the database or re-serializing. With ``negotiate`` (returns
+    the mimetype chosen for this request) each representation is cached
+    under its own key and responses carry ``Vary: Accept``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(symbol):
+            symbol = symbol.upper()
+            mimetype = negotiate() if negotiate else "application/json"
+            key = (endpoint, symbol, tuple(sorted(request.args.items())), mimetype)
+            body = cache.get(key)
+            cache_result(f"response_{endpoint}", body is not None)
+            if body is not None:
+                record_access(symbol)
+                resp = Response(body, mimetype=mimetype, headers={"X-Cache": "HIT"})
+            else:
+                generation = cache.generation(symbol)
+                resp = view(symbol)
+                if isinstance(resp, Response) and resp.status_code == 200:
+                    cache.put(key, resp.get_data(), generation)
+                    resp.headers["X-Cache"] = "MISS"
+            if negotiate and isinstance(resp, Response):
+                resp.vary.add("Accept")
+            return resp
+        return wrapper
+    return decorator
+
+
+def chart_mimetype():
+    """JSON unless ``Accept`` prefers one of the binary chart encodings."""
+    return request.accept_mimetypes.best_match(chart_codec.MIMETYPES,
+                                               default=chart_codec.JSON)
 
 @bp.route("", methods=["GET"])
 def list_tickers():
-    q = (request.args.get("search","") + "%").upper()
+    """Autocomplete against the in-memory master_tickers index."""
+    search = request.args.get("search", "")
+    try:
+        return jsonify(autocomplete.search(search, limit=10))
+    except Exception:
+        log.exception("autocomplete index unavailable; falling back to SQL")
+
+    q = (search + "%").upper()
     with get_conn() as conn, conn.cursor() as cur:
         cur.execute("""
           SELECT symbol, name
@@ -26,173 +78,93 @@ def list_tickers():
         """, (q,q))
         return jsonify(cur.fetchall())
 
-def fetch_basic(symbol):
-    with get_conn() as conn, conn.cursor() as cur:
-        # read whatever's in the DB
-        cur.execute("""
-            SELECT
-              symbol, name, exchange, currency,
-              market_cap, sector, industry,
-              full_time_employees, website, long_business_summary,
-              current_price, previous_close, open_price,
-              day_high, day_low, volume, avg_volume,
-              fifty_two_week_high, fifty_two_week_low,
-              trailing_pe, forward_pe, eps_ttm,
-              price_to_book, beta, dividend_rate, dividend_yield,
-              last_fetched_at
-            FROM public.tickers
-            WHERE symbol = %s
-        """, (symbol,))
-        row = cur.fetchone()
-
-        # single, UTC-aware staleness check
-        now_utc = datetime.now(timezone.utc)
-        last = row and row["last_fetched_at"]
-        needs_refresh = (
-            row is None
-            or last is None
-            # if last had no tzinfo, assume UTC
-            or (last if last.tzinfo else last.replace(tzinfo=timezone.utc))
-               < (now_utc - CACHE_TTL)
-        )
-
-        if needs_refresh:
-            info = yf.Ticker(symbol).info
-            # upsert every field you need
-            cur.execute("""
-                INSERT INTO public.tickers (
-                  symbol, name, exchange, currency,
-                  market_cap, sector, industry,
-                  full_time_employees, website, long_business_summary,
-                  current_price, previous_close, open_price,
-                  day_high, day_low, volume, avg_volume,
-                  fifty_two_week_high, fifty_two_week_low,
-                  trailing_pe, forward_pe, eps_ttm,
-                  price_to_book, beta, dividend_rate, dividend_yield,
-                  raw_info, updated_at, last_fetched_at
-                ) VALUES (
-                  %(symbol)s, %(longName)s, %(exchange)s, %(currency)s,
-                  %(marketCap)s, %(sector)s, %(industry)s,
-                  %(fullTimeEmployees)s, %(website)s, %(longBusinessSummary)s,
-                  %(currentPrice)s, %(previousClose)s, %(openPrice)s,
-                  %(dayHigh)s, %(dayLow)s, %(volume)s, %(averageVolume)s,
-                  %(fiftyTwoWeekHigh)s, %(fiftyTwoWeekLow)s,
-                  %(trailingPE)s, %(forwardPE)s, %(epsTrailingTwelveMonths)s,
-                  %(priceToBook)s, %(beta)s, %(dividendRate)s, %(dividendYield)s,
-                  %(raw_info)s, now(), now()
-                )
-                ON CONFLICT (symbol) DO UPDATE SET
-                  name                  = EXCLUDED.name,
-                  exchange              = EXCLUDED.exchange,
-                  currency              = EXCLUDED.currency,
-                  market_cap            = EXCLUDED.market_cap,
-                  sector                = EXCLUDED.sector,
-                  industry              = EXCLUDED.industry,
-                  full_time_employees   = EXCLUDED.full_time_employees,
-                  website               = EXCLUDED.website,
-                  long_business_summary = EXCLUDED.long_business_summary,
-                  current_price         = EXCLUDED.current_price,
-                  previous_close        = EXCLUDED.previous_close,
-                  open_price            = EXCLUDED.open_price,
-                  day_high              = EXCLUDED.day_high,
-                  day_low               = EXCLUDED.day_low,
-                  volume                = EXCLUDED.volume,
-                  avg_volume            = EXCLUDED.avg_volume,
-                  fifty_two_week_high   = EXCLUDED.fifty_two_week_high,
-                  fifty_two_week_low    = EXCLUDED.fifty_two_week_low,
-                  trailing_pe           = EXCLUDED.trailing_pe,
-                  forward_pe            = EXCLUDED.forward_pe,
-                  eps_ttm               = EXCLUDED.eps_ttm,
-                  price_to_book         = EXCLUDED.price_to_book,
-                  beta                  = EXCLUDED.beta,
-                  dividend_rate         = EXCLUDED.dividend_rate,
-                  dividend_yield        = EXCLUDED.dividend_yield,
-                  raw_info              = EXCLUDED.raw_info,
-                  updated_at            = now(),
-                  last_fetched_at       = now()
-                RETURNING
-                  symbol, name, exchange, currency,
-                  market_cap, sector, industry,
-                  full_time_employees, website, long_business_summary,
-                  current_price, previous_close, open_price,
-                  day_high, day_low, volume, avg_volume,
-                  fifty_two_week_high, fifty_two_week_low,
-                  trailing_pe, forward_pe, eps_ttm,
-                  price_to_book, beta, dividend_rate, dividend_yield
-            """, {
-                "symbol":                   symbol,
-                "longName":                 info.get("longName") or symbol,
-                "exchange":                 info.get("exchange"),
-                "currency":                 info.get("currency"),
-                "marketCap":                info.get("marketCap"),
-                "sector":                   info.get("sector"),
-                "industry":                 info.get("industry"),
-                "fullTimeEmployees":        info.get("fullTimeEmployees"),
-                "website":                  info.get("website"),
-                "longBusinessSummary":      info.get("longBusinessSummary"),
-                "currentPrice":             info.get("regularMarketPrice"),
-                "previousClose":            info.get("regularMarketPreviousClose"),
-                "openPrice":                info.get("regularMarketOpen"),
-                "dayHigh":                  info.get("dayHigh"),
-                "dayLow":                   info.get("dayLow"),
-                "volume":                   info.get("volume"),
-                "averageVolume":            info.get("averageVolume"),
-                "fiftyTwoWeekHigh":         info.get("fiftyTwoWeekHigh"),
-                "fiftyTwoWeekLow":          info.get("fiftyTwoWeekLow"),
-                "trailingPE":               info.get("trailingPE"),
-                "forwardPE":                info.get("forwardPE"),
-                "epsTrailingTwelveMonths":  info.get("epsTrailingTwelveMonths"),
-                "priceToBook":              info.get("priceToBook"),
-                "beta":                     info.get("beta"),
-                "dividendRate":             info.get("dividendRate"),
-                "dividendYield":            info.get("dividendYield"),
-                "raw_info":                 Json(info)
-            })
-            row = cur.fetchone()
-            conn.commit()
-        else:
-            # if we didn’t refresh, just wrap the existing row as a dict
-            row = dict(row)
-
-        return row
+@bp.route("/batch", methods=["GET"])
+def ticker_batch():
+    """Basic fields for many symbols: ``?symbols=AAPL,MSFT,...``."""
+    symbols = list(dict.fromkeys(
+        s.strip().upper() for s in request.args.get("symbols", "").split(",")
+        if s.strip()))
+    if not symbols:
+        return jsonify({"error": "`symbols` required"}), 400
+    if len(symbols) > BATCH_MAX_SYMBOLS:
+        return jsonify({"error": f"at most {BATCH_MAX_SYMBOLS} symbols"}), 400
+    return jsonify(fetch_basic_many(symbols))
 
 @bp.route("/<symbol>/basic", methods=["GET"])
+@cached("basic")
 def ticker_basic(symbol):
     return jsonify(fetch_basic(symbol))
 
 @bp.route("/<symbol>/news", methods=["GET"])
 def ticker_news(symbol):
-    news = yf.Ticker(symbol).news
-    return jsonify(news[:20])
+    """Stored articles, newest first: ``?limit=20&cursor=<next cursor>``.
+
+    The next page's cursor comes back in ``X-Next-Cursor`` and a ``Link``
+    header; ETag/Last-Modified let pollers revalidate with a cheap 304.
+    """
+    symbol = symbol.upper()
+    limit  = min(max(request.args.get("limit", 20, type=int), 1), NEWS_MAX_LIMIT)
+    cursor = request.args.get("cursor")
+    try:
+        items, next_cursor, last_modified = fetch_news_page(symbol, limit, cursor)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if not items and not cursor:
+        # nothing ingested for this symbol yet
+        return jsonify(fetch_live_news(symbol, limit))
+
+    resp = jsonify(items)
+    digest = hashlib.blake2b(digest_size=12)
+    for item in items:
+        digest.update(f"{item['article_id']}|".encode())
+    digest.update(str(last_modified).encode())
+    resp.set_etag(digest.hexdigest())
+    resp.last_modified = last_modified
+    resp.cache_control.no_cache = True
+    if next_cursor:
+        resp.headers["X-Next-Cursor"] = next_cursor
+        resp.headers["Link"] = (
+            f'<{url_for("tickers.ticker_news", symbol=symbol, limit=limit, cursor=next_cursor)}>; rel="next"')
+    return resp.make_conditional(request)
 
 @bp.route("/<symbol>/indicators", methods=["GET"])
+@cached("indicators")
 def ticker_indicators(symbol):
-    # compute your RSI/MACD/etc here
-    return jsonify({"rsi": 50, "macd": 0, "piotroski_score": 5})
+    return jsonify(compute_indicators(symbol))
 
 @bp.route("/<symbol>/chart", methods=["GET"])
+@cached("chart", negotiate=chart_mimetype)
 def ticker_chart(symbol):
-    """Return OHLC+volume arrays for the last 30 days."""
-    data = yf.download(symbol, period="1mo", interval="1d")
-
-    # if yfinance returns no data, return empty lists
-    if data.empty:
-        return jsonify({
-            "dates":   [],
-            "opens":   [],
-            "highs":   [],
-            "lows":    [],
-            "closes":  [],
-            "volumes": []
-        })
-
-    # Now extract each column as a numpy array, then list
-    return jsonify({
-        "dates":   data.index.strftime("%Y-%m-%d").tolist(),
-        "opens":   data["Open"].values.tolist(),
-        "highs":   data["High"].values.tolist(),
-        "lows":    data["Low"].values.tolist(),
-        "closes":  data["Close"].values.tolist(),
-        "volumes": data["Volume"].values.tolist(),
-    })
+    """Return OHLC+volume columns, e.g. ``?period=6mo&interval=1d``.
+
+    Served from the local price_bars store; only missing bars are fetched.
+    ``points=800`` downsamples to at most that many bars (``method=lttb``
+    for line charts, ``minmax`` for candles). ``Accept`` picks the body:
+    JSON arrays (default), packed binary columns or an Arrow stream (see
+    services/chart_codec.py).
+    """
+    period   = request.args.get("period", "1mo")
+    interval = request.args.get("interval", "1d")
+    points   = request.args.get("points")
+    method   = request.args.get("method", "lttb")
+    if points is not None:
+        try:
+            points = int(points)
+        except ValueError:
+            return jsonify({"error": "`points` must be an integer"}), 400
+        if points < chart_codec.MIN_POINTS:
+            return jsonify({"error": f"`points` must be at least {chart_codec.MIN_POINTS}"}), 400
+    if method not in chart_codec.DOWNSAMPLERS:
+        methods = ", ".join(chart_codec.DOWNSAMPLERS)
+        return jsonify({"error": f"`method` must be one of {methods}"}), 400
 
+    mimetype = chart_mimetype()
+    try:
+        if mimetype == chart_codec.JSON:
+            return jsonify(get_chart(symbol, period, interval, points, method))
+        bars = get_bar_arrays(symbol, period, interval)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    bars = chart_codec.downsample(bars, points, method)
+    return Response(chart_codec.ENCODERS[mimetype](bars), mimetype=mimetype)
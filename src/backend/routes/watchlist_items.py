@@ -1,9 +1,20 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from config.settings import DATABASE_URL
-import psycopg2
-import yfinance as yf
-from psycopg2.extras import RealDictCursor, Json
+import hashlib
+import json
+import time
+
+from flask import Blueprint, Response, jsonify, request, url_for
+from flask_jwt_extended import (
+    create_access_token, get_jwt, get_jwt_identity, get_jwt_request_location, jwt_required,
+)
+from psycopg2.errors import ForeignKeyViolation
+from services.alerts import notify_rules_changed
+from services.db import get_conn
+from config.settings import STREAM_MIN_INTERVAL, STREAM_HEARTBEAT, STREAM_TOKEN_TTL
+from services.price_history import interval_seconds, period_start
+from services.pricefeed import hub, quote_dict, quote_of
+from services.hydration import job_status, link_symbols, queue_hydration
+from services.ownership import cache as ownership_cache, owns_watchlist
+from services.ticker_service import compute_indicators_many
 
 # Blueprint at /watchlists/<watchlist_id>/tickers
 bp = Blueprint(
@@ -11,124 +22,102 @@ bp = Blueprint(
     url_prefix="/watchlists/<int:watchlist_id>/tickers"
 )
 
-def get_conn():
-    """Return a new psycopg2 connection that yields dict rows."""
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+BULK_MAX_SYMBOLS = 500
+
+
+def _add_symbols(watchlist_id, symbols):
+    """Ownership check, set-based link and hydration queueing (one commit).
+
+    ``None`` when the watchlist is not the user's, including one deleted
+    by another worker whose cached ownership has not expired here yet: the
+    inserts then hit the ``watchlists`` foreign key.
+    """
+    user_id = get_jwt_identity()
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            # ensure this watchlist belongs to the current user
+            if not owns_watchlist(watchlist_id, user_id, cur):
+                return None
+            result = link_symbols(cur, watchlist_id, symbols)
+
+        job = None
+        if result["missing"] or result["stale"]:
+            job = queue_hydration(watchlist_id, result["missing"], result["stale"])
+    except ForeignKeyViolation:
+        ownership_cache.forget(watchlist_id)
+        return None
+    return {**result, "job": job}
+
+
+def _accepted(watchlist_id, result):
+    job = result.pop("job")
+    if job is None:
+        return jsonify({**result, "job": None}), 200
+    status_url = url_for("items.hydration_status",
+                         watchlist_id=watchlist_id, job_id=job["id"])
+    resp = jsonify({**result, "job": job["id"], "status_url": status_url})
+    resp.headers["Location"] = status_url
+    return resp, 202
+
 
 @bp.route("", methods=["POST"])
 @jwt_required()
 def add_ticker(watchlist_id):
-    """Add (or refresh) a ticker in the DB, then link it to the watchlist."""
-    user_id = get_jwt_identity()
+    """Link one symbol; a missing or stale row is hydrated in the background.
+
+    204 when the ticker was already fresh, 202 + job handle otherwise.
+    """
     symbol  = (request.json.get("symbol") or "").upper().strip()
     if not symbol:
         return jsonify({"error": "`symbol` required"}), 400
 
-    with get_conn() as conn, conn.cursor() as cur:
-        # 0) ensure this watchlist belongs to the current user
-        cur.execute(
-            "SELECT 1 FROM public.watchlists WHERE id=%s AND user_id=%s",
-            (watchlist_id, user_id))
-        if not cur.fetchone():
-            return jsonify({"error": "watchlist not found"}), 404
-
-        # 1) upsert the ticker metadata in public.tickers
-        info = yf.Ticker(symbol).info
-        cur.execute("""
-            INSERT INTO public.tickers (
-                symbol, name, exchange, currency,
-                market_cap, sector, industry,
-                full_time_employees, website, long_business_summary,
-                current_price, previous_close, open_price,
-                day_high, day_low, volume, avg_volume,
-                fifty_two_week_high, fifty_two_week_low,
-                trailing_pe, forward_pe, eps_ttm,
-                price_to_book, beta, dividend_rate, dividend_yield,
-                raw_info,
-                created_at, updated_at, last_fetched_at
-            ) VALUES (
-                %(symbol)s, %(longName)s, %(exchange)s, %(currency)s,
-                %(marketCap)s, %(sector)s, %(industry)s,
-                %(fullTimeEmployees)s, %(website)s, %(longBusinessSummary)s,
-                %(currentPrice)s, %(previousClose)s, %(openPrice)s,
-                %(dayHigh)s, %(dayLow)s, %(volume)s, %(averageVolume)s,
-                %(fiftyTwoWeekHigh)s, %(fiftyTwoWeekLow)s,
-                %(trailingPE)s, %(forwardPE)s, %(epsTrailingTwelveMonths)s,
-                %(priceToBook)s, %(beta)s, %(dividendRate)s, %(dividendYield)s,
-                %(raw_info)s,
-                now(), now(), now()
-            )
-            ON CONFLICT (symbol) DO UPDATE SET
-                name                   = EXCLUDED.name,
-                exchange               = EXCLUDED.exchange,
-                currency               = EXCLUDED.currency,
-                market_cap             = EXCLUDED.market_cap,
-                sector                 = EXCLUDED.sector,
-                industry               = EXCLUDED.industry,
-                full_time_employees    = EXCLUDED.full_time_employees,
-                website                = EXCLUDED.website,
-                long_business_summary  = EXCLUDED.long_business_summary,
-                current_price          = EXCLUDED.current_price,
-                previous_close         = EXCLUDED.previous_close,
-                open_price             = EXCLUDED.open_price,
-                day_high               = EXCLUDED.day_high,
-                day_low                = EXCLUDED.day_low,
-                volume                 = EXCLUDED.volume,
-                avg_volume             = EXCLUDED.avg_volume,
-                fifty_two_week_high    = EXCLUDED.fifty_two_week_high,
-                fifty_two_week_low     = EXCLUDED.fifty_two_week_low,
-                trailing_pe            = EXCLUDED.trailing_pe,
-                forward_pe             = EXCLUDED.forward_pe,
-                eps_ttm                = EXCLUDED.eps_ttm,
-                price_to_book          = EXCLUDED.price_to_book,
-                beta                   = EXCLUDED.beta,
-                dividend_rate          = EXCLUDED.dividend_rate,
-                dividend_yield         = EXCLUDED.dividend_yield,
-                raw_info               = EXCLUDED.raw_info,
-                updated_at             = now(),
-                last_fetched_at        = now()
-            RETURNING id
-        """, {
-            "symbol":                     symbol,
-            "longName":                   info.get("longName") or symbol,
-            "exchange":                   info.get("exchange"),
-            "currency":                   info.get("currency"),
-            "marketCap":                  info.get("marketCap"),
-            "sector":                     info.get("sector"),
-            "industry":                   info.get("industry"),
-            "fullTimeEmployees":          info.get("fullTimeEmployees"),
-            "website":                    info.get("website"),
-            "longBusinessSummary":        info.get("longBusinessSummary"),
-            "currentPrice":               info.get("regularMarketPrice"),
-            "previousClose":              info.get("regularMarketPreviousClose"),
-            "openPrice":                  info.get("regularMarketOpen"),
-            "dayHigh":                    info.get("dayHigh"),
-            "dayLow":                     info.get("dayLow"),
-            "volume":                     info.get("volume"),
-            "averageVolume":              info.get("averageVolume"),
-            "fiftyTwoWeekHigh":           info.get("fiftyTwoWeekHigh"),
-            "fiftyTwoWeekLow":            info.get("fiftyTwoWeekLow"),
-            "trailingPE":                 info.get("trailingPE"),
-            "forwardPE":                  info.get("forwardPE"),
-            "epsTrailingTwelveMonths":    info.get("epsTrailingTwelveMonths"),
-            "priceToBook":                info.get("priceToBook"),
-            "beta":                       info.get("beta"),
-            "dividendRate":               info.get("dividendRate"),
-            "dividendYield":              info.get("dividendYield"),
-            "raw_info":                   Json(info)
-        })
-        ticker_id = cur.fetchone()["id"]
-        conn.commit()
+    result = _add_symbols(watchlist_id, [symbol])
+    if result is None:
+        return jsonify({"error": "watchlist not found"}), 404
+    if result["invalid"]:
+        return jsonify({"error": f"unknown symbol {symbol}"}), 400
+    if result["job"] is None:
+        return ("", 204)
+    return _accepted(watchlist_id, result)
 
-        # 2) link ticker → watchlist (skip if already linked)
-        cur.execute("""
-            INSERT INTO public.watchlist_items (watchlist_id, ticker_id)
-            VALUES (%s, %s)
-            ON CONFLICT (watchlist_id, ticker_id) DO NOTHING
-        """, (watchlist_id, ticker_id))
-        conn.commit()
 
-    return ("", 204)
+@bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def add_tickers_bulk(watchlist_id):
+    """Link many symbols at once: ``{"symbols": ["AAPL", "MSFT", ...]}``.
+
+    Symbols are validated against master_tickers; valid ones are linked in
+    one statement. Returns 202 with a job handle when rows still need
+    hydrating, 200 otherwise.
+    """
+    raw = (request.json or {}).get("symbols") or []
+    if not isinstance(raw, list):
+        return jsonify({"error": "`symbols` must be a list"}), 400
+    symbols = list(dict.fromkeys(
+        str(s).strip().upper() for s in raw if str(s).strip()))
+    if not symbols:
+        return jsonify({"error": "`symbols` required"}), 400
+    if len(symbols) > BULK_MAX_SYMBOLS:
+        return jsonify({"error": f"at most {BULK_MAX_SYMBOLS} symbols"}), 400
+
+    result = _add_symbols(watchlist_id, symbols)
+    if result is None:
+        return jsonify({"error": "watchlist not found"}), 404
+    return _accepted(watchlist_id, result)
+
+
+@bp.route("/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def hydration_status(watchlist_id, job_id):
+    """Progress of a background hydration job started by an add."""
+    user_id = get_jwt_identity()
+    # ensure ownership (usually answered from cache, without a connection)
+    if not owns_watchlist(watchlist_id, user_id):
+        return jsonify({"error":"Not found"}), 404
+    job = job_status(job_id)
+    if job is None or job["watchlist_id"] != watchlist_id:
+        return jsonify({"error":"Not found"}), 404
+    return jsonify(job)
 
 
 @bp.route("/<symbol>", methods=["DELETE"])
@@ -153,6 +142,15 @@ def remove_ticker(watchlist_id, symbol):
         if cur.rowcount == 0:
             return jsonify({"error": "Not found"}), 404
 
+        # rules only make sense for symbols on the watchlist
+        cur.execute("""
+            DELETE FROM public.alert_rules
+             WHERE watchlist_id = %s AND symbol = %s
+            RETURNING id
+        """, (watchlist_id, symbol))
+        for rule in cur.fetchall():
+            notify_rules_changed(cur, rule["id"])
+
         conn.commit()
         return ("", 204)
 
@@ -160,20 +158,183 @@ def remove_ticker(watchlist_id, symbol):
 @bp.route("", methods=["GET"])
 @jwt_required()
 def list_tickers(watchlist_id):
-    """Return all symbols, names & current_price for this watchlist."""
+    """Return all symbols, names & current_price for this watchlist.
+
+    See ``/overview`` for change %, day range and sparklines.
+    """
+    user_id = get_jwt_identity()
+    with get_conn() as conn, conn.cursor() as cur:
+        # ownership check folded into the join (see overview)
+        cur.execute("""
+            SELECT t.symbol, t.name, t.current_price
+              FROM public.watchlists w
+              LEFT JOIN public.watchlist_items wi ON wi.watchlist_id = w.id
+              LEFT JOIN public.tickers t ON t.id = wi.ticker_id
+             WHERE w.id = %s AND w.user_id = %s
+        """, (watchlist_id, user_id))
+        rows = cur.fetchall()
+    if not rows:
+        return jsonify({"error":"Not found"}), 404
+    return jsonify([r for r in rows if r["symbol"] is not None])
+
+
+OVERVIEW_COLUMNS = ("symbol", "name", "current_price", "previous_close", "change_pct",
+                    "day_low", "day_high", "volume", "sparkline")
+SPARKLINE_MAX_POINTS = 200
+
+
+@bp.route("/overview", methods=["GET"])
+@jwt_required()
+def overview(watchlist_id):
+    """Quotes, change %, day range and a sparkline per symbol, in one query.
+
+    ``?period=1mo&interval=1d&points=30`` controls the sparkline, which is
+    the last close of each of ``points`` equal buckets of stored bars (no
+    upstream fetch). The body is columnar: one array per field, aligned by
+    index, ordered by symbol. ETag lets pollers revalidate with a 304.
+    """
+    user_id  = get_jwt_identity()
+    interval = request.args.get("interval", "1d")
+    points   = min(max(request.args.get("points", 30, type=int), 2), SPARKLINE_MAX_POINTS)
+    try:
+        interval_seconds(interval)
+        start = period_start(request.args.get("period", "1mo"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    with get_conn() as conn, conn.cursor() as cur:
+        # ownership is part of the join: no rows at all means not found,
+        # one row with a NULL symbol means an empty watchlist
+        cur.execute("""
+            SELECT t.symbol, t.name, t.current_price, t.previous_close,
+                   100 * (t.current_price - t.previous_close)
+                       / NULLIF(t.previous_close, 0) AS change_pct,
+                   t.day_low, t.day_high, t.volume,
+                   s.closes AS sparkline
+              FROM public.watchlists w
+              LEFT JOIN public.watchlist_items wi ON wi.watchlist_id = w.id
+              LEFT JOIN public.tickers t ON t.id = wi.ticker_id
+              LEFT JOIN LATERAL (
+                  SELECT array_agg(close ORDER BY bucket) AS closes
+                    FROM (
+                      SELECT DISTINCT ON (bucket) bucket, close
+                        FROM (
+                          SELECT b.ts, b.close,
+                                 ntile(%(points)s) OVER (ORDER BY b.ts) AS bucket
+                            FROM public.price_bars b
+                           WHERE b.symbol = t.symbol
+                             AND b.interval = %(interval)s
+                             AND b.ts >= %(start)s
+                        ) bars
+                       ORDER BY bucket, ts DESC
+                    ) buckets
+              ) s ON true
+             WHERE w.id = %(watchlist_id)s AND w.user_id = %(user_id)s
+             ORDER BY t.symbol
+        """, {"points": points, "interval": interval, "start": start,
+              "watchlist_id": watchlist_id, "user_id": user_id})
+        rows = cur.fetchall()
+    if not rows:
+        return jsonify({"error":"Not found"}), 404
+
+    rows = [r for r in rows if r["symbol"] is not None]
+    body = {c: [(r[c] or []) if c == "sparkline" else r[c] for r in rows]
+            for c in OVERVIEW_COLUMNS}
+    resp = jsonify(body)
+    resp.set_etag(hashlib.blake2b(resp.get_data(), digest_size=12).hexdigest())
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+
+@bp.route("/indicators", methods=["GET"])
+@jwt_required()
+def list_indicators(watchlist_id):
+    """Latest technical indicators for every symbol in this watchlist."""
     user_id = get_jwt_identity()
     with get_conn() as conn, conn.cursor() as cur:
         # ensure ownership
-        cur.execute(
-            "SELECT 1 FROM public.watchlists WHERE id=%s AND user_id=%s",
-            (watchlist_id, user_id))
-        if not cur.fetchone():
+        if not owns_watchlist(watchlist_id, user_id, cur):
             return jsonify({"error":"Not found"}), 404
 
         cur.execute("""
-            SELECT t.symbol, t.name, t.current_price
+            SELECT DISTINCT t.symbol
               FROM public.watchlist_items wi
               JOIN public.tickers t ON t.id = wi.ticker_id
              WHERE wi.watchlist_id = %s
         """, (watchlist_id,))
-        return jsonify(cur.fetchall())
+        symbols = [r["symbol"] for r in cur.fetchall()]
+
+    return jsonify(compute_indicators_many(symbols) if symbols else {})
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@bp.route("/stream/token", methods=["POST"])
+@jwt_required()
+def stream_token(watchlist_id):
+    """Short-lived token for ``/stream?jwt=<token>``, valid for this watchlist only."""
+    user_id = get_jwt_identity()
+    if not owns_watchlist(watchlist_id, user_id):
+        return jsonify({"error":"Not found"}), 404
+    token = create_access_token(
+        identity=user_id, expires_delta=STREAM_TOKEN_TTL,
+        additional_claims={"scope": "stream", "watchlist_id": watchlist_id})
+    return jsonify({"token": token,
+                    "expires_in": int(STREAM_TOKEN_TTL.total_seconds())})
+
+
+@bp.route("/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_prices(watchlist_id):
+    """Server-Sent Events: a snapshot, then only the prices that change.
+
+    EventSource cannot set headers, so ``?jwt=`` is accepted here, but only
+    with a token from ``POST .../stream/token`` (STREAM_TOKEN_TTL, scoped
+    to this watchlist) so full access tokens stay out of URLs and logs.
+    Ownership and the symbol list are checked once per connection;
+    reconnect (with a fresh token) after editing the watchlist.
+    """
+    claims = get_jwt()
+    if get_jwt_request_location() == "query_string" and (
+            claims.get("scope") != "stream" or claims.get("watchlist_id") != watchlist_id):
+        return jsonify({"error":"?jwt= needs a token from POST .../stream/token"}), 401
+    user_id = get_jwt_identity()
+    with get_conn() as conn, conn.cursor() as cur:
+        # ensure ownership
+        if not owns_watchlist(watchlist_id, user_id, cur):
+            return jsonify({"error":"Not found"}), 404
+
+        cur.execute("""
+            SELECT t.symbol, t.current_price, t.previous_close,
+                   t.day_high, t.day_low, t.volume
+              FROM public.watchlist_items wi
+              JOIN public.tickers t ON t.id = wi.ticker_id
+             WHERE wi.watchlist_id = %s
+        """, (watchlist_id,))
+        snapshot = {r["symbol"]: quote_of(r) for r in cur.fetchall()}
+
+    def events():
+        sent = dict(snapshot)
+        with hub.subscribe(snapshot) as sub:
+            yield _sse("snapshot", {s: quote_dict(q) for s, q in snapshot.items()})
+            last_push = time.monotonic()
+            while True:
+                # throttle: ticks arriving meanwhile coalesce in the subscription
+                wait = STREAM_MIN_INTERVAL - (time.monotonic() - last_push)
+                if wait > 0:
+                    time.sleep(wait)
+                changed = {s: q for s, q in sub.get(STREAM_HEARTBEAT).items()
+                           if sent.get(s) != q}
+                if changed:
+                    sent.update(changed)
+                    yield _sse("prices", {s: quote_dict(q) for s, q in changed.items()})
+                    last_push = time.monotonic()
+                else:
+                    yield ": keep-alive\n\n"
+
+    return Response(events(), mimetype="text/event-stream", headers={
+        "Cache-Control":     "no-cache",
+        "X-Accel-Buffering": "no",
+    })
@@ -1,15 +1,12 @@
 # src/backend/routes/watchlists.py
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from config.settings import DATABASE_URL
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from services.alerts import notify_rules_changed
+from services.db import get_conn
+from services.ownership import cache as ownership_cache
 
 bp = Blueprint("watchlists", __name__, url_prefix="/watchlists")
 
-def get_conn():
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
-
 @bp.route("", methods=["GET"])
 @jwt_required()
 def list_watchlists():
@@ -64,11 +61,23 @@ def update_watchlist(watchlist_id):
 def delete_watchlist(watchlist_id):
     user_id = get_jwt_identity()
     with get_conn() as conn, conn.cursor() as cur:
+        # delete its alert rules explicitly (rather than by cascade) so the
+        # evaluator can be told to drop them
+        cur.execute("""
+            DELETE FROM public.alert_rules r
+             USING public.watchlists w
+             WHERE r.watchlist_id = w.id AND w.id = %s AND w.user_id = %s
+            RETURNING r.id
+        """, (watchlist_id, user_id))
+        rule_ids = [r["id"] for r in cur.fetchall()]
         cur.execute(
           "DELETE FROM public.watchlists WHERE id=%s AND user_id=%s",
           (watchlist_id, user_id)
         )
         if cur.rowcount == 0:
             return jsonify({"error":"Not found"}), 404
+        for rule_id in rule_ids:
+            notify_rules_changed(cur, rule_id)
         conn.commit()
-        return "", 204
+    ownership_cache.forget(watchlist_id)
+    return "", 204
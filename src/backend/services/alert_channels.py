@@ -0,0 +1,317 @@
+# src/backend/services/alert_channels.py
+"""Outbound alert delivery: pluggable channels behind a batching outbox.
+
+A channel has a ``name`` and ``send(target, texts)``, which delivers
+several alert lines to one destination (webhook URL, e-mail address,
+phone number) in as few upstream calls as it can. It raises
+``DeliveryError`` on failure; ``delivered`` says how many leading texts
+did go out, so they are not sent twice.
+
+``Outbox.put`` only queues. A worker thread flushes every
+``ALERT_FLUSH_INTERVAL`` (or as soon as ``ALERT_BATCH_SIZE`` messages are
+waiting), groups the batch by ``(channel, target)`` and retries transient
+failures with exponential backoff, up to ``ALERT_MAX_ATTEMPTS``.
+"""
+import heapq
+import itertools
+import logging
+import smtplib
+import threading
+import time
+from collections import deque, namedtuple
+from email.message import EmailMessage
+from urllib.parse import urlsplit
+
+import requests
+
+from config.settings import (
+    ALERT_BATCH_SIZE, ALERT_EMAIL_FROM, ALERT_FLUSH_INTERVAL, ALERT_MAX_ATTEMPTS,
+    ALERT_RETRY_BACKOFF, SMTP_HOST, SMTP_PASSWORD, SMTP_PORT, SMTP_USER,
+    TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_FROM,
+)
+
+log = logging.getLogger(__name__)
+
+Message = namedtuple("Message", "channel target text rule_id")
+
+
+class DeliveryError(Exception):
+    def __init__(self, message, retryable=True, retry_after=None, delivered=0):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+        self.delivered = delivered
+
+
+def _chunks(texts, max_chars):
+    """Group lines into newline-joined bodies of at most ``max_chars``."""
+    chunk, size = [], 0
+    for text in texts:
+        text = text[:max_chars]
+        if chunk and size + 1 + len(text) > max_chars:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(text)
+        size += len(text) + 1
+    if chunk:
+        yield chunk
+
+
+def _http_error(resp, delivered):
+    if resp.status_code == 429:
+        try:
+            retry_after = float(resp.json().get("retry_after", 1))
+        except ValueError:
+            retry_after = float(resp.headers.get("Retry-After", 1))
+        return DeliveryError("rate limited", retry_after=retry_after, delivered=delivered)
+    return DeliveryError(f"HTTP {resp.status_code}", retryable=resp.status_code >= 500,
+                         delivered=delivered)
+
+
+class StubSink:
+    """Keeps every batch in ``sent``; the next ``fail`` sends raise.
+
+    For tests: pass it to ``Outbox`` directly. It is not in ``CHANNELS``,
+    so rules cannot select it and the evaluator never builds one.
+    """
+
+    name = "stub"
+
+    def __init__(self, fail=0):
+        self.sent = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def send(self, target, texts):
+        with self._lock:
+            if self.fail:
+                self.fail -= 1
+                raise DeliveryError("stub failure")
+            self.sent.append((target, list(texts)))
+
+
+DISCORD_HOSTS = {"discord.com", "discordapp.com", "canary.discord.com", "ptb.discord.com"}
+
+
+def is_discord_webhook(url):
+    """``https://discord.com/api/webhooks/...`` (or another Discord host)."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return False
+    return (parts.scheme == "https" and parts.hostname in DISCORD_HOSTS
+            and parts.port is None and parts.username is None
+            and parts.path.startswith("/api/webhooks/"))
+
+
+class DiscordWebhook:
+    """Posts to the rule's Discord webhook URL, 2000 characters per message."""
+
+    name = "discord"
+    MAX_CHARS = 2000
+
+    def __init__(self, session=None, timeout=5):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    @classmethod
+    def configured(cls):
+        return True
+
+    def send(self, target, texts):
+        if not is_discord_webhook(target):
+            raise DeliveryError(f"not a Discord webhook: {target}", retryable=False)
+        delivered = 0
+        for chunk in _chunks(texts, self.MAX_CHARS):
+            try:
+                resp = self.session.post(target, json={"content": "\n".join(chunk)},
+                                         timeout=self.timeout)
+            except requests.RequestException as exc:
+                raise DeliveryError(str(exc), delivered=delivered) from exc
+            if resp.status_code >= 400:
+                raise _http_error(resp, delivered)
+            delivered += len(chunk)
+
+
+class EmailChannel:
+    """One digest e-mail per recipient and batch, over SMTP (STARTTLS when
+    credentials are set)."""
+
+    name = "email"
+
+    @classmethod
+    def configured(cls):
+        return bool(SMTP_HOST)
+
+    def send(self, target, texts):
+        msg = EmailMessage()
+        msg["From"] = ALERT_EMAIL_FROM
+        msg["To"] = target
+        msg["Subject"] = texts[0] if len(texts) == 1 else f"{len(texts)} price alerts"
+        msg.set_content("\n".join(texts))
+        try:
+            with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10) as smtp:
+                if SMTP_USER:
+                    smtp.starttls()
+                    smtp.login(SMTP_USER, SMTP_PASSWORD)
+                smtp.send_message(msg)
+        except smtplib.SMTPRecipientsRefused as exc:
+            raise DeliveryError(f"recipient refused: {target}", retryable=False) from exc
+        except (smtplib.SMTPException, OSError) as exc:
+            raise DeliveryError(str(exc)) from exc
+
+
+class SmsChannel:
+    """Twilio Messages API; one SMS (up to 1600 characters) per batch."""
+
+    name = "sms"
+    MAX_CHARS = 1600
+
+    def __init__(self, session=None, timeout=5):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    @classmethod
+    def configured(cls):
+        return bool(TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN and TWILIO_FROM)
+
+    def send(self, target, texts):
+        url = f"https://api.twilio.com/2010-04-01/Accounts/{TWILIO_ACCOUNT_SID}/Messages.json"
+        delivered = 0
+        for chunk in _chunks(texts, self.MAX_CHARS):
+            try:
+                resp = self.session.post(
+                    url, auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN), timeout=self.timeout,
+                    data={"From": TWILIO_FROM, "To": target, "Body": "\n".join(chunk)})
+            except requests.RequestException as exc:
+                raise DeliveryError(str(exc), delivered=delivered) from exc
+            if resp.status_code >= 400:
+                raise _http_error(resp, delivered)
+            delivered += len(chunk)
+
+
+CHANNELS = {c.name: c for c in (DiscordWebhook, EmailChannel, SmsChannel)}
+
+
+def available():
+    """Names of the channels this deployment can deliver through."""
+    return sorted(name for name, cls in CHANNELS.items() if cls.configured())
+
+
+def build_channels():
+    return [CHANNELS[name]() for name in available()]
+
+
+class Outbox:
+    """Batched, retrying delivery queue shared by every channel."""
+
+    def __init__(self, channels, batch_size=ALERT_BATCH_SIZE,
+                 flush_interval=ALERT_FLUSH_INTERVAL, max_attempts=ALERT_MAX_ATTEMPTS,
+                 backoff=ALERT_RETRY_BACKOFF, clock=time.monotonic):
+        self.channels = {c.name: c for c in channels}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.clock = clock
+        self._queue = deque()    # (message, attempts)
+        self._retries = []       # heap of (due, seq, message, attempts)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self.counts = {"queued": 0, "sent": 0, "retried": 0, "dropped": 0, "batches": 0}
+
+    def put(self, message):
+        with self._cond:
+            self._queue.append((message, 0))
+            self.counts["queued"] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+
+    def _take(self):
+        now = self.clock()
+        with self._cond:
+            batch = []
+            while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+                _, _, message, attempts = heapq.heappop(self._retries)
+                batch.append((message, attempts))
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            return batch
+
+    def flush(self):
+        """Send one batch; returns the number of messages delivered."""
+        batch = self._take()
+        groups = {}
+        for message, attempts in batch:
+            groups.setdefault((message.channel, message.target), []).append((message, attempts))
+
+        sent = 0
+        for (name, target), items in groups.items():
+            channel = self.channels.get(name)
+            if channel is None:
+                log.warning("no %r channel configured; dropping %d alerts", name, len(items))
+                self._count("dropped", len(items))
+                continue
+            self._count("batches", 1)
+            try:
+                channel.send(target, [m.text for m, _ in items])
+                sent += len(items)
+            except DeliveryError as exc:
+                sent += exc.delivered
+                self._failed(name, target, items[exc.delivered:], exc)
+            except Exception as exc:
+                log.exception("%s channel crashed", name)
+                self._failed(name, target, items, DeliveryError(str(exc)))
+        self._count("sent", sent)
+        return sent
+
+    def _failed(self, name, target, items, exc):
+        now = self.clock()
+        with self._cond:
+            for message, attempts in items:
+                attempts += 1
+                if not exc.retryable or attempts >= self.max_attempts:
+                    log.warning("giving up on %s alert to %s after %d attempts: %s",
+                                name, target, attempts, exc)
+                    self.counts["dropped"] += 1
+                    continue
+                delay = exc.retry_after if exc.retry_after is not None else self.backoff ** attempts
+                heapq.heappush(self._retries, (now + delay, next(self._seq), message, attempts))
+                self.counts["retried"] += 1
+
+    def _count(self, key, n):
+        with self._cond:
+            self.counts[key] += n
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue) + len(self._retries)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping and not self._queue:
+                    return
+                if len(self._queue) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+            while self.flush():
+                pass
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="alert-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=10):
+        """Flush what is queued (retries still backing off are dropped) and stop."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {**self.counts, "pending": len(self._queue) + len(self._retries)}
@@ -0,0 +1,355 @@
+# src/backend/services/alerts.py
+"""Evaluate price-alert rules against live quotes.
+
+A rule (``public.alert_rules``) watches one metric of one symbol and fires
+when the metric *crosses* its threshold between two consecutive ticks:
+
+    price_above / price_below    last price
+    pct_above   / pct_below      % change vs. previous close
+    rsi_above   / rsi_below      RSI(14) of the daily bars, with today's bar
+                                 revised by the live price in O(1); the bars
+                                 load in the background when the rule is
+                                 added, and the rule is quiet until then
+
+Each ``(symbol, metric)`` keeps its thresholds in a ``ThresholdIndex``:
+two sorted arrays, one for upward and one for downward crossings. A tick
+from ``prev`` to ``new`` fires exactly the thresholds in between, found
+with two bisections, so evaluation is O(log n + hits) however many rules
+a symbol has. A rule fires at most once per ``ALERT_COOLDOWN``.
+
+Run a single evaluator (``scripts/run_alerts.py``): it listens to the same
+``NOTIFY ticker_quotes`` feed as the web workers, picks up rule edits from
+``NOTIFY alert_rules_changed`` and hands alerts to the ``Outbox``.
+"""
+import json
+import logging
+import select
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timezone
+
+import psycopg2
+
+from config.settings import ALERT_COOLDOWN, DATABASE_URL
+from services.alert_channels import Message
+from services.db import get_conn
+from services.indicators import IndicatorState
+from services.price_history import get_bars
+from services.pricefeed import CHANNEL as QUOTES_CHANNEL, QUOTE_FIELDS, quote_dict, quote_of
+
+log = logging.getLogger(__name__)
+
+RULES_CHANNEL = "alert_rules_changed"
+
+# kind -> (metric, fires on an upward crossing)
+KINDS = {
+    "price_above": ("price", True),
+    "price_below": ("price", False),
+    "pct_above":   ("change_pct", True),
+    "pct_below":   ("change_pct", False),
+    "rsi_above":   ("rsi", True),
+    "rsi_below":   ("rsi", False),
+}
+RULE_COLUMNS = "id, user_id, watchlist_id, symbol, kind, threshold, channel, target, last_triggered_at"
+RSI_SEED_RETRY = 60.0   # seconds before a failed RSI history load is retried
+
+
+class ThresholdIndex:
+    """Sorted thresholds of one metric of one symbol, split by direction."""
+
+    __slots__ = ("up", "up_ids", "down", "down_ids")
+
+    def __init__(self):
+        self.up, self.up_ids = [], []
+        self.down, self.down_ids = [], []
+
+    def _side(self, upward):
+        return (self.up, self.up_ids) if upward else (self.down, self.down_ids)
+
+    def add(self, threshold, rule_id, upward):
+        keys, ids = self._side(upward)
+        i = bisect_right(keys, threshold)
+        keys.insert(i, threshold)
+        ids.insert(i, rule_id)
+
+    def remove(self, threshold, rule_id, upward):
+        keys, ids = self._side(upward)
+        i = bisect_left(keys, threshold)
+        while i < len(keys) and keys[i] == threshold:
+            if ids[i] == rule_id:
+                del keys[i], ids[i]
+                return
+            i += 1
+
+    def crossed(self, prev, new):
+        """Rule ids whose threshold lies between ``prev`` and ``new``."""
+        if new > prev:      # fires for prev < t <= new
+            return self.up_ids[bisect_right(self.up, prev):bisect_right(self.up, new)]
+        if new < prev:      # fires for new <= t < prev
+            return self.down_ids[bisect_left(self.down, new):bisect_left(self.down, prev)]
+        return []
+
+    def __len__(self):
+        return len(self.up) + len(self.down)
+
+
+def describe(rule, value):
+    metric, upward = KINDS[rule["kind"]]
+    direction = "above" if upward else "below"
+    if metric == "price":
+        what, fmt = "price", "{:,.2f}"
+    elif metric == "change_pct":
+        what, fmt = "daily change", "{:+.2f}%"
+    else:
+        what, fmt = "RSI", "{:.1f}"
+    return (f"{rule['symbol']} {what} crossed {direction} {fmt.format(rule['threshold'])} "
+            f"(now {fmt.format(value)})")
+
+
+class AlertEngine:
+    """In-memory rule index; ``on_quotes`` evaluates ticks and queues alerts."""
+
+    def __init__(self, outbox, cooldown=ALERT_COOLDOWN, history=None, clock=time.monotonic):
+        self.outbox = outbox
+        self.cooldown = cooldown
+        self.clock = clock
+        # daily bars for RSI seeding: (ts, opens, highs, lows, closes, volumes)
+        self.history = history or (lambda s: get_bars(s, period="1y", interval="1d"))
+        self.rules = {}      # rule id -> rule dict
+        self._index = {}     # (symbol, metric) -> ThresholdIndex
+        self._last = {}      # (symbol, metric) -> last seen value
+        self._rsi = {}       # symbol -> IndicatorState, once seeded
+        self._seeding = {}   # symbol -> Future of the history load
+        self._seed_failed = {}   # symbol -> clock() of the last failed load
+        self._fired = {}     # rule id -> clock() of the last alert
+        self._lock = threading.Lock()
+        # history loads may go upstream: never under the lock
+        self._seeder = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rsi-seed")
+        self.evaluated = 0
+        self.fired = 0
+
+    def add(self, rule):
+        metric, upward = KINDS[rule["kind"]]
+        with self._lock:
+            self._remove(rule["id"])
+            rule = dict(rule, threshold=float(rule["threshold"]))
+            self.rules[rule["id"]] = rule
+            key = (rule["symbol"], metric)
+            self._index.setdefault(key, ThresholdIndex()).add(rule["threshold"], rule["id"], upward)
+            if rule.get("last_triggered_at") is not None:
+                ago = (datetime.now(timezone.utc) - rule["last_triggered_at"]).total_seconds()
+                self._fired[rule["id"]] = self.clock() - ago
+            if metric == "rsi":
+                self._seed_rsi(rule["symbol"])
+
+    def remove(self, rule_id):
+        with self._lock:
+            self._remove(rule_id)
+
+    def _remove(self, rule_id):
+        rule = self.rules.pop(rule_id, None)
+        if rule is None:
+            return
+        metric, upward = KINDS[rule["kind"]]
+        key = (rule["symbol"], metric)
+        index = self._index[key]
+        index.remove(rule["threshold"], rule_id, upward)
+        self._fired.pop(rule_id, None)
+        if not index:
+            del self._index[key]
+            self._last.pop(key, None)
+            if metric == "rsi":
+                self._rsi.pop(rule["symbol"], None)
+                self._seed_failed.pop(rule["symbol"], None)
+
+    def load(self, rules):
+        with self._lock:
+            self.rules, self._index, self._last, self._rsi = {}, {}, {}, {}
+            self._seed_failed = {}
+        for rule in rules:
+            self.add(rule)
+
+    def symbols(self):
+        with self._lock:
+            return {symbol for symbol, _ in self._index}
+
+    def _seed_rsi(self, symbol):
+        """Start loading ``symbol``'s daily history unless it is loaded or loading.
+
+        Called with the lock held; the load itself runs on the seeder pool.
+        """
+        if symbol in self._rsi or symbol in self._seeding:
+            return
+        failed = self._seed_failed.get(symbol)
+        if failed is not None and self.clock() - failed < RSI_SEED_RETRY:
+            return
+        self._seeding[symbol] = self._seeder.submit(self._load_rsi, symbol)
+
+    def _load_rsi(self, symbol):
+        state = None
+        try:
+            state = IndicatorState()
+            ts, _, highs, lows, closes, volumes = self.history(symbol)
+            for i, c in enumerate(closes):
+                state.push(ts[i], highs[i] or c, lows[i] or c, c, volumes[i] or 0)
+        except Exception:
+            log.exception("RSI history for %s unavailable", symbol)
+            state = None
+        with self._lock:
+            self._seeding.pop(symbol, None)
+            if state is None:
+                self._seed_failed[symbol] = self.clock()
+            elif (symbol, "rsi") in self._index:
+                self._seed_failed.pop(symbol, None)
+                self._rsi[symbol] = state
+        return state
+
+    def _live_rsi(self, symbol, q):
+        """RSI with today's daily bar revised to the live quote; ``None``
+        until the symbol's history has been loaded."""
+        state = self._rsi.get(symbol)
+        if state is None:
+            self._seed_rsi(symbol)
+            return None
+        price = q["current_price"]
+        high, low = q["day_high"] or price, q["day_low"] or price
+        today = datetime.now(timezone.utc).date()
+        if state.last_ts is not None and state.last_ts.date() == today:
+            values = state.revise(state.last_ts, high, low, price, q["volume"] or 0)
+        else:
+            values = state.push(datetime.combine(today, dtime(), timezone.utc),
+                                high, low, price, q["volume"] or 0)
+        return values.get("rsi")
+
+    def evaluate(self, quotes, fire=True):
+        """Rules crossed by ``{symbol: quote}``, as ``[(rule, value)]``.
+
+        With ``fire=False`` the quotes only prime the last-seen values.
+        """
+        hits = []
+        now = self.clock()
+        with self._lock:
+            for symbol, quote in quotes.items():
+                q = quote_dict(quote)
+                if q["current_price"] is None:
+                    continue
+                for metric in ("price", "change_pct", "rsi"):
+                    key = (symbol, metric)
+                    index = self._index.get(key)
+                    if index is None:
+                        continue
+                    if metric == "price":
+                        new = q["current_price"]
+                    elif metric == "change_pct":
+                        new = q["change_pct"]
+                    else:
+                        new = self._live_rsi(symbol, q)
+                    if new is None:
+                        continue
+                    prev, self._last[key] = self._last.get(key), new
+                    self.evaluated += 1
+                    if prev is None or not fire:
+                        continue
+                    for rule_id in index.crossed(prev, new):
+                        last = self._fired.get(rule_id)
+                        if last is not None and now - last < self.cooldown:
+                            continue
+                        self._fired[rule_id] = now
+                        hits.append((self.rules[rule_id], new))
+            self.fired += len(hits)
+        return hits
+
+    def on_quotes(self, quotes):
+        """Evaluate a tick and queue an outbound message per alert."""
+        hits = self.evaluate(quotes)
+        for rule, value in hits:
+            self.outbox.put(Message(rule["channel"], rule["target"],
+                                    describe(rule, value), rule["id"]))
+        return hits
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rules":     len(self.rules),
+                "indexes":   len(self._index),
+                "evaluated": self.evaluated,
+                "fired":     self.fired,
+            }
+
+
+def load_rules(cur, rule_id=None):
+    cur.execute(f"""
+        SELECT {RULE_COLUMNS} FROM public.alert_rules
+         WHERE active AND (%s::bigint IS NULL OR id = %s)
+    """, (rule_id, rule_id))
+    return cur.fetchall()
+
+
+def current_quotes(cur, symbols):
+    cur.execute(f"""
+        SELECT symbol, {", ".join(QUOTE_FIELDS)} FROM public.tickers
+         WHERE symbol = ANY(%s)
+    """, (list(symbols),))
+    return {r["symbol"]: quote_of(r) for r in cur.fetchall()}
+
+
+def notify_rules_changed(cur, rule_id):
+    """Tell the evaluator to reload one rule (sent on commit)."""
+    cur.execute("SELECT pg_notify(%s, %s)", (RULES_CHANNEL, str(rule_id)))
+
+
+def _mark_triggered(hits):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("UPDATE public.alert_rules SET last_triggered_at = now() WHERE id = ANY(%s)",
+                    ([rule["id"] for rule, _ in hits],))
+
+
+def _reload_rule(engine, rule_id):
+    with get_conn() as conn, conn.cursor() as cur:
+        rows = load_rules(cur, rule_id)
+        if not rows:
+            engine.remove(rule_id)
+            return
+        engine.add(rows[0])
+        engine.evaluate(current_quotes(cur, [rows[0]["symbol"]]), fire=False)
+
+
+def run_forever(engine):
+    """Load every active rule, then evaluate ``NOTIFY ticker_quotes`` ticks."""
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {QUOTES_CHANNEL}")
+                cur.execute(f"LISTEN {RULES_CHANNEL}")
+            # (re)load after LISTEN so no edit falls in between
+            with get_conn() as c, c.cursor() as cur:
+                engine.load(load_rules(cur))
+                engine.evaluate(current_quotes(cur, engine.symbols()), fire=False)
+            log.info("alert engine: %s", engine.stats())
+            while True:
+                if not select.select([conn], [], [], 60)[0]:
+                    continue
+                conn.poll()
+                for note in conn.notifies:
+                    if note.channel == RULES_CHANNEL:
+                        _reload_rule(engine, int(note.payload))
+                        continue
+                    try:
+                        quotes = json.loads(note.payload)
+                    except ValueError:
+                        log.warning("bad %s payload: %.80s", QUOTES_CHANNEL, note.payload)
+                        continue
+                    hits = engine.on_quotes(quotes)
+                    if hits:
+                        _mark_triggered(hits)
+                conn.notifies.clear()
+        except Exception:
+            log.exception("alert listener failed; retrying in 30s")
+            if conn is not None:
+                conn.close()
+            time.sleep(30)
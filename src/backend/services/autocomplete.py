@@ -0,0 +1,181 @@
+# src/backend/services/autocomplete.py
+"""In-process ticker autocomplete over ``public.master_tickers``.
+
+The whole listing is loaded once into a compact sorted-array index over
+symbols and name words; a keystroke is a couple of binary searches instead
+of an ``ILIKE ... OR ILIKE`` round trip to Postgres. The index reloads
+when ``scripts/ingest_master_nasdaq.py`` sends ``NOTIFY
+master_tickers_changed`` and otherwise every AUTOCOMPLETE_RELOAD_INTERVAL
+seconds (which also picks up popularity changes).
+"""
+import logging
+import re
+import select
+import threading
+import time
+from bisect import bisect_left
+
+import psycopg2
+
+from config.settings import DATABASE_URL, AUTOCOMPLETE_RELOAD_INTERVAL
+from services.db import get_conn
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "master_tickers_changed"
+_WORD_RE = re.compile(r"[A-Z0-9]+")
+_CACHE_SIZE = 4096
+
+
+class SymbolIndex:
+    """Sorted-array prefix index with ranked results.
+
+    Ranking: exact symbol match, then symbol-prefix matches, then
+    name-word matches; ties broken by popularity (watchlist count), then
+    shorter symbol, then alphabetically. An empty query lists the first
+    symbols alphabetically, as the SQL lookup always did.
+    """
+
+    def __init__(self, rows):
+        self.symbols = []
+        self.names = []
+        self.popularity = []
+        sym_keys, word_keys = [], []
+        for i, (symbol, name, popularity) in enumerate(rows):
+            symbol = symbol.upper()
+            self.symbols.append(symbol)
+            self.names.append(name)
+            self.popularity.append(popularity or 0)
+            sym_keys.append((symbol, i))
+            upper = (name or "").upper()
+            # whole name (for multi-word prefixes) plus every word in it
+            keys = {upper, *_WORD_RE.findall(upper)}
+            word_keys.extend((k, i) for k in keys if k)
+        sym_keys.sort()
+        word_keys.sort()
+        self._sym_keys = [k for k, _ in sym_keys]
+        self._sym_ids = [i for _, i in sym_keys]
+        self._word_keys = [k for k, _ in word_keys]
+        self._word_ids = [i for _, i in word_keys]
+        self._cache = {}
+        # single-character prefixes match the most rows; rank them up front
+        for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789":
+            self.search(c)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    @staticmethod
+    def _range(keys, prefix):
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + "\uffff", lo)
+        return lo, hi
+
+    def search(self, query, limit=10):
+        q = query.strip().upper()
+        if not q:
+            return [{"symbol": self.symbols[i], "name": self.names[i]}
+                    for i in self._sym_ids[:limit]]
+        key = (q, limit)
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+
+        ranked = {}
+        lo, hi = self._range(self._sym_keys, q)
+        for i in self._sym_ids[lo:hi]:
+            ranked[i] = 0 if self.symbols[i] == q else 1
+        lo, hi = self._range(self._word_keys, q)
+        for i in self._word_ids[lo:hi]:
+            ranked.setdefault(i, 2)
+
+        best = sorted(ranked, key=lambda i: (ranked[i], -self.popularity[i],
+                                             len(self.symbols[i]), self.symbols[i]))[:limit]
+        result = [{"symbol": self.symbols[i], "name": self.names[i]} for i in best]
+        if len(self._cache) >= _CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+
+def load_index():
+    """Build a fresh index from master_tickers plus watchlist popularity."""
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT m.symbol, m.name, COALESCE(p.watchers, 0) AS popularity
+              FROM public.master_tickers m
+              LEFT JOIN (
+                SELECT t.symbol, COUNT(*) AS watchers
+                  FROM public.watchlist_items wi
+                  JOIN public.tickers t ON t.id = wi.ticker_id
+                 GROUP BY t.symbol
+              ) p ON p.symbol = m.symbol
+        """)
+        rows = [(r["symbol"], r["name"], r["popularity"]) for r in cur.fetchall()]
+    return SymbolIndex(rows)
+
+
+_index = None
+_index_lock = threading.Lock()
+_listener = None
+
+
+def reload_index():
+    global _index
+    started = time.monotonic()
+    index = load_index()
+    _index = index
+    log.info("autocomplete index loaded: %d symbols in %.0f ms",
+             len(index), 1000 * (time.monotonic() - started))
+    return index
+
+
+def get_index():
+    """Return the loaded index, loading it on first use."""
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                reload_index()
+    return _index
+
+
+def search(query, limit=10):
+    return get_index().search(query, limit)
+
+
+def _listen_forever():
+    """Reload on NOTIFY from the ingest script, or after the reload interval."""
+    last_load = time.monotonic()
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            while True:
+                timeout = max(1.0, AUTOCOMPLETE_RELOAD_INTERVAL - (time.monotonic() - last_load))
+                ready, _, _ = select.select([conn], [], [], timeout)
+                notified = False
+                if ready:
+                    conn.poll()
+                    notified = bool(conn.notifies)
+                    conn.notifies.clear()
+                if notified or time.monotonic() - last_load >= AUTOCOMPLETE_RELOAD_INTERVAL:
+                    reload_index()
+                    last_load = time.monotonic()
+        except Exception:
+            log.exception("autocomplete listener failed; retrying in 30s")
+            if conn is not None:
+                conn.close()
+            time.sleep(30)
+
+
+def start_listener():
+    """Start the background reload thread once per process."""
+    global _listener
+    with _index_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen_forever,
+                                         name="autocomplete-listener", daemon=True)
+            _listener.start()
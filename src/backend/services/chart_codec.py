@@ -0,0 +1,184 @@
+# src/backend/services/chart_codec.py
+"""Columnar chart payloads: NumPy bars, downsampling and wire encodings.
+
+A chart is a ``Bars`` tuple of NumPy columns: ``ts`` as int64 epoch
+seconds (UTC), then float64 ``open/high/low/close/volume`` with NaN where
+Postgres had NULL. ``price_history.get_bar_arrays`` fills it straight from
+a binary ``COPY``, so no per-bar Python objects exist until an encoding
+needs them.
+
+Encodings (``MIMETYPES``, negotiated on ``Accept``):
+
+* ``application/json`` – the established ``dates/opens/...`` object
+* ``application/vnd.finapp.ohlcv`` – packed little-endian buffers: a
+  16-byte header (``b"OHLC"``, u16 version, u16 columns, u32 rows, u32
+  reserved), then ``ts`` int64, ``open/high/low/close`` float32 (NaN =
+  missing) and ``volume`` int64 (missing = 0), one column after another.
+  Every column starts aligned, so a browser can wrap it in a
+  ``BigInt64Array``/``Float32Array`` view without copying.
+* ``application/vnd.apache.arrow.stream`` – one Arrow IPC record batch,
+  only offered when ``pyarrow`` is installed
+
+Downsampling (``points=`` on the chart endpoint) keeps real bars, so all
+columns stay consistent:
+
+* ``lttb`` – Largest-Triangle-Three-Buckets on the close, for line charts
+* ``minmax`` – the lowest low and highest high of each pixel bucket, so
+  candles keep their extremes
+"""
+import struct
+from collections import namedtuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:     # the Arrow encoding is optional
+    pa = None
+
+Bars = namedtuple("Bars", "ts open high low close volume")
+
+JSON = "application/json"
+BINARY = "application/vnd.finapp.ohlcv"
+ARROW = "application/vnd.apache.arrow.stream"
+MIMETYPES = (JSON, BINARY) + ((ARROW,) if pa is not None else ())
+
+DOWNSAMPLERS = ("lttb", "minmax")
+MIN_POINTS = 3
+
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+# one binary COPY tuple of (int8, float8 x 5): field count, then length + value
+_COPY_ROW = np.dtype([("n", ">i2"), ("_0", ">i4"), ("ts", ">i8"),
+                      ("_1", ">i4"), ("open", ">f8"), ("_2", ">i4"), ("high", ">f8"),
+                      ("_3", ">i4"), ("low", ">f8"), ("_4", ">i4"), ("close", ">f8"),
+                      ("_5", ">i4"), ("volume", ">f8")])
+_HEADER = struct.Struct("<4sHHII")
+
+
+def empty():
+    return Bars(np.empty(0, np.int64), *(np.empty(0, np.float64) for _ in range(5)))
+
+
+def from_copy(data):
+    """``Bars`` from ``COPY (SELECT ts::int8, o, h, l, c, v::float8) TO STDOUT
+    (FORMAT binary)`` output with no NULL fields (coalesce them to NaN)."""
+    if not data.startswith(_COPY_SIGNATURE):
+        raise ValueError("not a binary COPY stream")
+    start = len(_COPY_SIGNATURE) + 4
+    start += 4 + int.from_bytes(data[start:start + 4], "big")   # header extension
+    rows = (len(data) - start - 2) // _COPY_ROW.itemsize          # 2-byte trailer
+    if rows <= 0:
+        return empty()
+    rec = np.frombuffer(data, dtype=_COPY_ROW, count=rows, offset=start)
+    return Bars(rec["ts"].astype(np.int64),
+                *(rec[c].astype(np.float64) for c in Bars._fields[1:]))
+
+
+def take(bars, idx):
+    return Bars(*(col[idx] for col in bars))
+
+
+def lttb(ts, y, points):
+    """Indices of ``points`` bars chosen by Largest-Triangle-Three-Buckets."""
+    size = len(y)
+    if points >= size:
+        return np.arange(size)
+    x = ts.astype(np.float64)
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+    idx = np.empty(points, dtype=np.int64)
+    idx[0], idx[-1] = 0, size - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 3 < points else size)
+        avg_x = x[nxt].mean()
+        ny = y[nxt][~np.isnan(y[nxt])]
+        avg_y = ny.mean() if len(ny) else y[a]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        idx[i + 1] = a
+    return idx
+
+
+def minmax(lows, highs, points):
+    """Indices of the lowest low and highest high in ``points // 2`` buckets."""
+    size = len(lows)
+    if points >= size:
+        return np.arange(size)
+    lo_vals = np.where(np.isnan(lows), np.inf, lows)
+    hi_vals = np.where(np.isnan(highs), -np.inf, highs)
+    edges = np.linspace(0, size, points // 2 + 1).astype(np.int64)
+    picks = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        picks.append(lo + int(np.argmin(lo_vals[lo:hi])))
+        picks.append(lo + int(np.argmax(hi_vals[lo:hi])))
+    return np.unique(picks)
+
+
+def downsample(bars, points, method="lttb"):
+    """At most ``points`` of ``bars``; a no-op when there are fewer."""
+    if points is None or points >= len(bars.ts):
+        return bars
+    if method == "lttb":
+        return take(bars, lttb(bars.ts, bars.close, points))
+    if method == "minmax":
+        lows = np.where(np.isnan(bars.low), bars.close, bars.low)
+        highs = np.where(np.isnan(bars.high), bars.close, bars.high)
+        return take(bars, minmax(lows, highs, points))
+    raise ValueError(f"unsupported downsample method {method!r}")
+
+
+def _values(col, integer=False):
+    """JSON list of one column; NaN becomes ``null``."""
+    missing = np.isnan(col)
+    if not missing.any():
+        return (col.astype(np.int64) if integer else col).tolist()
+    out = (col.astype(np.int64) if integer else col).astype(object)
+    out[missing] = None
+    return out.tolist()
+
+
+def to_json(bars, daily=True):
+    """The ``dates/opens/highs/lows/closes/volumes`` object of ``get_chart``."""
+    stamps = bars.ts.astype("datetime64[s]")
+    if daily:
+        dates = np.datetime_as_string(stamps, unit="D")
+    else:
+        dates = np.datetime_as_string(stamps, unit="s", timezone="UTC")
+    return {
+        "dates":   dates.tolist(),
+        "opens":   _values(bars.open),
+        "highs":   _values(bars.high),
+        "lows":    _values(bars.low),
+        "closes":  _values(bars.close),
+        "volumes": _values(bars.volume, integer=True),
+    }
+
+
+def to_binary(bars):
+    rows = len(bars.ts)
+    return b"".join([
+        _HEADER.pack(b"OHLC", 1, len(Bars._fields), rows, 0),
+        bars.ts.astype("<i8").tobytes(),
+        *(getattr(bars, c).astype("<f4").tobytes() for c in ("open", "high", "low", "close")),
+        np.nan_to_num(bars.volume).astype("<i8").tobytes(),
+    ])
+
+
+def to_arrow(bars):
+    """One record batch as an Arrow IPC stream; NaN becomes null."""
+    if pa is None:
+        raise RuntimeError("the Arrow encoding needs the `pyarrow` package")
+    batch = pa.record_batch([
+        pa.array(bars.ts, type=pa.timestamp("s", tz="UTC")),
+        *(pa.array(getattr(bars, c), from_pandas=True) for c in ("open", "high", "low", "close")),
+        pa.array(np.nan_to_num(bars.volume).astype(np.int64), mask=np.isnan(bars.volume)),
+    ], names=list(Bars._fields))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+ENCODERS = {BINARY: to_binary, ARROW: to_arrow}
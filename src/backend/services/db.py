@@ -0,0 +1,218 @@
+# src/backend/services/db.py
+"""Shared, bounded psycopg2 connection pool.
+
+Every blueprint and service borrows connections through ``get_conn()``
+instead of opening its own ``psycopg2.connect`` per request.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from services.metrics import TimedCursor
+
+from config.settings import (
+    DATABASE_URL,
+    DB_POOL_SIZE, DB_POOL_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE, DB_POOL_HEALTH_CHECK_INTERVAL,
+)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became available within the pool timeout."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of ``size`` persistent connections plus up to
+    ``max_overflow`` temporary ones that are closed again on release.
+
+    Callers block (up to ``timeout`` seconds) once every slot is in use.
+    """
+
+    def __init__(self, dsn, size=5, max_overflow=10, timeout=30.0,
+                 recycle=1800.0, health_check_interval=30.0,
+                 cursor_factory=RealDictCursor):
+        self.dsn = dsn
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.health_check_interval = health_check_interval
+        self.cursor_factory = cursor_factory
+
+        self._cond = threading.Condition()
+        self._idle = []        # [(conn, returned_at)], most recent last
+        self._created = {}     # id(conn) -> creation time
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # -- internals -----------------------------------------------------
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn, cursor_factory=self.cursor_factory)
+        self._created[id(conn)] = time.monotonic()
+        return conn
+
+    def _close(self, conn):
+        self._created.pop(id(conn), None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _healthy(self, conn, idle_since):
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.recycle >= 0 and now - self._created.get(id(conn), now) > self.recycle:
+            return False
+        if 0 <= self.health_check_interval <= now - idle_since:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                return False
+        return True
+
+    # -- public API ----------------------------------------------------
+    def acquire(self):
+        """Check a connection out, waiting for a free slot if necessary."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        conn, idle_since = self._idle.pop()
+                        break
+                    if self._open < self.size + self.max_overflow:
+                        self._open += 1
+                        conn, idle_since = None, None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"no connection available after {self.timeout}s "
+                            f"({self._open} open, {self._waiting} waiting)")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            if conn is not None and not self._healthy(conn, idle_since):
+                self._close(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection; broken or overflow connections are closed."""
+        if not discard and not conn.closed:
+            try:
+                if conn.status != psycopg2.extensions.STATUS_READY:
+                    conn.rollback()
+                if conn.autocommit:
+                    conn.autocommit = False
+            except psycopg2.Error:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed or len(self._idle) >= self.size:
+                self._open -= 1
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection (e.g. at shutdown or after fork)."""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._open -= 1
+                self._close(conn)
+
+    def stats(self):
+        """Snapshot of pool gauges and checkout-latency counters."""
+        with self._cond:
+            return {
+                "size":            self.size,
+                "max_overflow":    self.max_overflow,
+                "open":            self._open,
+                "idle":            len(self._idle),
+                "in_use":          self._in_use,
+                "waiting":         self._waiting,
+                "checkouts":       self._checkouts,
+                "timeouts":        self._timeouts,
+                "checkout_avg_ms": round(1000 * self._wait_total / self._checkouts, 3)
+                                   if self._checkouts else 0.0,
+                "checkout_max_ms": round(1000 * self._wait_max, 3),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    DATABASE_URL,
+                    size=DB_POOL_SIZE,
+                    max_overflow=DB_POOL_MAX_OVERFLOW,
+                    timeout=DB_POOL_TIMEOUT,
+                    recycle=DB_POOL_RECYCLE,
+                    health_check_interval=DB_POOL_HEALTH_CHECK_INTERVAL,
+                    cursor_factory=TimedCursor,
+                )
+    return _pool
+
+
+@contextmanager
+def get_conn():
+    """Borrow a pooled connection that yields dict rows.
+
+    Behaves like ``with psycopg2.connect(...) as conn``: the transaction is
+    committed on success and rolled back on error, then the connection goes
+    back to the pool instead of being closed.
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    broken = False
+    try:
+        with conn:
+            yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.release(conn, discard=broken)
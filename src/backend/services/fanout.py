@@ -0,0 +1,65 @@
+# src/backend/services/fanout.py
+"""Run independent sub-fetches concurrently with per-part time budgets."""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from config.settings import DETAIL_WORKERS
+
+log = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=DETAIL_WORKERS, thread_name_prefix="fanout")
+
+
+def _timed(fn, args):
+    started = time.perf_counter()
+    try:
+        return fn(*args), None, time.perf_counter() - started
+    except Exception as exc:
+        return None, exc, time.perf_counter() - started
+
+
+def gather(parts, timeouts, default_timeout=3.0):
+    """Run ``{name: (fn, args)}`` in parallel.
+
+    Each part gets its own budget (``timeouts[name]`` seconds, measured from
+    the start of the fan-out). A part that times out or raises degrades to
+    ``None`` instead of failing the rest.
+
+    Returns ``(results, timings, failed)`` where ``timings`` maps name to
+    ``(seconds, status)`` and ``failed`` lists the degraded parts.
+    """
+    started = time.perf_counter()
+    futures = {name: _executor.submit(_timed, fn, args)
+               for name, (fn, args) in parts.items()}
+    results, timings, failed = {}, {}, []
+    for name, fut in futures.items():
+        budget = timeouts.get(name, default_timeout)
+        remaining = budget - (time.perf_counter() - started)
+        try:
+            value, exc, elapsed = fut.result(timeout=max(remaining, 0))
+        except FuturesTimeout:
+            # the worker keeps running; its result is simply dropped
+            results[name] = None
+            timings[name] = (budget, "timeout")
+            failed.append(name)
+            log.warning("%s timed out after %.1fs", name, budget)
+            continue
+        results[name] = value
+        timings[name] = (elapsed, "ok" if exc is None else "error")
+        if exc is not None:
+            failed.append(name)
+            log.warning("%s failed: %s", name, exc)
+    timings["total"] = (time.perf_counter() - started, "ok")
+    return results, timings, failed
+
+
+def server_timing(timings):
+    """Format ``gather`` timings as a ``Server-Timing`` header value."""
+    entries = []
+    for name, (seconds, status) in timings.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if status != "ok":
+            entry += f';desc="{status}"'
+        entries.append(entry)
+    return ", ".join(entries)
@@ -0,0 +1,185 @@
+# src/backend/services/hydration.py
+"""Link symbols to a watchlist now and hydrate missing or stale rows later.
+
+``link_symbols`` is the set-based write behind the watchlist add endpoints.
+In one transaction it:
+
+1. classifies the requested symbols against ``master_tickers`` and
+   ``tickers`` in a single query,
+2. inserts placeholder ``tickers`` rows (name/exchange from the master
+   listing) for valid symbols that have never been fetched, and
+3. links every valid symbol with one ``INSERT ... SELECT``.
+
+Rows that are missing or stale are then hydrated in the background by
+``queue_hydration``. Job status is a row in ``hydration_jobs``, so a
+poll answered by any worker (or after the one running the job restarts)
+sees the same progress for ``JOB_TTL`` seconds after the last update.
+"""
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from psycopg2.errors import ForeignKeyViolation
+
+from services.db import get_conn
+from services.ticker_service import is_stale, refresh_quotes, refresh_ticker
+
+log = logging.getLogger(__name__)
+
+JOB_TTL = 3600     # seconds a finished job's status stays queryable
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hydration")
+
+
+def link_symbols(cur, watchlist_id, symbols):
+    """Link valid ``symbols`` to the watchlist; returns a summary dict.
+
+    ``invalid`` lists symbols found in neither ``master_tickers`` nor
+    ``tickers``; ``missing``/``stale`` are the linked symbols whose rows
+    still need a full or quote refresh.
+    """
+    cur.execute("""
+        SELECT r.symbol,
+               m.symbol IS NOT NULL AS listed,
+               t.id IS NOT NULL     AS known,
+               t.last_fetched_at
+          FROM unnest(%s::text[]) AS r(symbol)
+          LEFT JOIN public.master_tickers m ON m.symbol = r.symbol
+          LEFT JOIN public.tickers        t ON t.symbol = r.symbol
+    """, (list(symbols),))
+    rows = {r["symbol"]: r for r in cur.fetchall()}
+
+    now_utc = datetime.now(timezone.utc)
+    invalid = [s for s in symbols if not (rows[s]["listed"] or rows[s]["known"])]
+    unknown = [s for s in symbols if rows[s]["listed"] and not rows[s]["known"]]
+    # never fetched (placeholders included): needs the full info refresh
+    missing = unknown + [s for s in symbols
+                         if rows[s]["known"] and rows[s]["last_fetched_at"] is None]
+    stale = [s for s in symbols if rows[s]["known"]
+             and rows[s]["last_fetched_at"] is not None and is_stale(rows[s], now_utc)]
+    valid = [s for s in symbols if s not in invalid]
+
+    if unknown:
+        # placeholder rows so the link can be made now; last_fetched_at
+        # stays NULL, which every reader treats as stale
+        cur.execute("""
+            INSERT INTO public.tickers (symbol, name, exchange)
+            SELECT symbol, name, exchange
+              FROM public.master_tickers
+             WHERE symbol = ANY(%s)
+            ON CONFLICT (symbol) DO NOTHING
+        """, (unknown,))
+    linked = 0
+    if valid:
+        cur.execute("""
+            INSERT INTO public.watchlist_items (watchlist_id, ticker_id)
+            SELECT %s, t.id FROM public.tickers t WHERE t.symbol = ANY(%s)
+            ON CONFLICT (watchlist_id, ticker_id) DO NOTHING
+        """, (watchlist_id, valid))
+        linked = cur.rowcount
+    return {"linked": linked, "invalid": invalid, "missing": missing, "stale": stale}
+
+
+_JOB_COLUMNS = "id, watchlist_id, state, total, done, failed, seconds"
+
+
+def _save(job):
+    try:
+        _write_job(job)
+    except ForeignKeyViolation:
+        if job["state"] == "queued":
+            raise               # the caller maps this to 404
+        # the watchlist was deleted while the job ran; nobody can poll it
+        log.info("hydration job %s outlived watchlist %s", job["id"], job["watchlist_id"])
+
+
+def _write_job(job):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO public.hydration_jobs
+                   (id, watchlist_id, state, total, done, failed, seconds)
+            VALUES (%(id)s, %(watchlist_id)s, %(state)s, %(total)s, %(done)s,
+                    %(failed)s::text[], %(seconds)s)
+            ON CONFLICT (id) DO UPDATE
+               SET state = EXCLUDED.state, done = EXCLUDED.done,
+                   failed = EXCLUDED.failed, seconds = EXCLUDED.seconds,
+                   updated_at = now()
+        """, {"seconds": None, **job})
+
+
+def job_status(job_id):
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT {_JOB_COLUMNS} FROM public.hydration_jobs
+             WHERE id = %s AND updated_at > now() - make_interval(secs => %s)
+        """, (job_id, JOB_TTL))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    job = dict(row)
+    if job["seconds"] is None:
+        del job["seconds"]
+    return job
+
+
+def _sweep():
+    """Drop jobs nobody can poll any more."""
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            DELETE FROM public.hydration_jobs
+             WHERE updated_at < now() - make_interval(secs => %s)
+        """, (JOB_TTL,))
+
+
+def _hydrate(job, missing, stale):
+    if stale:
+        try:
+            refreshed = refresh_quotes(stale)
+            job["done"] += len(refreshed)
+            job["failed"] += [s for s in stale if s not in refreshed]
+        except Exception as exc:
+            log.warning("bulk quote refresh for job %s failed: %s", job["id"], exc)
+            job["failed"] += stale
+        _save(job)
+    futures = {s: refresh_ticker(s, wait=False) for s in missing}
+    for s, fut in futures.items():
+        try:
+            fut.result()
+            job["done"] += 1
+        except Exception as exc:
+            log.warning("hydrating %s for job %s failed: %s", s, job["id"], exc)
+            job["failed"].append(s)
+        _save(job)
+
+
+def _run(job, missing, stale):
+    job["state"] = "running"
+    _save(job)
+    started = time.monotonic()
+    try:
+        _hydrate(job, missing, stale)
+        job["state"] = "finished"
+    except Exception:
+        log.exception("hydration job %s crashed", job["id"])
+        job["state"] = "error"
+    job["seconds"] = round(time.monotonic() - started, 2)
+    _save(job)
+
+
+def queue_hydration(watchlist_id, missing, stale):
+    """Hydrate ``missing`` (full refresh) and ``stale`` (bulk quote refresh)
+    in the background; returns the job dict (``id``, ``state``, counts)."""
+    job = {
+        "id":           uuid.uuid4().hex,
+        "watchlist_id": watchlist_id,
+        "state":        "queued",
+        "total":        len(missing) + len(stale),
+        "done":         0,
+        "failed":       [],
+    }
+    _sweep()
+    _save(job)
+    _executor.submit(_run, job, list(missing), list(stale))
+    return job
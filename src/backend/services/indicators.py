@@ -0,0 +1,353 @@
+# src/backend/services/indicators.py
+"""Technical indicators over OHLCV arrays.
+
+The vectorised functions work along the last axis, so they accept either
+one series (1-D) or a whole watchlist at once (2-D, one row per symbol,
+NaN-padded where a symbol has no bar). Recursive smoothers (EMA, Wilder)
+step through time once but are vectorised across rows; everything else is
+pure array arithmetic.
+
+``IndicatorState`` carries the same indicators forward one bar at a time
+in O(1), so a new bar never triggers a recompute over the full window.
+"""
+from collections import deque
+
+import numpy as np
+
+RSI_PERIOD = 14
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+BB_PERIOD, BB_WIDTH = 20, 2.0
+ATR_PERIOD = 14
+SMA_PERIODS = (20, 50)
+
+
+def _f64(x):
+    return np.asarray(x, dtype=np.float64)
+
+
+def _shift(x, fill=np.nan):
+    """x shifted one step to the right along the last axis."""
+    out = np.empty_like(x)
+    out[..., 0] = fill
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+def sma(x, n):
+    """Simple moving average; NaN until a full window is available."""
+    x = _f64(x)
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] < n:
+        return out
+    c = np.cumsum(np.nan_to_num(x), axis=-1)
+    valid = np.cumsum(~np.isnan(x), axis=-1)
+    window = c[..., n - 1:].copy()
+    window[..., 1:] -= c[..., :-n]
+    count = valid[..., n - 1:].copy()
+    count[..., 1:] -= valid[..., :-n]
+    out[..., n - 1:] = np.where(count == n, window / n, np.nan)
+    return out
+
+
+def _smooth(x, n, alpha):
+    """Exponential smoothing seeded with the first full-window SMA per row."""
+    x = _f64(x)
+    seed = sma(x, n)
+    out = np.full_like(x, np.nan)
+    prev = np.full(x.shape[:-1], np.nan)
+    for t in range(x.shape[-1]):
+        prev = np.where(np.isnan(prev), seed[..., t], alpha * x[..., t] + (1 - alpha) * prev)
+        out[..., t] = prev
+    return out
+
+
+def ema(x, n):
+    return _smooth(x, n, 2.0 / (n + 1))
+
+
+def wilder(x, n):
+    """Wilder's smoothing (RSI, ATR): an EMA with alpha = 1/n."""
+    return _smooth(x, n, 1.0 / n)
+
+
+def rsi(close, n=RSI_PERIOD):
+    close = _f64(close)
+    delta = close - _shift(close)
+    gain = wilder(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))[..., 1:], n)
+    loss = wilder(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))[..., 1:], n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    value = np.where(np.isnan(gain) | np.isnan(loss), np.nan, value)
+    out = np.full_like(close, np.nan)
+    out[..., 1:] = value
+    return out
+
+
+def macd(close, fast=MACD_FAST, slow=MACD_SLOW, signal=MACD_SIGNAL):
+    """Returns (macd line, signal line, histogram)."""
+    line = ema(close, fast) - ema(close, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def bollinger(close, n=BB_PERIOD, width=BB_WIDTH):
+    """Returns (upper, middle, lower) bands using the population std-dev."""
+    close = _f64(close)
+    mid = sma(close, n)
+    var = np.maximum(sma(close * close, n) - mid * mid, 0.0)
+    dev = width * np.sqrt(var)
+    return mid + dev, mid, mid - dev
+
+
+def true_range(high, low, close):
+    high, low, close = _f64(high), _f64(low), _f64(close)
+    prev = _shift(close)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+    return np.where(np.isnan(high) | np.isnan(low), np.nan, tr)
+
+
+def atr(high, low, close, n=ATR_PERIOD):
+    return wilder(true_range(high, low, close), n)
+
+
+def vwap(high, low, close, volume):
+    """Volume-weighted average price, anchored at the start of the window."""
+    typical = (_f64(high) + _f64(low) + _f64(close)) / 3.0
+    volume = _f64(volume)
+    pv = np.cumsum(np.nan_to_num(typical * volume), axis=-1)
+    vol = np.cumsum(np.nan_to_num(volume), axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vol > 0, pv / vol, np.nan)
+
+
+def obv(close, volume):
+    """On-balance volume."""
+    close, volume = _f64(close), _f64(volume)
+    direction = np.sign(np.nan_to_num(close - _shift(close)))
+    return np.cumsum(direction * np.nan_to_num(volume), axis=-1)
+
+
+def compute_all(high, low, close, volume):
+    """Every indicator series for 1-D or 2-D OHLCV arrays."""
+    line, sig, hist = macd(close)
+    upper, mid, lower = bollinger(close)
+    out = {
+        "rsi":         rsi(close),
+        "macd":        line,
+        "macd_signal": sig,
+        "macd_hist":   hist,
+        f"ema_{MACD_FAST}": ema(close, MACD_FAST),
+        f"ema_{MACD_SLOW}": ema(close, MACD_SLOW),
+        "bb_upper":    upper,
+        "bb_middle":   mid,
+        "bb_lower":    lower,
+        "atr":         atr(high, low, close),
+        "vwap":        vwap(high, low, close, volume),
+        "obv":         obv(close, volume),
+    }
+    for n in SMA_PERIODS:
+        out[f"sma_{n}"] = sma(close, n)
+    return out
+
+
+def latest(series, last_index=None):
+    """Value at each row's last bar (``last_index``), NaN mapped to None."""
+    series = _f64(series)
+    if series.ndim == 1:
+        v = series[-1] if series.size else np.nan
+        return None if np.isnan(v) else float(v)
+    vals = series[np.arange(series.shape[0]), last_index]
+    return [None if np.isnan(v) else float(v) for v in vals]
+
+
+def align(bars_by_symbol):
+    """Stack per-symbol ``(ts, o, h, l, c, v)`` lists into NaN-padded 2-D arrays.
+
+    Returns ``(symbols, highs, lows, closes, volumes, last_index)``.
+    """
+    symbols = [s for s, bars in bars_by_symbol.items() if bars[0]]
+    if not symbols:
+        return [], None, None, None, None, None
+    stamps = [np.array([t.timestamp() for t in bars_by_symbol[s][0]]) for s in symbols]
+    timeline = np.unique(np.concatenate(stamps))
+    shape = (len(symbols), timeline.size)
+    highs, lows, closes, volumes = (np.full(shape, np.nan) for _ in range(4))
+    last_index = np.empty(len(symbols), dtype=np.intp)
+    for row, (s, ts) in enumerate(zip(symbols, stamps)):
+        cols = np.searchsorted(timeline, ts)
+        _, _, h, l, c, v = bars_by_symbol[s]
+        highs[row, cols] = np.asarray(h, dtype=np.float64)
+        lows[row, cols] = np.asarray(l, dtype=np.float64)
+        closes[row, cols] = np.asarray(c, dtype=np.float64)
+        volumes[row, cols] = np.asarray(v, dtype=np.float64)
+        last_index[row] = cols[-1]
+    return symbols, highs, lows, closes, volumes, last_index
+
+
+def compute_many(bars_by_symbol):
+    """Latest indicators for many symbols in one pass over a 2-D array."""
+    symbols, highs, lows, closes, volumes, last_index = align(bars_by_symbol)
+    out = {s: None for s in bars_by_symbol}
+    if not symbols:
+        return out
+    # forward-fill closes inside each row so calendar gaps between symbols
+    # don't break the recursive smoothers; bars before a symbol's first
+    # trade stay NaN
+    filled = closes.copy()
+    idx = np.where(~np.isnan(filled), np.arange(filled.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = filled[np.arange(filled.shape[0])[:, None], idx]
+    series = compute_all(np.where(np.isnan(highs), filled, highs),
+                         np.where(np.isnan(lows), filled, lows),
+                         filled, np.nan_to_num(volumes))
+    values = {name: latest(arr, last_index) for name, arr in series.items()}
+    for row, s in enumerate(symbols):
+        out[s] = {name: vals[row] for name, vals in values.items()}
+    return out
+
+
+class _Smoother:
+    """O(1) EMA/Wilder smoother seeded with the SMA of the first n inputs."""
+
+    __slots__ = ("n", "alpha", "value", "_seed_sum", "_seen")
+
+    def __init__(self, n, alpha):
+        self.n, self.alpha = n, alpha
+        self.value = None
+        self._seed_sum = 0.0
+        self._seen = 0
+
+    def push(self, x):
+        if self.value is None:
+            self._seed_sum += x
+            self._seen += 1
+            if self._seen == self.n:
+                self.value = self._seed_sum / self.n
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def copy(self):
+        c = _Smoother(self.n, self.alpha)
+        c.value, c._seed_sum, c._seen = self.value, self._seed_sum, self._seen
+        return c
+
+
+def _ema_smoother(n):
+    return _Smoother(n, 2.0 / (n + 1))
+
+
+def _wilder_smoother(n):
+    return _Smoother(n, 1.0 / n)
+
+
+class IndicatorState:
+    """Streaming counterpart of ``compute_all`` with O(1) updates per bar.
+
+    ``push`` appends a new bar; ``revise`` replaces the newest one (e.g. an
+    intraday update of today's daily bar) by undoing the last push instead
+    of replaying history.
+    """
+
+    _WINDOWS = tuple(sorted(set(SMA_PERIODS + (BB_PERIOD,))))
+    _SMOOTHERS = ("ema_fast", "ema_slow", "signal", "gain", "loss", "atr")
+
+    def __init__(self):
+        self.last_ts = None
+        self.bars = 0
+        self.prev_close = None
+        self.window = deque(maxlen=max(self._WINDOWS))
+        self.sums = {n: 0.0 for n in self._WINDOWS}
+        self.sumsq = 0.0
+        self.ema_fast = _ema_smoother(MACD_FAST)
+        self.ema_slow = _ema_smoother(MACD_SLOW)
+        self.signal = _ema_smoother(MACD_SIGNAL)
+        self.gain = _wilder_smoother(RSI_PERIOD)
+        self.loss = _wilder_smoother(RSI_PERIOD)
+        self.atr = _wilder_smoother(ATR_PERIOD)
+        self.cum_pv = 0.0
+        self.cum_v = 0.0
+        self.obv = 0.0
+        self.values = {}
+        self._undo = None
+
+    def _save(self):
+        saved = {name: getattr(self, name).copy() for name in self._SMOOTHERS}
+        saved.update(
+            last_ts=self.last_ts, bars=self.bars, prev_close=self.prev_close,
+            sums=dict(self.sums), sumsq=self.sumsq, cum_pv=self.cum_pv,
+            cum_v=self.cum_v, obv=self.obv, values=dict(self.values),
+            evicted=self.window[0] if len(self.window) == self.window.maxlen else None,
+        )
+        return saved
+
+    def push(self, ts, high, low, close, volume):
+        """Fold one new bar into the state; returns the latest values."""
+        self._undo = self._save()
+        self.last_ts = ts
+        return self._apply(high, low, close, volume)
+
+    def revise(self, ts, high, low, close, volume):
+        """Replace the newest bar with an updated version of it."""
+        if self._undo is None:
+            return self.push(ts, high, low, close, volume)
+        saved = dict(self._undo)
+        evicted = saved.pop("evicted")
+        self.window.pop()
+        if evicted is not None:
+            self.window.appendleft(evicted)
+        self.__dict__.update(saved)
+        return self.push(ts, high, low, close, volume)
+
+    def _apply(self, high, low, close, volume):
+        v = self.values
+        prev = self.prev_close
+
+        if prev is not None:
+            delta = close - prev
+            g = self.gain.push(max(delta, 0.0))
+            l = self.loss.push(max(-delta, 0.0))
+            if g is not None and l is not None:
+                v["rsi"] = 100.0 if l == 0 else 100.0 - 100.0 / (1.0 + g / l)
+            tr = max(high - low, abs(high - prev), abs(low - prev))
+            self.obv += volume if delta > 0 else -volume if delta < 0 else 0.0
+        else:
+            tr = high - low
+        v["atr"] = self.atr.push(tr)
+        v["obv"] = self.obv
+
+        fast, slow = self.ema_fast.push(close), self.ema_slow.push(close)
+        v[f"ema_{MACD_FAST}"], v[f"ema_{MACD_SLOW}"] = fast, slow
+        if fast is not None and slow is not None:
+            line = fast - slow
+            sig = self.signal.push(line)
+            v["macd"] = line
+            v["macd_signal"] = sig
+            v["macd_hist"] = None if sig is None else line - sig
+
+        # running window sums: drop the value leaving each window, add the new one
+        w = self.window
+        for n in self._WINDOWS:
+            if len(w) >= n:
+                self.sums[n] -= w[-n]
+            self.sums[n] += close
+        if len(w) >= BB_PERIOD:
+            self.sumsq -= w[-BB_PERIOD] ** 2
+        self.sumsq += close * close
+        w.append(close)
+
+        for n in SMA_PERIODS:
+            v[f"sma_{n}"] = self.sums[n] / n if len(w) >= n else None
+        if len(w) >= BB_PERIOD:
+            mid = self.sums[BB_PERIOD] / BB_PERIOD
+            dev = BB_WIDTH * max(self.sumsq / BB_PERIOD - mid * mid, 0.0) ** 0.5
+            v["bb_upper"], v["bb_middle"], v["bb_lower"] = mid + dev, mid, mid - dev
+
+        typical = (high + low + close) / 3.0
+        self.cum_pv += typical * volume
+        self.cum_v += volume
+        v["vwap"] = self.cum_pv / self.cum_v if self.cum_v else None
+
+        self.prev_close = close
+        self.bars += 1
+        return dict(v)
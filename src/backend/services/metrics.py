@@ -0,0 +1,308 @@
+# src/backend/services/metrics.py
+"""Process-local metrics in Prometheus text format, plus an opt-in profiler.
+
+* ``init_app`` adds Flask hooks that record a latency histogram per
+  endpoint (the URL rule, not the raw path, so cardinality stays bounded).
+* ``TimedCursor`` is the pool's cursor class: every ``execute`` is timed
+  and its rows counted, labelled by statement kind and first table.
+* ``upstream`` times one call to yfinance, NewsAPI, … and counts its
+  outcome; ``InstrumentedProvider`` applies it to every provider method.
+* ``cache_result`` counts hits and misses of the caches in front of them.
+* Existing ``stats()`` gauges (DB pool, response cache, price hub, …) are
+  exported through ``register_collector``.
+
+Every worker process keeps its own registry; with several gunicorn
+workers each scrape sees one of them. ``?__profile=1`` from a user listed
+in ``PROFILE_ADMINS`` swaps the response for a cProfile summary of the
+request thread (work done in fan-out threads is not included).
+"""
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from psycopg2.extras import RealDictCursor
+
+from config.settings import PROFILE_ADMINS
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _labels(self.labelnames, labels), value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}     # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                yield (f"{self.name}_bucket",
+                       _labels(self.labelnames, labels, [("le", _number(bound))]), cumulative)
+            yield (f"{self.name}_bucket",
+                   _labels(self.labelnames, labels, [("le", "+Inf")]), series[-1])
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), series[-2]
+            yield f"{self.name}_count", _labels(self.labelnames, labels), series[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, prefix, help, stats, labels=None):
+        """Export the numeric values of ``stats()`` as ``<prefix>_<key>`` gauges."""
+        self._collectors.append((prefix, help, stats, labels or {}))
+
+    def render(self):
+        out = []
+        for metric in self._metrics:
+            out.append(f"# HELP {metric.name} {metric.help}")
+            out.append(f"# TYPE {metric.name} {metric.kind}")
+            out.extend(f"{name}{labels} {_number(value)}"
+                       for name, labels, value in metric.samples())
+        for prefix, help, stats, labels in self._collectors:
+            try:
+                values = stats()
+            except Exception as exc:
+                out.append(f"# {prefix}: unavailable ({type(exc).__name__})")
+                continue
+            label_str = _labels(labels.keys(), labels.values())
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                out.append(f"# HELP {name} {help}: {key}")
+                out.append(f"# TYPE {name} gauge")
+                out.append(f"{name}{label_str} {_number(value)}")
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.histogram(
+    "http_request_duration_seconds", "Request latency by endpoint",
+    ("method", "endpoint", "status"))
+db_queries = registry.histogram(
+    "db_query_duration_seconds", "Query latency by statement kind and table",
+    ("statement", "table"))
+db_rows = registry.counter(
+    "db_rows_total", "Rows returned or affected by statement kind and table",
+    ("statement", "table"))
+db_errors = registry.counter(
+    "db_query_errors_total", "Failed queries by statement kind and table",
+    ("statement", "table"))
+upstream_calls = registry.histogram(
+    "upstream_request_duration_seconds", "Upstream call latency",
+    ("upstream", "call"), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+upstream_outcomes = registry.counter(
+    "upstream_requests_total", "Upstream calls by outcome (ok, error, rate_limited)",
+    ("upstream", "call", "outcome"))
+cache_lookups = registry.counter(
+    "cache_lookups_total", "Cache lookups in front of upstream calls by result",
+    ("cache", "result"))
+
+
+# -- database -------------------------------------------------------------
+
+# repo SQL schema-qualifies its tables; temp/staging tables fall back to the
+# first name after FROM/INTO/UPDATE/COPY
+_PUBLIC_TABLE = re.compile(r"\bpublic\.(\w+)", re.I)
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|COPY)\s+(?:ONLY\s+)?([a-z_]\w*)\b(?!\()", re.I)
+
+
+def _classify(sql):
+    """``(statement, table)`` labels, e.g. ``("SELECT", "tickers")``."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    elif not isinstance(sql, str):
+        sql = str(sql)     # psycopg2.sql.Composed
+    head = sql.lstrip().split(None, 1)
+    statement = head[0].upper() if head else "OTHER"
+    m = _PUBLIC_TABLE.search(sql) or _TABLE.search(sql)
+    return statement, m.group(1).lower() if m else ""
+
+
+class TimedCursor(RealDictCursor):
+    """``RealDictCursor`` that records latency and row counts per query."""
+
+    def _timed(self, sql, run):
+        labels = _classify(sql)
+        started = time.perf_counter()
+        try:
+            return run()
+        except Exception:
+            db_errors.inc(*labels)
+            raise
+        finally:
+            db_queries.observe(time.perf_counter() - started, *labels)
+            if self.rowcount > 0:
+                db_rows.inc(*labels, amount=self.rowcount)
+
+    def execute(self, query, vars=None):
+        return self._timed(query, lambda: super(TimedCursor, self).execute(query, vars))
+
+    def executemany(self, query, vars_list):
+        return self._timed(query, lambda: super(TimedCursor, self).executemany(query, vars_list))
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed(sql, lambda: super(TimedCursor, self).copy_expert(sql, file, size))
+
+
+# -- upstream calls and caches --------------------------------------------
+
+@contextmanager
+def upstream(name, call):
+    """Time one upstream call; ``outcome`` can be overridden by the caller.
+
+    Yields a dict; set ``["outcome"]`` (e.g. ``"rate_limited"``) when the
+    call returned normally but still failed.
+    """
+    state = {"outcome": "ok"}
+    started = time.perf_counter()
+    try:
+        yield state
+    except Exception as exc:
+        state["outcome"] = "rate_limited" if type(exc).__name__ == "RateLimited" else "error"
+        raise
+    finally:
+        upstream_calls.observe(time.perf_counter() - started, name, call)
+        upstream_outcomes.inc(name, call, state["outcome"])
+
+
+def cache_result(cache, hit):
+    cache_lookups.inc(cache, "hit" if hit else "miss")
+
+
+class InstrumentedProvider:
+    """Wraps a market-data provider; every public call goes through ``upstream``."""
+
+    CALLS = ("info", "news", "quotes", "history", "history_many")
+
+    def __init__(self, provider):
+        self._provider = provider
+        self.name = provider.name
+
+    def __getattr__(self, attr):
+        target = getattr(self._provider, attr)
+        if attr not in self.CALLS:
+            return target
+
+        def call(*args, **kwargs):
+            with upstream(self.name, attr):
+                return target(*args, **kwargs)
+        return call
+
+
+# -- Flask hooks ----------------------------------------------------------
+
+def _profile_requested():
+    if request.args.get("__profile") != "1" or not PROFILE_ADMINS:
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+    except Exception:
+        return False
+    return str(get_jwt_identity()) in PROFILE_ADMINS
+
+
+def _profile_response(profiler, response):
+    buf = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buf)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(40)
+    return Response(buf.getvalue(), mimetype="text/plain",
+                    headers={"X-Profiled-Status": str(response.status_code)})
+
+
+def init_app(app):
+    """Per-endpoint latency histograms and the ``?__profile=1`` hook."""
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+        if _profile_requested():
+            g._profiler = cProfile.Profile()
+            g._profiler.enable()
+
+    @app.after_request
+    def _record(response):
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+        started = g.pop("_metrics_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            http_requests.observe(time.perf_counter() - started,
+                                  request.method, endpoint, str(response.status_code))
+        if profiler is not None:
+            response = _profile_response(profiler, response)
+        return response
@@ -0,0 +1,27 @@
+# src/backend/services/native.py
+"""Native thread pools for work that would block a gevent worker's loop.
+
+Monkey-patching only makes the stdlib cooperative. CPU-bound C code
+(bcrypt) and HTTP stacks gevent cannot patch (yfinance's ``curl_cffi``)
+still block the whole worker. ``native_executor`` hands such calls to
+real OS threads: ``gevent.threadpool.ThreadPoolExecutor`` once threading
+is patched (the patched stdlib executor would only run greenlets), the
+stdlib one otherwise.
+"""
+
+
+def gevent_patched():
+    """True inside a gevent worker whose ``threading`` is monkey-patched."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+def native_executor(max_workers):
+    if gevent_patched():
+        from gevent.threadpool import ThreadPoolExecutor
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=max_workers)
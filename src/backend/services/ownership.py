@@ -0,0 +1,84 @@
+# src/backend/services/ownership.py
+"""Cached ``watchlists.id -> user_id`` lookups for per-request ownership checks.
+
+A watchlist never changes owner, so a positive lookup can be reused for
+``OWNERSHIP_CACHE_TTL`` seconds. Deletion is the only change that matters:
+the deleting worker calls ``forget``, and other workers drop their entry
+when the TTL runs out. Unknown ids are never cached. Until then a write
+under a deleted watchlist passes the check and hits the ``watchlists``
+foreign key instead; write paths map that to 404 and ``forget`` the entry.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import OWNERSHIP_CACHE_SIZE, OWNERSHIP_CACHE_TTL
+from services.db import get_conn
+
+
+class OwnershipCache:
+    def __init__(self, ttl=OWNERSHIP_CACHE_TTL, max_entries=OWNERSHIP_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # watchlist id -> (owner, expires)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, watchlist_id):
+        with self._lock:
+            entry = self._entries.get(watchlist_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(watchlist_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def owner(self, watchlist_id, cur=None):
+        """The owning user id (as a string), or ``None`` if no such watchlist.
+
+        ``cur`` is used on a miss; without it a pooled connection is taken
+        only when the cache cannot answer.
+        """
+        owner = self._cached(watchlist_id)
+        if owner is not None:
+            return owner
+        if cur is None:
+            with get_conn() as conn, conn.cursor() as cur:
+                return self._load(cur, watchlist_id)
+        return self._load(cur, watchlist_id)
+
+    def _load(self, cur, watchlist_id):
+        cur.execute("SELECT user_id FROM public.watchlists WHERE id=%s", (watchlist_id,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        owner = str(row["user_id"])
+        with self._lock:
+            self._entries[watchlist_id] = (owner, time.monotonic() + self.ttl)
+            self._entries.move_to_end(watchlist_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return owner
+
+    def forget(self, watchlist_id):
+        with self._lock:
+            self._entries.pop(watchlist_id, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries":   len(self._entries),
+                "hits":      self.hits,
+                "misses":    self.misses,
+                "hit_ratio": round(self.hits / total, 4) if total else None,
+            }
+
+
+cache = OwnershipCache()
+
+
+def owns_watchlist(watchlist_id, user_id, cur=None):
+    return cache.owner(watchlist_id, cur) == str(user_id)
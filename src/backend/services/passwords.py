@@ -0,0 +1,86 @@
+# src/backend/services/passwords.py
+"""Password hashing and verification off the request thread.
+
+bcrypt is deliberately slow (~250 ms of CPU per call). Run inline under
+the gevent worker, each call blocks the worker's event loop and so every
+other request it serves, and a login burst starves the whole pool. Both
+operations go to a small pool of native threads instead: the bcrypt and
+PBKDF2 backends release the GIL while hashing, so the loop keeps serving.
+Under gevent that is ``gevent.threadpool.ThreadPoolExecutor`` (the
+monkey-patched stdlib one would only run greenlets); otherwise the
+stdlib executor.
+
+Admission is bounded: once ``AUTH_HASH_WORKERS + AUTH_HASH_QUEUE`` hashes
+are in flight, ``Busy`` is raised immediately and the caller answers 503
+rather than queueing without limit. A hash that outlives
+``AUTH_HASH_TIMEOUT`` is reported as ``Busy`` too; it keeps its slot
+until it finishes.
+"""
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from passlib.context import CryptContext
+
+from config.settings import AUTH_HASH_QUEUE, AUTH_HASH_TIMEOUT, AUTH_HASH_WORKERS
+from services.native import native_executor
+
+_ctx = CryptContext(schemes=["bcrypt", "pbkdf2_sha256"], deprecated="auto")
+
+
+class Busy(Exception):
+    """Too many hashes in flight, or one took too long; retry shortly."""
+
+
+def _hash(password):
+    return _ctx.hash(password)
+
+
+def _verify(password, hashed):
+    # (ok, new_hash): new_hash is set when the stored hash uses a deprecated scheme
+    return _ctx.verify_and_update(password, hashed)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(AUTH_HASH_WORKERS + AUTH_HASH_QUEUE)
+_dummy_hash = None
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = native_executor(AUTH_HASH_WORKERS)
+        return _pool
+
+
+def _run(fn, *args):
+    if not _slots.acquire(blocking=False):
+        raise Busy()
+    try:
+        future = _get_pool().submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    # the slot stays taken until the hash is done, even if we stop waiting
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=AUTH_HASH_TIMEOUT)
+    except (FutureTimeout, TimeoutError):
+        raise Busy() from None
+
+
+def hash_password(password):
+    return _run(_hash, password)
+
+
+def verify_password(password, hashed):
+    """``(ok, new_hash)``; with ``hashed=None`` a dummy hash is checked so
+    unknown e-mails take as long as wrong passwords."""
+    global _dummy_hash
+    if hashed is None:
+        if _dummy_hash is None:
+            _dummy_hash = hash_password("not-a-password")
+        _run(_verify, password, _dummy_hash)
+        return False, None
+    return _run(_verify, password, hashed)
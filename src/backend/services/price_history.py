@@ -0,0 +1,294 @@
+# src/backend/services/price_history.py
+"""Persistent OHLCV history behind the chart endpoints.
+
+Bars live in ``public.price_bars`` keyed by (symbol, interval, ts).
+``public.price_bar_coverage`` records how far back each series has been
+fetched and when its tail was last pulled, so a chart request only
+downloads what is missing:
+
+* head gap  — the requested period starts before ``covered_from``
+* tail gap  — the newest bar may be incomplete and the tail is older than
+  ``CHART_TAIL_TTL`` (or one interval, whichever is shorter)
+
+Everything else is served straight from Postgres.
+"""
+import io
+import re
+from datetime import datetime, timedelta, timezone
+
+from psycopg2.extras import execute_values
+
+from config.settings import CHART_TAIL_TTL
+from services import chart_codec
+from services.db import get_conn
+from services.providers import get_provider
+from services.singleflight import SingleFlight
+
+INTERVALS = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800,
+    "60m": 3600, "90m": 5400, "1h": 3600,
+    "1d": 86400, "5d": 5 * 86400, "1wk": 7 * 86400,
+    "1mo": 30 * 86400, "3mo": 91 * 86400,
+}
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+_PERIOD_DAYS = {"d": 1, "wk": 7, "mo": 30, "y": 365}
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# one upstream gap-fill per (symbol, interval, period) at a time; the period
+# stands in for ``start``, which moves with the clock, so a 1y request never
+# waits on a 1mo fill that would leave its head gap open
+_fills = SingleFlight(max_workers=2, thread_name_prefix="price-history")
+
+
+def interval_seconds(interval):
+    try:
+        return INTERVALS[interval]
+    except KeyError:
+        raise ValueError(f"unsupported interval {interval!r}") from None
+
+
+def period_start(period, now=None):
+    """Start of ``period`` (``5d``, ``3mo``, ``1y``, ``ytd``, ``max``)."""
+    now = now or datetime.now(timezone.utc)
+    if period == "max":
+        return EPOCH
+    if period == "ytd":
+        return now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    m = _PERIOD_RE.match(period or "")
+    if not m:
+        raise ValueError(f"unsupported period {period!r}")
+    return now - timedelta(days=int(m.group(1)) * _PERIOD_DAYS[m.group(2)])
+
+
+def _coverage(cur, symbol, interval):
+    cur.execute("""
+        SELECT c.covered_from, c.fetched_at,
+               (SELECT max(ts) FROM public.price_bars b
+                 WHERE b.symbol = c.symbol AND b.interval = c.interval) AS last_ts
+          FROM public.price_bar_coverage c
+         WHERE c.symbol = %s AND c.interval = %s
+    """, (symbol, interval))
+    return cur.fetchone()
+
+
+def _write_bars(cur, symbol, interval, bars):
+    """Append new bars; the last, possibly partial, bar is overwritten."""
+    if not bars:
+        return
+    execute_values(cur, """
+        INSERT INTO public.price_bars
+          (symbol, interval, ts, open, high, low, close, volume)
+        VALUES %s
+        ON CONFLICT (symbol, interval, ts) DO UPDATE SET
+          open   = EXCLUDED.open,
+          high   = EXCLUDED.high,
+          low    = EXCLUDED.low,
+          close  = EXCLUDED.close,
+          volume = EXCLUDED.volume
+    """, [(symbol, interval) + tuple(bar) for bar in bars], page_size=1000)
+
+
+def _set_coverage(cur, symbol, interval, covered_from):
+    cur.execute("""
+        INSERT INTO public.price_bar_coverage (symbol, interval, covered_from, fetched_at)
+        VALUES (%s, %s, %s, now())
+        ON CONFLICT (symbol, interval) DO UPDATE SET
+          covered_from = LEAST(price_bar_coverage.covered_from, EXCLUDED.covered_from),
+          fetched_at   = now()
+    """, (symbol, interval, covered_from))
+
+
+def _fill_gaps(symbol, interval, start):
+    """Download only the head/tail ranges of the series that are missing."""
+    now = datetime.now(timezone.utc)
+    step = timedelta(seconds=interval_seconds(interval))
+    tail_ttl = min(step, CHART_TAIL_TTL)
+    provider = get_provider()
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cov = _coverage(cur, symbol, interval)
+        if cov is None:
+            _write_bars(cur, symbol, interval, provider.history(symbol, interval, start))
+            _set_coverage(cur, symbol, interval, start)
+            return
+
+        covered_from = cov["covered_from"]
+        if start < covered_from - step:
+            # head gap: backfill [start, covered_from)
+            _write_bars(cur, symbol, interval,
+                        provider.history(symbol, interval, start, covered_from))
+            covered_from = start
+
+        if cov["fetched_at"] < now - tail_ttl:
+            # tail gap: re-pull from the newest stored bar onwards
+            _write_bars(cur, symbol, interval,
+                        provider.history(symbol, interval, cov["last_ts"] or covered_from))
+        elif covered_from == cov["covered_from"]:
+            return
+        _set_coverage(cur, symbol, interval, covered_from)
+
+
+def get_bars(symbol, period="1mo", interval="1d"):
+    """Bars for ``symbol`` covering ``period``, filling gaps from upstream.
+
+    Returns ``(timestamps, opens, highs, lows, closes, volumes)`` lists.
+    """
+    interval_seconds(interval)
+    start = period_start(period)
+    _fills.do((symbol, interval, period), _fill_gaps, symbol, interval, start)
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT ts, open, high, low, close, volume
+              FROM public.price_bars
+             WHERE symbol = %s AND interval = %s AND ts >= %s
+             ORDER BY ts
+        """, (symbol, interval, start))
+        rows = cur.fetchall()
+    if not rows:
+        return [], [], [], [], [], []
+    return tuple(list(col) for col in zip(*(
+        (r["ts"], r["open"], r["high"], r["low"], r["close"], r["volume"])
+        for r in rows)))
+
+
+def get_bars_many(symbols, period="1y", interval="1d"):
+    """``get_bars`` for many symbols with bulk gap filling.
+
+    Series never fetched (or missing their head) and series whose tail is
+    due are each refreshed with one multi-symbol download + COPY, then all
+    bars are read back with a single query.
+    """
+    interval_seconds(interval)
+    start = period_start(period)
+    now = datetime.now(timezone.utc)
+    step = timedelta(seconds=interval_seconds(interval))
+    tail_ttl = min(step, CHART_TAIL_TTL)
+    provider = get_provider()
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT c.symbol, c.covered_from, c.fetched_at,
+                   (SELECT max(ts) FROM public.price_bars b
+                     WHERE b.symbol = c.symbol AND b.interval = c.interval) AS last_ts
+              FROM public.price_bar_coverage c
+             WHERE c.interval = %s AND c.symbol = ANY(%s)
+        """, (interval, list(symbols)))
+        cov = {r["symbol"]: r for r in cur.fetchall()}
+
+    cold = [s for s in symbols
+            if s not in cov or start < cov[s]["covered_from"] - step]
+    due = [s for s in symbols
+           if s in cov and s not in cold and cov[s]["fetched_at"] < now - tail_ttl]
+    if cold:
+        with get_conn() as conn:
+            copy_bars(conn, provider.history_many(cold, interval, start), interval, start)
+    if due:
+        since = min(cov[s]["last_ts"] or cov[s]["covered_from"] for s in due)
+        with get_conn() as conn:
+            copy_bars(conn, provider.history_many(due, interval, since), interval, now)
+
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute("""
+            SELECT symbol, ts, open, high, low, close, volume
+              FROM public.price_bars
+             WHERE symbol = ANY(%s) AND interval = %s AND ts >= %s
+             ORDER BY symbol, ts
+        """, (list(symbols), interval, start))
+        rows = cur.fetchall()
+
+    out = {s: ([], [], [], [], [], []) for s in symbols}
+    for r in rows:
+        cols = out[r["symbol"]]
+        for col, key in zip(cols, ("ts", "open", "high", "low", "close", "volume")):
+            col.append(r[key])
+    return out
+
+
+def get_bar_arrays(symbol, period="1mo", interval="1d"):
+    """``get_bars`` as a ``chart_codec.Bars`` of NumPy columns.
+
+    The rows come back through a binary ``COPY`` decoded in place by NumPy,
+    so a multi-year intraday series never becomes per-bar Python objects.
+    """
+    interval_seconds(interval)
+    start = period_start(period)
+    _fills.do((symbol, interval, period), _fill_gaps, symbol, interval, start)
+    buf = io.BytesIO()
+    with get_conn() as conn, conn.cursor() as cur:
+        query = cur.mogrify("""
+            SELECT extract(epoch FROM ts)::int8,
+                   coalesce(open, 'NaN'), coalesce(high, 'NaN'),
+                   coalesce(low, 'NaN'), coalesce(close, 'NaN'),
+                   coalesce(volume::float8, 'NaN')
+              FROM public.price_bars
+             WHERE symbol = %s AND interval = %s AND ts >= %s
+             ORDER BY ts
+        """, (symbol, interval, start)).decode()
+        cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", buf)
+    return chart_codec.from_copy(buf.getvalue())
+
+
+def get_chart(symbol, period="1mo", interval="1d", points=None, method="lttb"):
+    """Chart payload: parallel ``dates/opens/highs/lows/closes/volumes`` lists,
+    downsampled to at most ``points`` bars when given."""
+    bars = chart_codec.downsample(get_bar_arrays(symbol, period, interval), points, method)
+    return chart_codec.to_json(bars, daily=interval_seconds(interval) >= 86400)
+
+
+def copy_bars(conn, bars_by_symbol, interval, covered_from):
+    """Bulk-load history for many symbols with ``COPY FROM STDIN``.
+
+    Bars are streamed into a temp staging table and merged into
+    ``price_bars`` with one set-based insert; coverage rows are updated in
+    the same transaction. Returns the number of rows staged.
+    """
+    buf = io.StringIO()
+    n = 0
+    for symbol, bars in bars_by_symbol.items():
+        for ts, o, h, l, c, v in bars:
+            buf.write(f"{symbol}\t{interval}\t{ts.isoformat()}\t{o}\t{h}\t{l}\t{c}\t{int(v)}\n")
+            n += 1
+    buf.seek(0)
+
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS price_bars_stage
+              (LIKE public.price_bars INCLUDING DEFAULTS) ON COMMIT DELETE ROWS
+        """)
+        cur.copy_expert("""
+            COPY price_bars_stage (symbol, interval, ts, open, high, low, close, volume)
+            FROM STDIN WITH (FORMAT text, NULL 'nan')
+        """, buf)
+        cur.execute("""
+            INSERT INTO public.price_bars
+            SELECT * FROM price_bars_stage
+            ON CONFLICT (symbol, interval, ts) DO UPDATE SET
+              open   = EXCLUDED.open,
+              high   = EXCLUDED.high,
+              low    = EXCLUDED.low,
+              close  = EXCLUDED.close,
+              volume = EXCLUDED.volume
+        """)
+        execute_values(cur, """
+            INSERT INTO public.price_bar_coverage (symbol, interval, covered_from, fetched_at)
+            VALUES %s
+            ON CONFLICT (symbol, interval) DO UPDATE SET
+              covered_from = LEAST(price_bar_coverage.covered_from, EXCLUDED.covered_from),
+              fetched_at   = now()
+        """, [(s, interval, covered_from) for s in bars_by_symbol],
+           template="(%s, %s, %s, now())")
+    return n
+
+
+def seed(symbols, period="1y", interval="1d", chunk=100, provider=None):
+    """Seed history for many symbols: one bulk download + one COPY per chunk."""
+    provider = provider or get_provider()
+    start = period_start(period)
+    total = 0
+    for i in range(0, len(symbols), chunk):
+        batch = symbols[i:i + chunk]
+        bars = provider.history_many(batch, interval, start)
+        with get_conn() as conn:
+            total += copy_bars(conn, bars, interval, start)
+    return total
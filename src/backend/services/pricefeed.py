@@ -0,0 +1,195 @@
+# src/backend/services/pricefeed.py
+"""In-process pub/sub hub for live watchlist prices.
+
+Whoever refreshes ``public.tickers`` (request handlers, the in-process or
+standalone refresher) calls ``notify_quotes`` inside its transaction,
+which issues ``NOTIFY ticker_quotes`` with the new prices. One listener
+thread per web process feeds them into the ``PriceHub``. The hub drops
+quotes that did not change and fans the rest out to every subscription
+watching that symbol.
+
+A subscription coalesces: if several ticks for a symbol arrive between two
+reads, only the newest is delivered. The SSE endpoint reads at most once
+per ``STREAM_MIN_INTERVAL``, so one slow client never sees more than one
+update per symbol per interval.
+"""
+import json
+import logging
+import select
+import threading
+import time
+
+import psycopg2
+
+from config.settings import DATABASE_URL
+from services.response_cache import cache as response_cache
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "ticker_quotes"
+QUOTE_FIELDS = ("current_price", "previous_close", "day_high", "day_low", "volume")
+_MAX_PAYLOAD = 7500    # NOTIFY payloads must stay under 8000 bytes
+
+
+def quote_of(row):
+    """The streamed fields of a ``tickers`` row, as a comparable tuple."""
+    return tuple(None if row.get(f) is None
+                 else int(row[f]) if f == "volume" else float(row[f])
+                 for f in QUOTE_FIELDS)
+
+
+def quote_dict(quote):
+    out = dict(zip(QUOTE_FIELDS, quote))
+    price, prev = out["current_price"], out["previous_close"]
+    out["change_pct"] = (round(100.0 * (price - prev) / prev, 4)
+                         if price is not None and prev else None)
+    return out
+
+
+def notify_quotes(cur, rows):
+    """Queue ``NOTIFY ticker_quotes`` for refreshed rows (sent on commit)."""
+    chunk, size = {}, 2
+    for row in rows:
+        quote = quote_of(row)
+        entry = json.dumps([row["symbol"], quote], separators=(",", ":"))
+        if chunk and size + len(entry) > _MAX_PAYLOAD:
+            _notify(cur, chunk)
+            chunk, size = {}, 2
+        chunk[row["symbol"]] = quote
+        size += len(entry)
+    if chunk:
+        _notify(cur, chunk)
+
+
+def _notify(cur, quotes):
+    cur.execute("SELECT pg_notify(%s, %s)",
+                (CHANNEL, json.dumps(quotes, separators=(",", ":"))))
+
+
+class Subscription:
+    """One client's view of the hub: the newest pending quote per symbol."""
+
+    def __init__(self, hub, symbols):
+        self.hub = hub
+        self.symbols = frozenset(symbols)
+        self._pending = {}
+        self._cond = threading.Condition()
+
+    def offer(self, symbol, quote):
+        with self._cond:
+            self._pending[symbol] = quote
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Wait up to ``timeout`` s for updates; returns ``{symbol: quote}``."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PriceHub:
+    """Fan out changed quotes to the subscriptions watching each symbol."""
+
+    def __init__(self):
+        self._subs = {}      # symbol -> set of Subscription
+        self._last = {}      # symbol -> last published quote
+        self._lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, symbols):
+        sub = Subscription(self, symbols)
+        with self._lock:
+            for s in sub.symbols:
+                self._subs.setdefault(s, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            for s in sub.symbols:
+                subs = self._subs.get(s)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._subs[s]
+
+    def publish(self, quotes):
+        """Publish ``{symbol: quote}``; unchanged quotes are dropped."""
+        with self._lock:
+            fanout = []
+            for symbol, quote in quotes.items():
+                quote = tuple(quote)
+                if self._last.get(symbol) == quote:
+                    continue
+                self._last[symbol] = quote
+                self.published += 1
+                for sub in self._subs.get(symbol, ()):
+                    fanout.append((sub, symbol, quote))
+            self.delivered += len(fanout)
+        for sub, symbol, quote in fanout:
+            sub.offer(symbol, quote)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscriptions": len({sub for subs in self._subs.values() for sub in subs}),
+                "symbols":       len(self._subs),
+                "published":     self.published,
+                "delivered":     self.delivered,
+            }
+
+
+hub = PriceHub()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _listen_forever():
+    """Feed ``NOTIFY ticker_quotes`` payloads into the process-wide hub."""
+    while True:
+        conn = None
+        try:
+            conn = psycopg2.connect(DATABASE_URL)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            while True:
+                if not select.select([conn], [], [], 60)[0]:
+                    continue
+                conn.poll()
+                for note in conn.notifies:
+                    try:
+                        quotes = json.loads(note.payload)
+                    except ValueError:
+                        log.warning("bad %s payload: %.80s", CHANNEL, note.payload)
+                        continue
+                    # another process refreshed these rows; cached bodies are stale
+                    response_cache.invalidate(*quotes)
+                    hub.publish(quotes)
+                conn.notifies.clear()
+        except Exception:
+            log.exception("price feed listener failed; retrying in 30s")
+            if conn is not None:
+                conn.close()
+            time.sleep(30)
+
+
+def start_listener():
+    """Start the NOTIFY listener thread once per process."""
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen_forever,
+                                         name="pricefeed-listener", daemon=True)
+            _listener.start()
@@ -0,0 +1,292 @@
+# src/backend/services/providers.py
+"""Pluggable upstream market-data providers.
+
+Everything that talks to yfinance goes through ``get_provider()`` so a
+deterministic fake feed can stand in for it locally and in tests
+(``MARKET_DATA_PROVIDER=fake``).
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from config.settings import MARKET_DATA_PROVIDER, FAKE_PROVIDER_LATENCY_MS, PROVIDER_THREADS
+from services.metrics import InstrumentedProvider
+from services.native import gevent_patched, native_executor
+
+
+class RateLimited(Exception):
+    """The upstream provider asked us to slow down."""
+
+
+class MarketDataProvider:
+    """Interface every provider implements."""
+
+    name = "base"
+
+    def info(self, symbol):
+        """Return a yfinance-style ``info`` dict for ``symbol``."""
+        raise NotImplementedError
+
+    def news(self, symbol):
+        """Return a list of yfinance-style news items for ``symbol``."""
+        raise NotImplementedError
+
+    def quotes(self, symbols):
+        """Latest daily bar for many symbols in one upstream call.
+
+        Returns ``{symbol: {current_price, previous_close, open_price,
+        day_high, day_low, volume}}``; symbols without data are omitted.
+        """
+        raise NotImplementedError
+
+    def history(self, symbol, interval, start, end=None):
+        """OHLCV bars as ``[(ts, open, high, low, close, volume)]``, oldest first."""
+        return self.history_many([symbol], interval, start, end).get(symbol, [])
+
+    def history_many(self, symbols, interval, start, end=None):
+        """``{symbol: bars}`` for many symbols in one upstream call."""
+        raise NotImplementedError
+
+
+def _frame_to_bars(frame):
+    """Convert a yfinance OHLCV frame into UTC ``(ts, o, h, l, c, v)`` tuples."""
+    frame = frame.dropna(subset=["Close"])
+    if frame.empty:
+        return []
+    index = frame.index
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    return list(zip(
+        index.to_pydatetime(),
+        frame["Open"].to_numpy(dtype=float).tolist(),
+        frame["High"].to_numpy(dtype=float).tolist(),
+        frame["Low"].to_numpy(dtype=float).tolist(),
+        frame["Close"].to_numpy(dtype=float).tolist(),
+        frame["Volume"].fillna(0).to_numpy(dtype="int64").tolist(),
+    ))
+
+
+class YFinanceProvider(MarketDataProvider):
+    """yfinance, which recent releases fetch through ``curl_cffi`` (libcurl).
+
+    gevent cannot patch libcurl, so under a gevent worker every call runs
+    on one of PROVIDER_THREADS native threads; inline, it would block the
+    worker's event loop for the length of the download.
+    """
+
+    name = "yfinance"
+
+    def __init__(self):
+        self._pool = native_executor(PROVIDER_THREADS) if gevent_patched() else None
+
+    def _call(self, fn, *args, **kwargs):
+        try:
+            if self._pool is not None:
+                return self._pool.submit(fn, *args, **kwargs).result()
+            return fn(*args, **kwargs)
+        except Exception as exc:
+            if type(exc).__name__ == "YFRateLimitError":
+                raise RateLimited(str(exc)) from exc
+            raise
+
+    def info(self, symbol):
+        import yfinance as yf
+        return self._call(lambda: yf.Ticker(symbol).info)
+
+    def news(self, symbol):
+        import yfinance as yf
+        return self._call(lambda: yf.Ticker(symbol).news)
+
+    def quotes(self, symbols):
+        import yfinance as yf
+        data = self._call(lambda: yf.download(
+            list(symbols), period="5d", interval="1d", group_by="ticker",
+            auto_adjust=False, threads=True, progress=False))
+        out = {}
+        if data is None or data.empty:
+            return out
+        for symbol in symbols:
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            bars = data[symbol].dropna(subset=["Close"])
+            if bars.empty:
+                continue
+            last = bars.iloc[-1]
+            out[symbol] = {
+                "current_price":  float(last["Close"]),
+                "previous_close": float(bars["Close"].iloc[-2]) if len(bars) > 1 else None,
+                "open_price":     float(last["Open"]),
+                "day_high":       float(last["High"]),
+                "day_low":        float(last["Low"]),
+                "volume":         int(last["Volume"]),
+            }
+        return out
+
+    def history(self, symbol, interval, start, end=None):
+        import yfinance as yf
+        frame = self._call(lambda: yf.Ticker(symbol).history(
+            start=start, end=end, interval=interval))
+        return [] if frame is None or frame.empty else _frame_to_bars(frame)
+
+    def history_many(self, symbols, interval, start, end=None):
+        import yfinance as yf
+        data = self._call(lambda: yf.download(
+            list(symbols), start=start, end=end, interval=interval,
+            group_by="ticker", threads=True, progress=False))
+        out = {}
+        if data is None or data.empty:
+            return out
+        present = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol in present:
+                bars = _frame_to_bars(data[symbol])
+                if bars:
+                    out[symbol] = bars
+        return out
+
+
+def _seed(symbol):
+    return int.from_bytes(hashlib.sha256(symbol.encode()).digest()[:8], "big")
+
+
+class FakeProvider(MarketDataProvider):
+    """Deterministic, offline feed with configurable latency.
+
+    Prices are a smooth function of the symbol and wall-clock minute, so
+    repeated refreshes move a little but runs are reproducible.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms=0, fail_every=0):
+        self.latency = latency_ms / 1000.0
+        self.fail_every = fail_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _tick(self):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and calls % self.fail_every == 0:
+            raise RateLimited("fake provider rate limit")
+
+    def _price(self, symbol, when=None):
+        seed = _seed(symbol)
+        base = 10 + seed % 490
+        minute = int((when or time.time()) // 60)
+        return round(base * (1 + 0.02 * math.sin(minute / 37 + seed % 97)), 2)
+
+    def info(self, symbol):
+        self._tick()
+        seed = _seed(symbol)
+        price = self._price(symbol)
+        prev = self._price(symbol, time.time() - 86400)
+        return {
+            "symbol":             symbol,
+            "longName":           f"{symbol} Holdings Inc.",
+            "exchange":           "NMS",
+            "currency":           "USD",
+            "marketCap":          int(price * (1e6 + seed % 10**9)),
+            "sector":             ("Technology", "Healthcare", "Energy",
+                                   "Financial Services")[seed % 4],
+            "industry":           "Fake Industry",
+            "regularMarketPrice": price,
+            "currentPrice":       price,
+            "regularMarketPreviousClose": prev,
+            "previousClose":      prev,
+            "regularMarketOpen":  prev,
+            "open":               prev,
+            "dayHigh":            max(price, prev) * 1.01,
+            "dayLow":             min(price, prev) * 0.99,
+            "volume":             seed % 10**7,
+            "averageVolume":      seed % 10**7,
+            "fiftyTwoWeekHigh":   round(price * 1.3, 2),
+            "fiftyTwoWeekLow":    round(price * 0.7, 2),
+            "trailingPE":         5 + seed % 40,
+            "forwardPE":          5 + seed % 35,
+            "trailingEps":        round(price / (5 + seed % 40), 2),
+            "priceToBook":        1 + seed % 9,
+            "beta":               round(0.5 + (seed % 150) / 100, 2),
+            "dividendRate":       None,
+            "dividendYield":      None,
+        }
+
+    def quotes(self, symbols):
+        self._tick()
+        out = {}
+        for symbol in symbols:
+            price = self._price(symbol)
+            prev = self._price(symbol, time.time() - 86400)
+            out[symbol] = {
+                "current_price":  price,
+                "previous_close": prev,
+                "open_price":     prev,
+                "day_high":       max(price, prev) * 1.01,
+                "day_low":        min(price, prev) * 0.99,
+                "volume":         _seed(symbol) % 10**7,
+            }
+        return out
+
+    def history_many(self, symbols, interval, start, end=None):
+        from services.price_history import interval_seconds
+        self._tick()
+        step = interval_seconds(interval)
+        end_ts = (end or datetime.now(timezone.utc)).timestamp()
+        # cap synthetic series at 5000 bars so "max" stays cheap
+        begin = max(start.timestamp(), end_ts - 5000 * step)
+        first = math.ceil(begin / step) * step
+        out = {}
+        for symbol in symbols:
+            bars = []
+            for t in range(int(first), int(end_ts), step):
+                close = self._price(symbol, t)
+                open_ = self._price(symbol, t - step)
+                bars.append((datetime.fromtimestamp(t, timezone.utc), open_,
+                             max(open_, close) * 1.005, min(open_, close) * 0.995,
+                             close, _seed(symbol) % 10**6 + t % 1000))
+            out[symbol] = bars
+        return out
+
+    def news(self, symbol):
+        self._tick()
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return [{
+            "uuid":      f"{symbol}-{i}",
+            "title":     f"{symbol} headline {i}",
+            "publisher": "Fake Wire",
+            "link":      f"https://example.invalid/{symbol}/{i}",
+            "providerPublishTime": int((now - timedelta(hours=i)).timestamp()),
+        } for i in range(20)]
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Return the process-wide provider selected by MARKET_DATA_PROVIDER,
+    wrapped so every upstream call is timed (see services/metrics.py)."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                if MARKET_DATA_PROVIDER == "fake":
+                    provider = FakeProvider(latency_ms=FAKE_PROVIDER_LATENCY_MS)
+                elif MARKET_DATA_PROVIDER == "yfinance":
+                    provider = YFinanceProvider()
+                else:
+                    raise RuntimeError(
+                        f"unknown MARKET_DATA_PROVIDER {MARKET_DATA_PROVIDER!r}")
+                _provider = InstrumentedProvider(provider)
+    return _provider
+
+
+def set_provider(provider):
+    """Swap the process-wide provider (e.g. a FakeProvider in tests)."""
+    global _provider
+    with _provider_lock:
+        _provider = InstrumentedProvider(provider)
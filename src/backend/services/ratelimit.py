@@ -0,0 +1,54 @@
+# src/backend/services/ratelimit.py
+"""Thread-safe token bucket for pacing calls to upstream APIs."""
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow ``rate`` calls per second on average, bursting up to ``capacity``.
+
+    ``penalize(seconds)`` empties the bucket and blocks refills for a while,
+    which is how callers back off after an upstream rate-limit response.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now):
+        if now < self._blocked_until:
+            self._updated = now
+            return
+        start = max(self._updated, self._blocked_until)
+        self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until ``tokens`` are available; False if ``timeout`` expires."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = max(self._blocked_until - now, 0) \
+                    + (tokens - self._tokens) / self.rate
+                if deadline is not None:
+                    if now >= deadline:
+                        return False
+                    wait = min(wait, deadline - now)
+                self._cond.wait(wait)
+
+    def penalize(self, seconds):
+        """Drain the bucket and pause refills for ``seconds``."""
+        with self._cond:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until,
+                                      time.monotonic() + seconds)
+            self._updated = time.monotonic()
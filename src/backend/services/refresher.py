@@ -0,0 +1,193 @@
+# src/backend/services/refresher.py
+"""Background refresher that keeps watched tickers warm.
+
+Every symbol that appears in any ``watchlist_items`` row is re-fetched
+shortly before its row would go stale, so request handlers almost never
+have to refresh on their own. Symbols are ranked by watcher count, how
+recently they were requested and how stale they are; upstream calls are
+paced by a token bucket and back off when the provider rate-limits us.
+
+Run it standalone with ``scripts/run_refresher.py`` or in-process with
+``REFRESHER_IN_PROCESS=1``.
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from config.settings import (
+    REFRESHER_RATE, REFRESHER_BURST, REFRESHER_WORKERS,
+    REFRESHER_POLL_INTERVAL, REFRESHER_REFRESH_AHEAD, REFRESHER_BACKOFF,
+    RAW_INFO_STORAGE, RAW_INFO_PRUNE_INTERVAL,
+)
+from services.db import get_conn
+from services.providers import RateLimited, get_provider
+from services.ratelimit import TokenBucket
+from services.ticker_repo import prune_snapshots
+from services.ticker_service import CACHE_TTL, refresh_ticker
+
+log = logging.getLogger(__name__)
+
+
+def priority(watchers, age_seconds, idle_seconds, ttl_seconds):
+    """Higher is more urgent.
+
+    * staleness — fraction of the TTL already used up (dominant term)
+    * watchers  — log-scaled, so a symbol on 100 lists beats one on 1
+    * recency   — decays over an hour since the last request (any worker,
+      via ``tickers.last_accessed_at``)
+    """
+    staleness = age_seconds / ttl_seconds
+    popularity = math.log1p(watchers)
+    recency = 0.0 if idle_seconds is None else math.exp(-idle_seconds / 3600)
+    return 2.0 * staleness + popularity + recency
+
+
+class Refresher:
+    """Priority-scheduled, rate-limited refresh loop."""
+
+    def __init__(self, provider=None, rate=REFRESHER_RATE, burst=REFRESHER_BURST,
+                 workers=REFRESHER_WORKERS, poll_interval=REFRESHER_POLL_INTERVAL,
+                 refresh_ahead=REFRESHER_REFRESH_AHEAD, backoff=REFRESHER_BACKOFF,
+                 ttl=CACHE_TTL):
+        self.provider = provider or get_provider()
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.refresh_ahead = refresh_ahead
+        self.backoff = backoff
+        self.ttl = ttl.total_seconds()
+
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="refresher")
+        self._slots = threading.Semaphore(workers)
+        self._queued = set()     # symbols currently scheduled or running
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.refreshed = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    # -- scheduling ----------------------------------------------------
+    def candidates(self):
+        """Watched symbols with their watcher count and row age."""
+        with get_conn() as conn, conn.cursor() as cur:
+            cur.execute("""
+                SELECT t.symbol,
+                       COUNT(DISTINCT wi.watchlist_id) AS watchers,
+                       t.last_fetched_at, t.last_accessed_at
+                  FROM public.watchlist_items wi
+                  JOIN public.tickers t ON t.id = wi.ticker_id
+                 GROUP BY t.symbol, t.last_fetched_at, t.last_accessed_at
+            """)
+            return cur.fetchall()
+
+    def build_queue(self, rows, now_utc=None):
+        """Heap of ``(-priority, symbol)`` for rows due for a refresh."""
+        now_utc = now_utc or datetime.now(timezone.utc)
+        due_after = self.ttl * self.refresh_ahead
+        heap = []
+        for row in rows:
+            last = row["last_fetched_at"]
+            if last is None:
+                age = math.inf
+            else:
+                if last.tzinfo is None:
+                    last = last.replace(tzinfo=timezone.utc)
+                age = (now_utc - last).total_seconds()
+            if age < due_after:
+                continue
+            seen = row.get("last_accessed_at")
+            idle = None if seen is None else max(0.0, (now_utc - seen).total_seconds())
+            score = priority(row["watchers"], min(age, 10 * self.ttl), idle, self.ttl)
+            heapq.heappush(heap, (-score, row["symbol"]))
+        return heap
+
+    # -- execution -----------------------------------------------------
+    def _refresh(self, symbol):
+        outcome = "refreshed"
+        try:
+            refresh_ticker(symbol, provider=self.provider)
+        except RateLimited as exc:
+            outcome = "rate_limited"
+            log.warning("rate limited refreshing %s; backing off %ss: %s",
+                        symbol, self.backoff, exc)
+            self.bucket.penalize(self.backoff)
+        except Exception:
+            outcome = "failed"
+            log.exception("refresh of %s failed", symbol)
+        finally:
+            with self._lock:
+                self._queued.discard(symbol)
+                setattr(self, outcome, getattr(self, outcome) + 1)
+            self._slots.release()
+
+    def run_once(self):
+        """Schedule one pass over every due symbol; returns how many."""
+        heap = self.build_queue(self.candidates())
+        scheduled = 0
+        while heap and not self._stop.is_set():
+            _, symbol = heapq.heappop(heap)
+            with self._lock:
+                if symbol in self._queued:
+                    continue
+                self._queued.add(symbol)
+            self._slots.acquire()
+            self.bucket.acquire()
+            self._executor.submit(self._refresh, symbol)
+            scheduled += 1
+        return scheduled
+
+    def prune(self):
+        """Apply the raw_info snapshot retention policy."""
+        with get_conn() as conn, conn.cursor() as cur:
+            n = prune_snapshots(cur)
+        if n:
+            log.info("pruned %d ticker_info_snapshots", n)
+        return n
+
+    def run_forever(self):
+        log.info("refresher started (%s workers)", self.workers)
+        last_prune = None
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                n = self.run_once()
+                if n:
+                    log.info("scheduled %d refreshes", n)
+            except Exception:
+                log.exception("refresher pass failed")
+            if RAW_INFO_STORAGE == "snapshot" and (
+                    last_prune is None or started - last_prune >= RAW_INFO_PRUNE_INTERVAL):
+                last_prune = started
+                try:
+                    self.prune()
+                except Exception:
+                    log.exception("snapshot pruning failed")
+            self._stop.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    def start(self):
+        """Run the loop on a daemon thread."""
+        self._thread = threading.Thread(target=self.run_forever,
+                                        name="refresher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if self._thread is not None and wait:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def stats(self):
+        return {
+            "queued":       len(self._queued),
+            "refreshed":    self.refreshed,
+            "failed":       self.failed,
+            "rate_limited": self.rate_limited,
+        }
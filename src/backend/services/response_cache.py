@@ -0,0 +1,108 @@
+# src/backend/services/response_cache.py
+"""Bounded in-process cache of serialized responses.
+
+Entries are the final response bytes, so a hit skips the pool, the query
+and ``jsonify``. Keys are ``(endpoint, symbol, args, mimetype)``. Each entry expires
+after its endpoint's TTL, and the least recently used entry is evicted
+once ``max_entries`` is reached. ``invalidate(symbol)`` drops every entry
+for a symbol. ticker_service calls it after upserting a row, and the
+price-feed listener calls it when another process refreshed the symbol.
+
+A per-symbol generation counter guards against a miss that read the old
+row but stores its body after the invalidation; such puts are discarded.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTLS
+
+
+class ResponseCache:
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttls=RESPONSE_CACHE_TTLS):
+        self.max_entries = max_entries
+        self.ttls = dict(ttls)
+        self._entries = OrderedDict()   # key -> (expires_at, body)
+        self._by_symbol = {}            # symbol -> set of keys
+        self._generations = {}          # symbol -> int
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def generation(self, symbol):
+        return self._generations.get(symbol, 0)
+
+    def get(self, key):
+        """Cached body for ``key`` or ``None``; refreshes its LRU position."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._drop(key)
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, body, generation):
+        """Store ``body`` unless the symbol was invalidated since ``generation``."""
+        endpoint, symbol = key[0], key[1]
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return
+        with self._lock:
+            if self._generations.get(symbol, 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, body)
+            self._entries.move_to_end(key)
+            self._by_symbol.setdefault(symbol, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, *symbols):
+        with self._lock:
+            for symbol in symbols:
+                self._generations[symbol] = self._generations.get(symbol, 0) + 1
+                for key in self._by_symbol.pop(symbol, ()):
+                    self._entries.pop(key, None)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_symbol.clear()
+            self._generations.clear()
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        keys = self._by_symbol.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_symbol[key[1]]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries":       len(self._entries),
+                "max_entries":   self.max_entries,
+                "bytes":         sum(len(body) for _, body in self._entries.values()),
+                "hits":          self.hits,
+                "misses":        self.misses,
+                "hit_ratio":     round(self.hits / lookups, 4) if lookups else None,
+                "evictions":     self.evictions,
+                "expirations":   self.expirations,
+                "invalidations": self.invalidations,
+                "ttls":          self.ttls,
+            }
+
+
+cache = ResponseCache()
@@ -0,0 +1,271 @@
+# src/backend/services/screener.py
+"""Screen ``public.tickers`` on its stored fundamentals.
+
+Filter DSL (query-string friendly):
+
+* ``<column>.<op>=<number>`` with ``op`` one of gt, gte, lt, lte, eq,
+  for any column in ``NUMERIC``, e.g. ``market_cap.gte=1e10``
+* ``<column>=a,b,c`` for ``CATEGORICAL`` columns (in-list), e.g.
+  ``sector=Technology,Healthcare``
+* ``sort=<column>`` or ``sort=-<column>`` (descending), default ``-market_cap``
+* ``limit`` (1..``MAX_LIMIT``) and ``cursor`` (opaque, from the previous page)
+
+Column names only ever come from the whitelists below; values are always
+bound parameters. Pages are keyset-paginated on ``(sort column, symbol)``,
+which the indexes from migration 2c6f9a1d8e35 serve for the common sort
+columns; rows whose sort column is NULL are left out.
+
+``SCREENER_MODE=snapshot`` (or ``?mode=snapshot``) answers from an
+in-memory NumPy column store of the whole table instead, rebuilt every
+``SCREENER_SNAPSHOT_TTL`` seconds. Both modes take the same filters and
+cursors and return the same rows.
+"""
+import base64
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from config.settings import SCREENER_SNAPSHOT_TTL
+from services.db import get_conn
+
+NUMERIC = (
+    "market_cap", "current_price", "volume", "avg_volume",
+    "fifty_two_week_high", "fifty_two_week_low", "trailing_pe", "forward_pe",
+    "eps_ttm", "price_to_book", "beta", "dividend_rate", "dividend_yield",
+    "full_time_employees",
+)
+CATEGORICAL = ("sector", "industry", "exchange", "currency")
+RESULT_COLUMNS = ("symbol", "name", "exchange", "sector", "industry", "current_price",
+                  "market_cap", "trailing_pe", "forward_pe", "eps_ttm", "price_to_book",
+                  "beta", "dividend_yield")
+DEFAULT_SORT = "-market_cap"
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+_SQL_OPS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "eq": "="}
+_NP_OPS = {"gt": np.greater, "gte": np.greater_equal, "lt": np.less,
+           "lte": np.less_equal, "eq": np.equal}
+
+
+@dataclass
+class Screen:
+    ranges: list = field(default_factory=list)      # [(column, op, number)]
+    in_lists: dict = field(default_factory=dict)    # {column: [values]}
+    sort: str = "market_cap"
+    descending: bool = True
+    limit: int = DEFAULT_LIMIT
+    after: tuple = None                              # (sort value, symbol)
+
+
+def _param(value):
+    """Integral values as ``int`` so they compare with bigint columns without
+    casting the column (which would rule out its index)."""
+    if value is None:
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def encode_cursor(sort, value, symbol):
+    raw = json.dumps([sort, value, symbol], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, symbol = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor") from None
+    if cursor_sort != sort:
+        raise ValueError("cursor belongs to a different sort order")
+    return value, symbol
+
+
+def parse(args):
+    """Build a ``Screen`` from a mapping of query arguments; ValueError if bad."""
+    screen = Screen()
+    sort = args.get("sort") or DEFAULT_SORT
+    screen.descending = sort.startswith("-")
+    screen.sort = sort.lstrip("-")
+    if screen.sort not in NUMERIC and screen.sort != "symbol":
+        raise ValueError(f"cannot sort by {screen.sort!r}")
+    try:
+        screen.limit = min(max(int(args.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        raise ValueError("limit must be an integer") from None
+    if args.get("cursor"):
+        screen.after = decode_cursor(args["cursor"], sort)
+
+    for key, value in args.items():
+        if key in ("sort", "limit", "cursor", "mode") or key.startswith("__"):
+            continue
+        column, _, op = key.partition(".")
+        if column in CATEGORICAL and not op:
+            values = [v.strip() for v in value.split(",") if v.strip()]
+            if values:
+                screen.in_lists[column] = values
+        elif column in NUMERIC and op in _SQL_OPS:
+            try:
+                number = float(value)
+            except ValueError:
+                raise ValueError(f"{key} must be a number") from None
+            if not math.isfinite(number):
+                raise ValueError(f"{key} must be finite")
+            screen.ranges.append((column, op, _param(number)))
+        else:
+            raise ValueError(f"unknown filter {key!r}")
+    return screen
+
+
+def compile_sql(screen):
+    """``(sql, params)`` for one page (``limit + 1`` rows, to detect a next page)."""
+    where, params = [], []
+    for column, op, value in screen.ranges:
+        where.append(f"{column} {_SQL_OPS[op]} %s")
+        params.append(value)
+    for column, values in screen.in_lists.items():
+        where.append(f"{column} = ANY(%s)")
+        params.append(values)
+
+    direction = "DESC" if screen.descending else "ASC"
+    cmp = "<" if screen.descending else ">"
+    if screen.sort == "symbol":
+        order = f"symbol {direction}"
+        if screen.after is not None:
+            where.append(f"symbol {cmp} %s")
+            params.append(screen.after[1])
+    else:
+        order = f"{screen.sort} {direction}, symbol {direction}"
+        where.append(f"{screen.sort} IS NOT NULL")
+        if screen.after is not None:
+            where.append(f"({screen.sort}, symbol) {cmp} (%s, %s)")
+            params.extend(screen.after)
+
+    sql = f"""
+        SELECT {", ".join(RESULT_COLUMNS)}
+          FROM public.tickers
+         {"WHERE " + " AND ".join(where) if where else ""}
+         ORDER BY {order}
+         LIMIT %s
+    """
+    params.append(screen.limit + 1)
+    return sql, params
+
+
+def _page(screen, rows):
+    """Trim the look-ahead row and build the next cursor."""
+    next_cursor = None
+    if len(rows) > screen.limit:
+        rows = rows[:screen.limit]
+        last = rows[-1]
+        sort = ("-" if screen.descending else "") + screen.sort
+        value = None if screen.sort == "symbol" else _param(last[screen.sort])
+        next_cursor = encode_cursor(sort, value, last["symbol"])
+    return rows, next_cursor
+
+
+def run_sql(screen):
+    sql, params = compile_sql(screen)
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(sql, params)
+        rows = [dict(r) for r in cur.fetchall()]
+    return _page(screen, rows)
+
+
+class Snapshot:
+    """Column-per-array copy of ``tickers`` for in-memory screening."""
+
+    def __init__(self, rows):
+        self.loaded_at = time.monotonic()
+        self.size = len(rows)
+        self.symbols = np.array([r["symbol"] for r in rows], dtype=str)
+        self.numeric = {
+            c: np.array([np.nan if r[c] is None else float(r[c]) for r in rows],
+                        dtype=np.float64)
+            for c in NUMERIC
+        }
+        self.text = {
+            c: np.array([r[c] or "" for r in rows], dtype=str)
+            for c in set(CATEGORICAL) | {"name"}
+        }
+
+    def screen(self, screen):
+        mask = np.ones(self.size, dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for column, op, value in screen.ranges:
+                # NaN (NULL) never satisfies a comparison, as in SQL
+                mask &= _NP_OPS[op](self.numeric[column], value)
+        for column, values in screen.in_lists.items():
+            mask &= np.isin(self.text[column], values)
+
+        key = None if screen.sort == "symbol" else self.numeric[screen.sort]
+        if key is not None:
+            mask &= ~np.isnan(key)
+        if screen.after is not None:
+            value, symbol = screen.after
+            if screen.descending:
+                after = self.symbols < symbol
+                if key is not None:
+                    after = (key < value) | ((key == value) & after)
+            else:
+                after = self.symbols > symbol
+                if key is not None:
+                    after = (key > value) | ((key == value) & after)
+            mask &= after
+
+        idx = np.flatnonzero(mask)
+        keys = (self.symbols[idx],) if key is None else (self.symbols[idx], key[idx])
+        order = np.lexsort(keys)
+        if screen.descending:
+            order = order[::-1]
+        idx = idx[order[:screen.limit + 1]]
+        return _page(screen, [self._row(i) for i in idx])
+
+    def _row(self, i):
+        row = {}
+        for c in RESULT_COLUMNS:
+            if c == "symbol":
+                row[c] = str(self.symbols[i])
+            elif c in self.numeric:
+                v = self.numeric[c][i]
+                row[c] = None if np.isnan(v) else float(v)
+            else:
+                row[c] = str(self.text[c][i]) or None
+        return row
+
+
+def load_snapshot():
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT symbol, name, {", ".join(NUMERIC)}, {", ".join(CATEGORICAL)}
+              FROM public.tickers
+        """)
+        return Snapshot(cur.fetchall())
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot():
+    """The current snapshot, rebuilt when older than SCREENER_SNAPSHOT_TTL."""
+    global _snapshot
+    snap = _snapshot
+    if snap is None or time.monotonic() - snap.loaded_at > SCREENER_SNAPSHOT_TTL:
+        with _snapshot_lock:
+            snap = _snapshot
+            if snap is None or time.monotonic() - snap.loaded_at > SCREENER_SNAPSHOT_TTL:
+                snap = _snapshot = load_snapshot()
+    return snap
+
+
+def run(screen, mode="sql"):
+    """Rows for one page plus the next cursor (``None`` on the last page)."""
+    if mode == "snapshot":
+        return get_snapshot().screen(screen)
+    return run_sql(screen)
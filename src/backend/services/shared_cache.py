@@ -0,0 +1,266 @@
+# src/backend/services/shared_cache.py
+"""Cache and lease backend shared by every worker process (and node).
+
+``SingleFlight`` only collapses refreshes inside one process. With several
+gunicorn workers, each one would otherwise decide a row is stale and call
+upstream on its own. Refreshes therefore take a per-symbol *lease* here
+first. The holder refreshes; everyone else waits for the lease to be
+released and reads the row it wrote.
+
+Backends, chosen by ``SHARED_CACHE_URL``:
+
+* ``""`` / ``local://``   – in-process only (the single-worker default)
+* ``file:///some/dir``    – files + ``flock`` in a local directory; shares
+  leases across worker processes on one host, no external service
+* ``redis://host:6379/0`` – Redis (``SET NX PX`` leases); shares across
+  nodes; needs the optional ``redis`` package
+
+Leases carry a TTL, so a worker that dies mid-refresh only blocks the
+symbol until its lease expires.
+"""
+import fcntl
+import hashlib
+import os
+import threading
+import time
+import uuid
+from urllib.parse import urlparse
+
+from config.settings import SHARED_CACHE_URL
+
+
+class SharedCache:
+    """Interface: byte values with TTLs plus expiring, token-owned leases."""
+
+    poll_interval = 0.05
+
+    def __init__(self):
+        self.leases_acquired = 0
+        self.leases_contended = 0
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def _acquire(self, key, token, ttl):
+        raise NotImplementedError
+
+    def release(self, key, token):
+        """Release ``key`` if ``token`` still owns it."""
+        raise NotImplementedError
+
+    def held(self, key):
+        raise NotImplementedError
+
+    def acquire(self, key, ttl):
+        """Try to take the lease; returns an owner token or ``None``."""
+        token = uuid.uuid4().hex
+        if self._acquire(key, token, ttl):
+            self.leases_acquired += 1
+            return token
+        self.leases_contended += 1
+        return None
+
+    def wait(self, key, timeout):
+        """Block until the lease on ``key`` is released; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self.held(key):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def stats(self):
+        return {
+            "backend":          type(self).__name__,
+            "leases_acquired":  self.leases_acquired,
+            "leases_contended": self.leases_contended,
+        }
+
+
+class LocalCache(SharedCache):
+    """Process-local backend; leases only exclude threads of this process."""
+
+    def __init__(self):
+        super().__init__()
+        self._values = {}    # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+
+    def _acquire(self, key, token, ttl):
+        with self._lock:
+            if self._live("lease:" + key) is not None:
+                return False
+            self._values["lease:" + key] = (time.monotonic() + ttl, token)
+            return True
+
+    def release(self, key, token):
+        with self._lock:
+            entry = self._live("lease:" + key)
+            if entry is not None and entry[1] == token:
+                del self._values["lease:" + key]
+
+    def held(self, key):
+        with self._lock:
+            return self._live("lease:" + key) is not None
+
+
+class FileCache(SharedCache):
+    """One file per key under ``directory``; ``flock`` guards lease changes.
+
+    Each file holds ``<expires_at epoch>\\n<value>``. Writes go to a temp
+    file and ``os.replace``, so readers never see a partial value.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as f:
+                expires, _, value = f.read().partition(b"\n")
+        except FileNotFoundError:
+            return None
+        if float(expires) <= time.time():
+            return None
+        return value
+
+    def _write(self, path, value, ttl):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(f"{time.time() + ttl}\n".encode() + value)
+        os.replace(tmp, path)
+
+    def get(self, key):
+        return self._read(self._path(key))
+
+    def set(self, key, value, ttl):
+        self._write(self._path(key), value, ttl)
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _locked(self, path):
+        fd = os.open(path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def _acquire(self, key, token, ttl):
+        path = self._path("lease:" + key)
+        fd = self._locked(path)
+        try:
+            if self._read(path) is not None:
+                return False
+            self._write(path, token.encode(), ttl)
+            return True
+        finally:
+            os.close(fd)    # also drops the flock
+
+    def release(self, key, token):
+        path = self._path("lease:" + key)
+        fd = self._locked(path)
+        try:
+            if self._read(path) == token.encode():
+                os.unlink(path)
+        finally:
+            os.close(fd)
+
+    def held(self, key):
+        return self._read(self._path("lease:" + key)) is not None
+
+
+class RedisCache(SharedCache):
+    """Redis backend; leases are ``SET NX PX`` with compare-and-delete release."""
+
+    _RELEASE = """
+        if redis.call('get', KEYS[1]) == ARGV[1] then
+            return redis.call('del', KEYS[1])
+        end
+        return 0
+    """
+
+    def __init__(self, url, prefix="finapp:"):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_CACHE_URL=redis://… needs the `redis` package") from None
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._release = self.client.register_script(self._RELEASE)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def _acquire(self, key, token, ttl):
+        return bool(self.client.set(self.prefix + "lease:" + key, token,
+                                    nx=True, px=int(ttl * 1000)))
+
+    def release(self, key, token):
+        self._release(keys=[self.prefix + "lease:" + key], args=[token])
+
+    def held(self, key):
+        return bool(self.client.exists(self.prefix + "lease:" + key))
+
+
+def from_url(url):
+    parsed = urlparse(url or "local://")
+    if parsed.scheme == "local":
+        return LocalCache()
+    if parsed.scheme == "file":
+        return FileCache(parsed.path)
+    if parsed.scheme in ("redis", "rediss"):
+        return RedisCache(url)
+    raise ValueError(f"unsupported SHARED_CACHE_URL {url!r}")
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """The process-wide backend configured by ``SHARED_CACHE_URL``."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = from_url(SHARED_CACHE_URL)
+    return _shared
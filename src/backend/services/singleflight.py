@@ -0,0 +1,86 @@
+# src/backend/services/singleflight.py
+"""Collapse concurrent calls for the same key into one in-flight call."""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class SingleFlight:
+    """Per-key call deduplication.
+
+    While a call for ``key`` is running, every other caller for the same key
+    shares its result (or exception) instead of starting a second call.
+    """
+
+    def __init__(self, max_workers=4, thread_name_prefix="singleflight"):
+        self._lock = threading.Lock()
+        self._calls = {}   # key -> Future
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+
+    def _claim(self, key):
+        """Return (future, owner) — owner is True if the caller must run it."""
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                return fut, False
+            fut = Future()
+            self._calls[key] = fut
+            return fut, True
+
+    def _run(self, key, fut, fn, args, kwargs):
+        try:
+            fut.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            fut.set_exception(exc)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run ``fn`` on the calling thread unless a call is already in flight."""
+        fut, owner = self._claim(key)
+        if owner:
+            self._run(key, fut, fn, args, kwargs)
+        return fut.result()
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Schedule ``fn`` in the background; returns the (shared) Future."""
+        fut, owner = self._claim(key)
+        if owner:
+            self._executor.submit(self._run, key, fut, fn, args, kwargs)
+        return fut
+
+    def submit_many(self, keys, fn, *args, **kwargs):
+        """One background ``fn(owned_keys)`` for the keys not already in flight.
+
+        ``fn`` returns ``{key: result}``; keys it leaves out resolve to
+        ``None``. Returns ``{key: Future}`` for every key, so overlapping
+        batches share the calls that cover each key.
+        """
+        futures, owned = {}, {}
+        for key in keys:
+            fut, owner = self._claim(key)
+            futures[key] = fut
+            if owner:
+                owned[key] = fut
+        if owned:
+            self._executor.submit(self._run_many, owned, fn, args, kwargs)
+        return futures
+
+    def _run_many(self, futures, fn, args, kwargs):
+        try:
+            results = fn(list(futures), *args, **kwargs)
+        except BaseException as exc:
+            for fut in futures.values():
+                fut.set_exception(exc)
+        else:
+            for key, fut in futures.items():
+                fut.set_result(results.get(key))
+        finally:
+            with self._lock:
+                for key in futures:
+                    self._calls.pop(key, None)
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
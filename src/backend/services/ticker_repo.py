@@ -0,0 +1,199 @@
+# src/backend/services/ticker_repo.py
+"""The one place that writes provider ``info`` dicts into ``public.tickers``.
+
+``FIELDS`` is the single yfinance→column mapping. Where yfinance has
+renamed a key over time, the alternatives are listed in order of
+preference. ``upsert_many`` writes any number of symbols in one
+``execute_values`` statement. Rows whose ``raw_info`` content hash did not
+change only get ``last_fetched_at`` bumped, so unchanged JSONB blobs are
+not rewritten.
+
+With ``RAW_INFO_STORAGE=snapshot`` (the default) the hot ``tickers`` row
+keeps only the typed columns. The raw payload goes, zlib-compressed, to
+the append-only ``ticker_info_snapshots`` table, and only when its stable
+part changed: quote fields such as prices, volumes and ranges are already
+typed columns and are left out of the snapshot hash.
+``prune_snapshots`` applies the retention policy.
+"""
+import hashlib
+import json
+import zlib
+
+from psycopg2.extras import Json, execute_values
+
+from config.settings import RAW_INFO_STORAGE, RAW_INFO_RETENTION_DAYS
+
+# Columns returned to API callers (fetch_basic, /tickers/batch, upserts)
+BASIC_COLUMNS = """
+  symbol, name, exchange, currency,
+  market_cap, sector, industry,
+  full_time_employees, website, long_business_summary,
+  current_price, previous_close, open_price,
+  day_high, day_low, volume, avg_volume,
+  fifty_two_week_high, fifty_two_week_low,
+  trailing_pe, forward_pe, eps_ttm,
+  price_to_book, beta, dividend_rate, dividend_yield
+"""
+
+# column -> yfinance info keys, first non-null wins
+FIELDS = (
+    ("name",                  ("longName", "shortName")),
+    ("exchange",              ("exchange",)),
+    ("currency",              ("currency",)),
+    ("market_cap",            ("marketCap",)),
+    ("sector",                ("sector",)),
+    ("industry",              ("industry",)),
+    ("full_time_employees",   ("fullTimeEmployees",)),
+    ("website",               ("website",)),
+    ("long_business_summary", ("longBusinessSummary",)),
+    ("current_price",         ("regularMarketPrice", "currentPrice")),
+    ("previous_close",        ("regularMarketPreviousClose", "previousClose")),
+    ("open_price",            ("regularMarketOpen", "open")),
+    ("day_high",              ("dayHigh", "regularMarketDayHigh")),
+    ("day_low",               ("dayLow", "regularMarketDayLow")),
+    ("volume",                ("volume", "regularMarketVolume")),
+    ("avg_volume",            ("averageVolume",)),
+    ("fifty_two_week_high",   ("fiftyTwoWeekHigh",)),
+    ("fifty_two_week_low",    ("fiftyTwoWeekLow",)),
+    ("trailing_pe",           ("trailingPE",)),
+    ("forward_pe",            ("forwardPE",)),
+    ("eps_ttm",               ("epsTrailingTwelveMonths", "trailingEps")),
+    ("price_to_book",         ("priceToBook",)),
+    ("beta",                  ("beta",)),
+    ("dividend_rate",         ("dividendRate",)),
+    ("dividend_yield",        ("dividendYield",)),
+)
+COLUMNS = [c for c, _ in FIELDS]
+
+# info keys that move with the quote; excluded from the snapshot hash
+_VOLATILE_PREFIXES = ("regularMarket", "preMarket", "postMarket", "fiftyTwoWeek",
+                      "fiftyDayAverage", "twoHundredDayAverage", "bid", "ask")
+_VOLATILE_KEYS = {
+    "currentPrice", "previousClose", "open", "dayHigh", "dayLow", "volume",
+    "averageVolume", "averageVolume10days", "averageDailyVolume10Day",
+    "averageDailyVolume3Month", "marketCap", "enterpriseValue", "trailingPE",
+    "forwardPE", "priceToBook", "priceToSalesTrailing12Months", "pegRatio",
+    "trailingPegRatio", "enterpriseToRevenue", "enterpriseToEbitda",
+    "dividendYield", "trailingAnnualDividendYield", "52WeekChange",
+    "SandP52WeekChange", "marketState", "quoteType", "exchangeDataDelayedBy",
+}
+
+
+def info_hash(info):
+    """Stable content hash of an ``info`` dict (key order independent)."""
+    raw = json.dumps(info, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def stable_part(info):
+    """``info`` without the quote-driven keys (what snapshots keep track of)."""
+    return {k: v for k, v in info.items()
+            if k not in _VOLATILE_KEYS and not k.startswith(_VOLATILE_PREFIXES)}
+
+
+def compress(info):
+    return zlib.compress(
+        json.dumps(info, separators=(",", ":"), default=str).encode(), 6)
+
+
+def decompress(payload):
+    return json.loads(zlib.decompress(bytes(payload)))
+
+
+def to_row(symbol, info, inline=True):
+    """``(symbol, *COLUMNS, raw_info, raw_info_hash)`` for one ``info`` dict.
+
+    ``raw_info`` is ``None`` unless ``inline`` (legacy storage mode).
+    """
+    values = []
+    for column, keys in FIELDS:
+        value = next((info[k] for k in keys if info.get(k) is not None), None)
+        values.append(value)
+    if values[0] is None:
+        values[0] = symbol   # name is NOT NULL
+    return (symbol, *values, Json(info) if inline else None, info_hash(info))
+
+
+def upsert_many(cur, infos, storage=RAW_INFO_STORAGE):
+    """Upsert ``{symbol: info}`` in one statement; returns ``(rows, changed)``.
+
+    ``rows`` maps every symbol to its ``id`` + ``BASIC_COLUMNS``;
+    ``changed`` is the set of symbols whose content actually changed (new
+    rows included). Unchanged rows only have ``last_fetched_at`` bumped.
+    ``storage`` is ``"snapshot"`` or ``"inline"`` (raw_info on the row).
+    """
+    if not infos:
+        return {}, set()
+    inline = storage == "inline"
+    returning = "id, " + BASIC_COLUMNS
+    written = execute_values(cur, f"""
+        INSERT INTO public.tickers
+          (symbol, {", ".join(COLUMNS)}, raw_info, raw_info_hash,
+           updated_at, last_fetched_at)
+        VALUES %s
+        ON CONFLICT (symbol) DO UPDATE SET
+          {", ".join(f"{c} = EXCLUDED.{c}" for c in COLUMNS)},
+          raw_info        = EXCLUDED.raw_info,
+          raw_info_hash   = EXCLUDED.raw_info_hash,
+          updated_at      = now(),
+          last_fetched_at = now()
+        WHERE tickers.raw_info_hash IS DISTINCT FROM EXCLUDED.raw_info_hash
+        RETURNING {returning}
+    """, [to_row(s, info, inline) for s, info in infos.items()],
+       template=f"({', '.join(['%s'] * (len(COLUMNS) + 3))}, now(), now())",
+       page_size=len(infos), fetch=True)
+    rows = {r["symbol"]: dict(r) for r in written}
+    changed = set(rows)
+
+    unchanged = [s for s in infos if s not in rows]
+    if unchanged:
+        cur.execute(f"""
+            UPDATE public.tickers SET last_fetched_at = now()
+             WHERE symbol = ANY(%s)
+            RETURNING {returning}
+        """, (unchanged,))
+        rows.update((r["symbol"], dict(r)) for r in cur.fetchall())
+    if changed and not inline:
+        write_snapshots(cur, {s: infos[s] for s in changed})
+    return rows, changed
+
+
+def write_snapshots(cur, infos):
+    """Append a compressed snapshot for each symbol whose stable part changed."""
+    snapshots = []
+    for symbol, info in infos.items():
+        stable = stable_part(info)
+        snapshots.append((symbol, info_hash(stable), compress(info)))
+    execute_values(cur, """
+        INSERT INTO public.ticker_info_snapshots (symbol, info_hash, payload)
+        SELECT v.symbol, v.info_hash, v.payload
+          FROM (VALUES %s) AS v(symbol, info_hash, payload)
+         WHERE v.info_hash IS DISTINCT FROM (
+               SELECT s.info_hash FROM public.ticker_info_snapshots s
+                WHERE s.symbol = v.symbol
+                ORDER BY s.captured_at DESC LIMIT 1)
+    """, snapshots, template="(%s, %s, %s::bytea)", page_size=len(snapshots))
+
+
+def latest_snapshot(cur, symbol):
+    """The most recent raw ``info`` stored for ``symbol``, or ``None``."""
+    cur.execute("""
+        SELECT payload FROM public.ticker_info_snapshots
+         WHERE symbol = %s
+         ORDER BY captured_at DESC LIMIT 1
+    """, (symbol,))
+    row = cur.fetchone()
+    return None if row is None else decompress(row["payload"])
+
+
+def prune_snapshots(cur, retention_days=RAW_INFO_RETENTION_DAYS):
+    """Drop snapshots older than the retention window, always keeping the
+    newest one per symbol. Returns the number of rows deleted."""
+    cur.execute("""
+        DELETE FROM public.ticker_info_snapshots s
+         WHERE s.captured_at < now() - make_interval(days => %s)
+           AND s.id <> (SELECT l.id FROM public.ticker_info_snapshots l
+                         WHERE l.symbol = s.symbol
+                         ORDER BY l.captured_at DESC LIMIT 1)
+    """, (retention_days,))
+    return cur.rowcount
@@ -1,80 +1,310 @@
-# src/backend/routes/tickers.py
-import os
-import psycopg2
-from psycopg2.extras import RealDictCursor, Json
-from dotenv import load_dotenv
-import yfinance as yf
+# src/backend/services/ticker_service.py
+import base64
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import wait as wait_futures
+from psycopg2.extras import execute_values
 from datetime import timedelta, datetime, timezone
 from flask import Blueprint, jsonify, request
-from config.settings import DATABASE_URL
+from config.settings import (
+    ACCESS_FLUSH_INTERVAL, BATCH_REFRESH_TIMEOUT, INDICATOR_STATE_CACHE_SIZE,
+    STALE_WHILE_REVALIDATE, REFRESH_WORKERS, REFRESH_LEASE_TTL,
+)
+from services.db import get_conn
+from services.indicators import IndicatorState, compute_many
+from services.metrics import cache_result
+from services.price_history import get_bars, get_bars_many, get_chart
+from services.pricefeed import notify_quotes
+from services.response_cache import cache as response_cache
+from services.shared_cache import get_shared_cache
+from services.ticker_repo import BASIC_COLUMNS, upsert_many
+from services.providers import get_provider
+from services.singleflight import SingleFlight
+
+log = logging.getLogger(__name__)
 
 bp = Blueprint("tickers", __name__, url_prefix="/tickers")
 
 # Time‐to‐live for our cached rows
 CACHE_TTL = timedelta(minutes=5)
 
-def get_conn():
-    return psycopg2.connect(DATABASE_URL, cursor_factory=RealDictCursor)
+# Shared by every request thread: concurrent refreshes of one symbol
+# collapse into a single upstream call.
+_refreshes = SingleFlight(max_workers=REFRESH_WORKERS,
+                          thread_name_prefix="ticker-refresh")
+# bulk quote downloads, one flight per symbol so overlapping batches merge
+_quotes = SingleFlight(max_workers=2, thread_name_prefix="quote-refresh")
 
-def fetch_basic(symbol):
-    """Fetch the basic fields, refreshing from yfinance if stale."""
+
+# symbol -> wall time of the last request that read it, not yet written to
+# tickers.last_accessed_at. Flushed in one UPDATE at most every
+# ACCESS_FLUSH_INTERVAL seconds, so the standalone refresher sees what
+# every worker served and ranks recently viewed symbols first.
+_accessed = {}
+_access_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def record_access(symbol):
+    global _last_flush
+    now = time.monotonic()
+    with _access_lock:
+        _accessed[symbol] = datetime.now(timezone.utc)
+        if now - _last_flush < ACCESS_FLUSH_INTERVAL:
+            return
+        _last_flush = now
+        batch = dict(_accessed)
+        _accessed.clear()
+    threading.Thread(target=_flush_access, args=(batch,),
+                     name="access-flush", daemon=True).start()
+
+
+def _flush_access(batch):
+    try:
+        with get_conn() as conn, conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE public.tickers AS t SET last_accessed_at = v.seen
+                  FROM (VALUES %s) AS v (symbol, seen)
+                 WHERE t.symbol = v.symbol
+                   AND (t.last_accessed_at IS NULL OR t.last_accessed_at < v.seen)
+            """, list(batch.items()), template="(%s, %s::timestamptz)")
+    except Exception as exc:
+        log.warning("recording access times for %d symbols failed: %s", len(batch), exc)
+
+
+def is_stale(row, now_utc=None, ttl=CACHE_TTL):
+    """True if the row is missing or older than ``ttl`` (CACHE_TTL)."""
+    now_utc = now_utc or datetime.now(timezone.utc)
+    last = row and row["last_fetched_at"]
+    return (
+        row is None
+        or last is None
+        # if last had no tzinfo, assume UTC
+        or (last if last.tzinfo else last.replace(tzinfo=timezone.utc))
+           < (now_utc - ttl)
+    )
+
+
+def _read_basic(symbol):
+    """The stored row (``BASIC_COLUMNS`` + ``last_fetched_at``) or ``None``."""
     with get_conn() as conn, conn.cursor() as cur:
-        # 1) Try to read existing row
-        cur.execute("""
-            SELECT
-              symbol, name, exchange, current_price,
-              sector, market_cap, last_fetched_at
+        cur.execute(f"""
+            SELECT {BASIC_COLUMNS}, last_fetched_at
             FROM public.tickers
             WHERE symbol = %s
         """, (symbol,))
         row = cur.fetchone()
+    return None if row is None else dict(row)
+
+
+class RefreshBusy(Exception):
+    """Another worker holds the refresh lease and there is no row to serve yet."""
+
+
+def _fresh(row, ttl):
+    if is_stale(row, ttl=ttl):
+        return None
+    row.pop("last_fetched_at")
+    return row
+
+
+def _refresh_ticker(symbol, provider=None):
+    """Refresh ``symbol`` under a shared per-symbol lease; returns the row.
+
+    Only the lease holder calls upstream, whichever worker or node it is.
+    Other workers wait for the lease to be released and read the row it
+    wrote, retrying the lease if the holder gave up. A row fetched within
+    the last REFRESH_LEASE_TTL seconds counts as just refreshed. If no
+    lease comes our way within REFRESH_LEASE_TTL, the stale row is served,
+    or ``RefreshBusy`` is raised when there is none.
+    """
+    shared = get_shared_cache()
+    key = f"refresh:{symbol}"
+    recent = timedelta(seconds=REFRESH_LEASE_TTL)
+    deadline = time.monotonic() + REFRESH_LEASE_TTL
+    while True:
+        token = shared.acquire(key, REFRESH_LEASE_TTL)
+        if token is not None:
+            try:
+                row = _fresh(_read_basic(symbol), recent)
+                return row if row is not None else _upsert_from_upstream(symbol, provider)
+            finally:
+                shared.release(key, token)
+        shared.wait(key, max(0.0, deadline - time.monotonic()))
+        row = _read_basic(symbol)
+        fresh = _fresh(row, recent)
+        if fresh is not None:
+            return fresh
+        if time.monotonic() >= deadline:
+            if row is None:
+                raise RefreshBusy(symbol)
+            row.pop("last_fetched_at")
+            return row
+
+
+def _upsert_from_upstream(symbol, provider=None):
+    """Pull ``info`` from the upstream provider and upsert it; returns the row."""
+    info = (provider or get_provider()).info(symbol)
+    with get_conn() as conn, conn.cursor() as cur:
+        rows, changed = upsert_many(cur, {symbol: info})
+        row = rows[symbol]
+        row.pop("id")
+        if changed:
+            notify_quotes(cur, [row])
+    if changed:
+        response_cache.invalidate(symbol)
+    return row
+
+
+def _log_refresh_error(symbol):
+    def callback(fut):
+        exc = fut.exception()
+        if exc is not None:
+            log.warning("background refresh of %s failed: %s", symbol, exc)
+    return callback
+
+
+def refresh_ticker(symbol, wait=True, provider=None):
+    """Refresh ``symbol`` from upstream, sharing any in-flight refresh.
+
+    With ``wait=False`` the refresh runs on the background pool and the
+    shared Future is returned immediately.
+    """
+    if wait:
+        return _refreshes.do(symbol, _refresh_ticker, symbol, provider)
+    fut = _refreshes.submit(symbol, _refresh_ticker, symbol, provider)
+    fut.add_done_callback(_log_refresh_error(symbol))
+    return fut
+
+
+def fetch_basic(symbol):
+    """Fetch the basic fields, refreshing from yfinance if stale.
+
+    In stale-while-revalidate mode an expired row is served as-is while a
+    background refresh is scheduled; only a missing row blocks the caller.
+    """
+    record_access(symbol)
+    row = _read_basic(symbol)
+    cache_result("ticker_row", row is not None and not is_stale(row))
+
+    if row is None or (is_stale(row) and not STALE_WHILE_REVALIDATE):
+        return refresh_ticker(symbol)
 
-        # 2) We'll use a single timezone-aware now
-        now_utc = datetime.now(timezone.utc)
-
-        # 3) Determine if we need to refresh from yfinance
-        needs_refresh = (
-            row is None                              or
-            row["last_fetched_at"] is None           or
-            row["last_fetched_at"] < (now_utc - CACHE_TTL)
-        )
-
-        if needs_refresh:
-            # 2) Fetch fresh data
-            info = yf.Ticker(symbol).info
-
-            # Upsert into the DB
-            cur.execute("""
-              INSERT INTO public.tickers
-                (symbol, name, exchange, current_price,
-                 sector, market_cap, raw_info,
-                 created_at, updated_at, last_fetched_at)
-              VALUES (%s,%s,%s,%s,%s,%s,%s, now(),now(),now())
-              ON CONFLICT (symbol) DO UPDATE SET
-                name            = EXCLUDED.name,
-                exchange        = EXCLUDED.exchange,
-                current_price   = EXCLUDED.current_price,
-                sector          = EXCLUDED.sector,
-                market_cap      = EXCLUDED.market_cap,
-                raw_info        = EXCLUDED.raw_info,
-                updated_at      = now(),
-                last_fetched_at = now()
-              RETURNING
-                symbol, name, exchange, current_price,
-                sector, market_cap
-            """, [
-              symbol,
-              info.get("longName")         or symbol,
-              info.get("exchange")         or None,
-              info.get("regularMarketPrice") or None,
-              info.get("sector")           or None,
-              info.get("marketCap")        or None,
-              Json(info)
-            ])
-            row = cur.fetchone()
-            conn.commit()
-
-        return dict(row)
+    if is_stale(row):
+        refresh_ticker(symbol, wait=False)
+    row.pop("last_fetched_at")
+    return row
+
+def refresh_quotes(symbols, provider=None):
+    """Refresh price fields for many existing rows from one bulk download.
+
+    Fundamentals are left alone; returns ``{symbol: row}`` for updated rows.
+    A row never fully fetched keeps ``last_fetched_at`` NULL, so the next
+    single-symbol read still pulls its fundamentals.
+    """
+    quotes = (provider or get_provider()).quotes(symbols)
+    if not quotes:
+        return {}
+    with get_conn() as conn, conn.cursor() as cur:
+        rows = execute_values(cur, f"""
+            UPDATE public.tickers AS t SET
+              current_price   = v.current_price,
+              previous_close  = COALESCE(v.previous_close, t.previous_close),
+              open_price      = v.open_price,
+              day_high        = v.day_high,
+              day_low         = v.day_low,
+              volume          = v.volume,
+              updated_at      = now(),
+              last_fetched_at = CASE WHEN t.last_fetched_at IS NULL THEN NULL ELSE now() END
+            FROM (VALUES %s) AS v(symbol, current_price, previous_close,
+                                  open_price, day_high, day_low, volume)
+            WHERE t.symbol = v.symbol
+            RETURNING {", ".join("t." + c.strip() for c in BASIC_COLUMNS.split(","))}
+        """, [
+            (sym, q["current_price"], q["previous_close"], q["open_price"],
+             q["day_high"], q["day_low"], q["volume"])
+            for sym, q in quotes.items()
+        ], template="(%s, %s::float8, %s::float8, %s::float8, %s::float8, %s::float8, %s::bigint)",
+           fetch=True)
+        notify_quotes(cur, rows)
+    response_cache.invalidate(*(r["symbol"] for r in rows))
+    return {r["symbol"]: dict(r) for r in rows}
+
+
+def _refresh_quotes_logged(symbols):
+    try:
+        return refresh_quotes(symbols)
+    except Exception as exc:
+        log.warning("bulk quote refresh of %d symbols failed: %s", len(symbols), exc)
+        raise
+
+
+def fetch_basic_many(symbols):
+    """Batched ``fetch_basic``: one query for every symbol.
+
+    Symbols in neither ``tickers`` nor ``master_tickers`` map to ``None``.
+    Listed symbols without a row get a quote-only row (name and exchange
+    from the master listing); their fundamentals arrive with the first
+    single-symbol read. Every quote, new or stale, comes from one bulk
+    download, shared per symbol with overlapping batches. Stale quotes are
+    refreshed in the background when stale-while-revalidate is on; the
+    caller waits at most BATCH_REFRESH_TIMEOUT seconds for the rest and
+    gets the stored row for whatever has not arrived by then.
+    """
+    columns = ", ".join("t." + c.strip() for c in BASIC_COLUMNS.split(","))
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT r.symbol AS requested, {columns},
+                   m.symbol IS NOT NULL AS listed,
+                   COALESCE(t.last_fetched_at,
+                            CASE WHEN t.current_price IS NOT NULL THEN t.updated_at END)
+                       AS last_fetched_at
+              FROM unnest(%s::text[]) AS r(symbol)
+              LEFT JOIN public.tickers        t ON t.symbol = r.symbol
+              LEFT JOIN public.master_tickers m ON m.symbol = r.symbol
+        """, (list(symbols),))
+        found = cur.fetchall()
+        rows = {r["requested"]: dict(r) for r in found if r["symbol"] is not None}
+        listed = [r["requested"] for r in found if r["symbol"] is None and r["listed"]]
+        if listed:
+            cur.execute(f"""
+                INSERT INTO public.tickers (symbol, name, exchange)
+                SELECT symbol, name, exchange
+                  FROM public.master_tickers
+                 WHERE symbol = ANY(%s)
+                -- a concurrent insert won: return its row instead
+                ON CONFLICT (symbol) DO UPDATE SET symbol = EXCLUDED.symbol
+                RETURNING {BASIC_COLUMNS}
+            """, (listed,))
+            rows.update((r["symbol"], {**r, "last_fetched_at": None}) for r in cur.fetchall())
+    for row in rows.values():
+        row.pop("requested", None)
+        row.pop("listed", None)
+
+    now_utc = datetime.now(timezone.utc)
+    unquoted = [s for s, r in rows.items() if r["last_fetched_at"] is None]
+    stale = [s for s, r in rows.items()
+             if r["last_fetched_at"] is not None and is_stale(r, now_utc)]
+    wanted = unquoted + ([] if STALE_WHILE_REVALIDATE else stale)
+    futures = _quotes.submit_many(unquoted + stale, _refresh_quotes_logged)
+    if wanted:
+        wait_futures([futures[s] for s in wanted], timeout=BATCH_REFRESH_TIMEOUT)
+        for s in wanted:
+            fut = futures[s]
+            if fut.done() and fut.exception() is None and fut.result() is not None:
+                rows[s] = fut.result()
+
+    out = {}
+    for s in symbols:
+        row = rows.get(s)
+        if row is not None:
+            record_access(s)
+            row.pop("last_fetched_at", None)
+        out[s] = row
+    return out
 
 @bp.route("", methods=["GET"])
 def list_tickers():
@@ -91,34 +321,149 @@ def list_tickers():
         return jsonify(cur.fetchall())
 
 def fetch_chart_data(symbol, days=30):
-    data = yf.download(symbol, period=f"{days}d", interval="1d")
-    # ensure we pull each column as a Series, then to Python list
+    """Daily OHLCV for the last ``days`` days from the price_bars store."""
+    return get_chart(symbol, period=f"{days}d", interval="1d")
+
+def encode_news_cursor(published_at, article_id):
+    raw = f"{published_at.isoformat()}|{article_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_news_cursor(cursor):
+    """Inverse of ``encode_news_cursor``; raises ValueError on garbage."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        published, article_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(published), int(article_id)
+    except Exception:
+        raise ValueError("invalid cursor") from None
+
+
+def fetch_news_page(symbol, limit=20, cursor=None):
+    """One page of stored articles for ``symbol``, newest first.
+
+    Keyset-paginated on (published_at, article_id) so every page is an
+    index range scan on news_ticker_published_idx. Undated articles have
+    no place in that order and are left out. Returns
+    ``(items, next_cursor, last_modified)``.
+    """
+    params = [symbol]
+    after = ""
+    if cursor:
+        published, article_id = decode_news_cursor(cursor)
+        after = "AND (n.published_at, n.article_id) < (%s, %s)"
+        params += [published, article_id]
+    params.append(limit + 1)
+    with get_conn() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT n.article_id, n.title, n.url, n.description,
+                   n.published_at, n.source,
+                   COALESCE(n.updated_at, n.crawl_date, n.published_at) AS modified_at
+              FROM public.news n
+              JOIN public.tickers t ON t.id = n.ticker_id
+             WHERE t.symbol = %s AND n.published_at IS NOT NULL {after}
+             ORDER BY n.published_at DESC, n.article_id DESC
+             LIMIT %s
+        """, params)
+        rows = [dict(r) for r in cur.fetchall()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_news_cursor(rows[-1]["published_at"], rows[-1]["article_id"])
+    modified = [r.pop("modified_at") for r in rows]
+    last_modified = max((m for m in modified if m is not None), default=None)
+    return rows, next_cursor, last_modified
+
+
+def _normalize_live_news(item):
+    """Map a yfinance news item (old or new layout) onto the stored shape."""
+    content = item.get("content") or {}
+    published = item.get("providerPublishTime")
     return {
-        "dates":   data.index.strftime("%Y-%m-%d").tolist(),
-        "opens":   data["Open"].values.tolist(),
-        "highs":   data["High"].values.tolist(),
-        "lows":    data["Low"].values.tolist(),
-        "closes":  data["Close"].values.tolist(),
-        "volumes": data["Volume"].values.tolist(),
+        "article_id":   None,
+        "title":        content.get("title") or item.get("title"),
+        "url":          ((content.get("canonicalUrl") or {}).get("url")
+                         or item.get("link")),
+        "description":  content.get("summary"),
+        "published_at": content.get("pubDate") or (
+            datetime.fromtimestamp(published, timezone.utc).isoformat()
+            if published else None),
+        "source":       ((content.get("provider") or {}).get("displayName")
+                         or item.get("publisher")),
     }
 
+
+def fetch_live_news(symbol, limit=20):
+    """Upstream fallback for symbols with nothing in public.news yet."""
+    return [_normalize_live_news(n) for n in get_provider().news(symbol)[:limit]]
+
+
 def fetch_news(symbol, limit=20):
-    """Fetch news for a ticker using yfinance."""
-    ticker = yf.Ticker(symbol)
-    news = ticker.news[:limit]
-    return news
+    """Latest stored news for a ticker, falling back to the upstream feed."""
+    items, _, _ = fetch_news_page(symbol, limit)
+    return items or fetch_live_news(symbol, limit)
+
+
+# daily history the indicators are computed over
+INDICATOR_PERIOD = "1y"
+
+# symbol -> (IndicatorState, (ts, close) of the bar before its newest),
+# advanced only by bars it has not seen yet; least recently used dropped
+# beyond INDICATOR_STATE_CACHE_SIZE
+_indicator_states = OrderedDict()
+_indicator_lock = threading.Lock()
+
 
 def compute_indicators(symbol):
-    """Compute technical indicators for a ticker."""
-    ticker = yf.Ticker(symbol)
-    # TODO: Implement technical indicators
+    """Compute technical indicators for a ticker from its daily bars.
+
+    The first call folds the stored history into an ``IndicatorState``;
+    later calls only revise the newest bar and push any bars added since.
+    If a bar before the newest one no longer matches what was folded in
+    (re-fetched or adjusted), the state is rebuilt from the stored bars.
+    """
+    ts, _, highs, lows, closes, volumes = get_bars(
+        symbol, period=INDICATOR_PERIOD, interval="1d")
+    values = {}
+    with _indicator_lock:
+        state, before = _indicator_states.pop(symbol, (None, None))
+        start = 0
+        if state is not None:
+            i = bisect_left(ts, state.last_ts)
+            seen = (ts[i - 1], closes[i - 1]) if 0 < i <= len(ts) else None
+            if i < len(ts) and ts[i] == state.last_ts and seen == before:
+                c = closes[i]
+                values = state.revise(ts[i], highs[i] or c, lows[i] or c, c, volumes[i] or 0)
+                start = i + 1
+            else:
+                state = None
+        if state is None and ts:
+            state = IndicatorState()
+        for j in range(start, len(ts)):
+            c = closes[j]
+            values = state.push(ts[j], highs[j] or c, lows[j] or c, c, volumes[j] or 0)
+        # an empty series (unknown or unhydrated symbol) leaves nothing behind
+        if ts:
+            before = (ts[-2], closes[-2]) if len(ts) > 1 else None
+            _indicator_states[symbol] = (state, before)
+            while len(_indicator_states) > INDICATOR_STATE_CACHE_SIZE:
+                _indicator_states.popitem(last=False)
+
     return {
-        "rsi": None,
+        "rsi":  None,
         "macd": None,
-        "piotroski_score": None
+        **values,
+        "piotroski_score": None,
+        "as_of": ts[-1].date().isoformat() if ts else None,
     }
 
 
+def compute_indicators_many(symbols):
+    """Latest indicators for many symbols in one vectorised pass."""
+    return compute_many(get_bars_many(symbols, period=INDICATOR_PERIOD, interval="1d"))
+
+
 @bp.route("/<symbol>/basic")
 def ticker_basic(symbol):
     return jsonify(fetch_basic(symbol))
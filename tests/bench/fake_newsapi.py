@@ -0,0 +1,80 @@
+"""Local stand-in for the NewsAPI ``/v2/everything`` endpoint.
+
+Articles are a pure function of the query symbol and a fixed epoch, so
+every run ingests the same rows. ``latency_ms`` delays each response the
+way the real API would; ``NEWSAPI_URL`` is pointed at ``server.url``.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+EPOCH = datetime(2025, 1, 2, 16, 0, tzinfo=timezone.utc)
+
+
+def articles(symbol, page_size, since=None):
+    out = []
+    for i in range(page_size):
+        published = EPOCH - timedelta(hours=6 * i)
+        if since is not None and published <= since:
+            break
+        out.append({
+            "source":      {"id": None, "name": ("Bench Wire", "Market Desk")[i % 2]},
+            "author":      "bench",
+            "title":       f"{symbol} headline {i}",
+            "description": f"Synthetic article {i} about {symbol}.",
+            "url":         f"https://news.invalid/{symbol}/{i}",
+            "publishedAt": published.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "content":     f"{symbol} " * 40,
+        })
+    return out
+
+
+class FakeNewsAPI:
+    def __init__(self, latency_ms=0, host="127.0.0.1"):
+        latency = latency_ms / 1000.0
+        self.requests = 0
+        lock = threading.Lock()
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    outer.requests += 1
+                if latency:
+                    time.sleep(latency)
+                params = parse_qs(urlparse(self.path).query)
+                symbol = params.get("q", [""])[0]
+                size = int(params.get("pageSize", ["20"])[0])
+                since = params.get("from", [None])[0]
+                since = datetime.fromisoformat(since) if since else None
+                if since is not None and since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+                arts = articles(symbol, size, since)
+                body = json.dumps({"status": "ok", "totalResults": len(arts),
+                                   "articles": arts}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_port}/v2/everything"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="fake-newsapi", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
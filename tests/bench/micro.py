@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""In-process micro-benchmarks of the hot paths behind the load mix.
+
+    DATABASE_URL=postgresql://localhost/finapp_bench MARKET_DATA_PROVIDER=fake \\
+        python tests/bench/micro.py --symbols AB,CDE,FGHI
+
+Expects the database ``run.py`` seeded. Each benchmark reports the median
+and best per-call time over ``--repeat`` rounds of ``--number`` calls:
+
+* ``fetch_basic``      – fresh-row read of ``services.ticker_service``
+* ``list_tickers``     – ``GET /tickers?search=`` through Flask's test client
+* ``get_chart``        – 1y of daily bars from ``price_bars`` into the payload
+* ``chart_serialize``  – ``jsonify`` of that payload to response bytes
+* ``chart_binary``     – the same bars as packed binary columns
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src", "backend"))
+
+from flask import Flask, jsonify  # noqa: E402
+
+from routes import tickers  # noqa: E402
+from services import autocomplete, chart_codec  # noqa: E402
+from services.price_history import get_bar_arrays, get_chart  # noqa: E402
+from services.ticker_service import fetch_basic  # noqa: E402
+
+
+def measure(fn, number, repeat):
+    """Per-call seconds of each round; one untimed round warms caches first."""
+    for _ in range(number):
+        fn()
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - started) / number)
+    return {
+        "median_us": round(1e6 * statistics.median(rounds), 1),
+        "best_us":   round(1e6 * min(rounds), 1),
+        "calls":     number * repeat,
+    }
+
+
+def run(symbols, number=200, repeat=5):
+    app = Flask(__name__)
+    app.register_blueprint(tickers.bp)
+    client = app.test_client()
+    autocomplete.get_index()    # built once per process, like a warm worker
+
+    basic = itertools.cycle(symbols)
+    prefixes = itertools.cycle([s[:i] for s in symbols for i in range(1, len(s) + 1)])
+    charts = itertools.cycle(symbols)
+    payload = get_chart(symbols[0], "1y", "1d")
+    bars = get_bar_arrays(symbols[0], "1y", "1d")
+
+    def serialize():
+        with app.app_context():
+            jsonify(payload).get_data()
+
+    return {
+        "fetch_basic":     measure(lambda: fetch_basic(next(basic)), number, repeat),
+        "list_tickers":    measure(lambda: client.get(f"/tickers?search={next(prefixes)}"),
+                                   number, repeat),
+        "get_chart":       measure(lambda: get_chart(next(charts), "1y", "1d"), number, repeat),
+        "chart_serialize": measure(serialize, number, repeat),
+        "chart_binary":    measure(lambda: chart_codec.to_binary(bars), number, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", required=True, help="comma-separated hydrated symbols")
+    parser.add_argument("--number", type=int, default=200, help="calls per round")
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds")
+    parser.add_argument("--json", action="store_true", help="print one JSON object")
+    args = parser.parse_args()
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+    results = run(symbols, args.number, args.repeat)
+    if args.json:
+        print(json.dumps(results))
+        return
+    for name, r in results.items():
+        print(f"{name:16} median {r['median_us']:>10} µs   best {r['best_us']:>10} µs")
+
+
+if __name__ == "__main__":
+    main()
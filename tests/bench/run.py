@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Reproducible load test + micro-benchmarks, compared against a baseline.
+
+    createdb finapp_bench    # then create the schema and run `alembic upgrade head` on it
+    python tests/bench/run.py --db postgresql://localhost/finapp_bench
+
+One run:
+
+1. seeds a synthetic, seed-determined listing into ``master_tickers``,
+   hydrates a subset through the ``fake`` market-data provider, backfills a
+   year of daily bars and ingests news from a local fake NewsAPI
+   (``--skip-seed`` reuses what is there)
+2. boots the app (gunicorn or the werkzeug dev server) against that
+   database, with ``FAKE_PROVIDER_LATENCY_MS`` standing in for yfinance
+3. registers a user, builds a watchlist and drives the ``workload.MIX`` of
+   autocomplete keystrokes, watchlist overviews, ticker detail and charts
+   from ``-c`` closed-loop clients, after an untimed warm-up
+4. runs ``micro.py`` against the same database
+5. writes the results to ``--output`` and compares them with the entry for
+   the same options in ``--baseline``: p95 latency up, or throughput down,
+   by more than ``--tolerance`` fails the run (exit 1). A missing entry is
+   recorded; ``--update-baseline`` overwrites it.
+
+The seeding writes to ``master_tickers``, ``tickers``, ``price_bars`` and
+``news``: point ``--db`` at a scratch database, never a shared one.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from fake_newsapi import FakeNewsAPI
+from workload import SEED, Mix, drive, universe
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..", "..")
+BACKEND = os.path.join(ROOT, "src", "backend")
+SCRIPTS = os.path.join(ROOT, "scripts")
+
+BENCH_EMAIL = "bench@bench.invalid"
+BENCH_PASSWORD = "bench-password"
+WATCHLIST_SIZE = 50
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def script(env, name, *args):
+    print(f"   $ {name} {' '.join(a if len(a) < 60 else a[:57] + '...' for a in args)}")
+    subprocess.run([sys.executable, os.path.join(SCRIPTS, name), *args],
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def seed(env, listing, hydrated, workdir):
+    path = os.path.join(workdir, "listing.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Symbol", "Name", "Exchange"])
+        writer.writerows((symbol, name, "BENCH") for symbol, name in listing)
+    symbols = ",".join(hydrated)
+    script(env, "ingest_master_nasdaq.py", "--csv", path, "--exchange", "BENCH")
+    script(env, "ingest_tickers.py", "--symbols", symbols, "--workers", "8")
+    script(env, "seed_price_history.py", "--symbols", symbols, "--period", "1y", "--interval", "1d")
+    script(env, "ingest_news.py", "--symbols", symbols)
+
+
+def start_server(kind, env, port, workers, log):
+    if kind == "gunicorn":
+        env = {**env, "BIND": f"127.0.0.1:{port}", "WEB_CONCURRENCY": str(workers)}
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:app"]
+    else:
+        cmd = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port),
+               "--no-reload", "--no-debugger", "--with-threads"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{kind} exited with {proc.returncode}; see {log.name}")
+        try:
+            if requests.get(url + "/health/db", timeout=2).status_code == 200:
+                return proc, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"{kind} did not come up within 60s; see {log.name}")
+
+
+def prepare_user(url, symbols):
+    """Access token and the id of a watchlist holding ``symbols``."""
+    r = requests.post(url + "/auth/register", timeout=30,
+                      json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    if r.status_code not in (201, 409):
+        r.raise_for_status()
+    r = requests.post(url + "/auth/login", timeout=30,
+                      json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    r = requests.post(url + "/watchlists", json={"name": f"bench {int(time.time())}"},
+                      headers=headers, timeout=30)
+    r.raise_for_status()
+    watchlist_id = r.json()["id"]
+    r = requests.post(f"{url}/watchlists/{watchlist_id}/tickers/bulk",
+                      json={"symbols": symbols}, headers=headers, timeout=30)
+    r.raise_for_status()
+    if r.status_code == 202:
+        status_url = url + r.json()["status_url"]
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            job = requests.get(status_url, headers=headers, timeout=30).json()
+            if job.get("state") in ("finished", "error"):
+                break
+            time.sleep(0.5)
+    return headers, watchlist_id
+
+
+def run_micro(env, symbols):
+    env = {**env, "FAKE_PROVIDER_LATENCY_MS": "0"}
+    out = subprocess.run([sys.executable, os.path.join(HERE, "micro.py"),
+                          "--symbols", ",".join(symbols[:20]), "--json"],
+                         env=env, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def profile_key(args):
+    """Runs are only compared with runs of the same workload and machine."""
+    return (f"{platform.node()}|{args.server}x{args.workers}|c{args.concurrency}"
+            f"|d{args.duration:g}|lat{args.latency_ms:g}|u{args.universe}|t{args.tickers}")
+
+
+def compare(current, baseline, tolerance):
+    """Regression messages; empty when ``current`` is within ``tolerance``."""
+    problems = []
+    for name, now in current.get("load", {}).items():
+        then = baseline.get("load", {}).get(name)
+        if not then:
+            continue
+        if then["p95_ms"] and now["p95_ms"] > then["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {then['p95_ms']} -> {now['p95_ms']} ms")
+        if then["rps"] and now["rps"] < then["rps"] * (1 - tolerance):
+            problems.append(f"{name}: throughput {then['rps']} -> {now['rps']} req/s")
+        if now["errors"] > then["errors"]:
+            problems.append(f"{name}: errors {then['errors']} -> {now['errors']}")
+    for name, now in current.get("micro", {}).items():
+        then = baseline.get("micro", {}).get(name)
+        if then and now["median_us"] > then["median_us"] * (1 + tolerance):
+            problems.append(f"{name}: median {then['median_us']} -> {now['median_us']} µs")
+    return problems
+
+
+def print_table(load):
+    cols = ["scenario", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"]
+    rows = [{"scenario": name, **r} for name, r in load.items()]
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.ljust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(widths[c]) for c in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=os.getenv("BENCH_DATABASE_URL"),
+                        help="scratch, migrated database (default: $BENCH_DATABASE_URL)")
+    parser.add_argument("--server", choices=("gunicorn", "werkzeug"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("-d", "--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured seconds first")
+    parser.add_argument("--latency-ms", type=float, default=150.0,
+                        help="fake yfinance and NewsAPI latency per call")
+    parser.add_argument("--universe", type=int, default=5000, help="listings in master_tickers")
+    parser.add_argument("--tickers", type=int, default=200, help="listings hydrated into tickers")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--baseline", default=os.path.join(HERE, "baseline.json"))
+    parser.add_argument("--output", default=os.path.join(HERE, "last_run.json"))
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative regression (0.15 = 15%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    if not args.db:
+        parser.error("--db or BENCH_DATABASE_URL is required")
+
+    listing = universe(args.universe)
+    hydrated = [symbol for symbol, _ in listing[::max(1, len(listing) // args.tickers)]]
+    hydrated = hydrated[:args.tickers]
+
+    news = FakeNewsAPI(latency_ms=args.latency_ms).start()
+    env = {
+        **os.environ,
+        "DATABASE_URL":             args.db,
+        "MARKET_DATA_PROVIDER":     "fake",
+        "FAKE_PROVIDER_LATENCY_MS": str(args.latency_ms),
+        "NEWSAPI_URL":              news.url,
+        "NEWSAPI_KEY":              "bench",
+        "NEWSAPI_RATE":             "1000",
+        "NEWSAPI_BURST":            "1000",
+        "REFRESHER_IN_PROCESS":     "0",
+        "JWT_SECRET_KEY":           os.getenv("JWT_SECRET_KEY") or "bench-secret",
+        "ACCESS_TOKEN_MINUTES":     "600",
+        "PYTHONHASHSEED":           str(SEED),
+    }
+    workdir = tempfile.mkdtemp(prefix="finapp-bench-")
+    try:
+        if not args.skip_seed:
+            print(f"🌱 seeding {len(listing)} listings, {len(hydrated)} hydrated …")
+            seed(env, listing, hydrated, workdir)
+
+        log = open(os.path.join(workdir, "server.log"), "w")
+        print(f"🚀 starting {args.server} (log: {log.name}) …")
+        proc, url = start_server(args.server, env, free_port(), args.workers, log)
+        try:
+            headers, watchlist_id = prepare_user(url, hydrated[:WATCHLIST_SIZE])
+            mix = Mix(listing, hydrated, watchlist_id)
+            if args.warmup:
+                print(f"🔥 warm-up {args.warmup:g}s …")
+                drive(url, mix, args.concurrency, args.warmup, headers, seed=SEED + 1)
+            print(f"⏱  {args.concurrency} clients for {args.duration:g}s …")
+            load = drive(url, mix, args.concurrency, args.duration, headers)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+            log.close()
+    finally:
+        news.stop()
+
+    print_table(load)
+    micro = {}
+    if not args.skip_micro:
+        print("🔬 micro-benchmarks …")
+        micro = run_micro(env, hydrated)
+        for name, r in micro.items():
+            print(f"   {name:16} median {r['median_us']} µs  best {r['best_us']} µs")
+
+    key = profile_key(args)
+    current = {"profile": key, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "python": platform.python_version(), "load": load, "micro": micro}
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    previous = baselines.get(key)
+    if previous is None or args.update_baseline:
+        baselines[key] = current
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"📌 baseline for {key} {'updated' if previous else 'recorded'} in {args.baseline}")
+        return
+
+    problems = compare(current, previous, args.tolerance)
+    if problems:
+        print(f"❌ regressions vs. baseline of {previous['recorded_at']}:")
+        for p in problems:
+            print(f"   {p}")
+        sys.exit(1)
+    print(f"✅ within {args.tolerance:.0%} of the baseline of {previous['recorded_at']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Synthetic symbol universe and the weighted request mix of the load run.
+
+Everything is derived from ``seed``: the listing, which symbols get
+hydrated, and each client's sequence of scenarios, so two runs with the
+same options issue the same requests in the same per-client order.
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+from load_test import percentile  # noqa: E402
+
+SEED = 20250102
+
+_WORDS = ("Apex", "Blue", "Cedar", "Delta", "Ember", "Falcon", "Granite", "Harbor",
+          "Iron", "Juniper", "Keystone", "Lumen", "Meridian", "North", "Orchid",
+          "Pioneer", "Quartz", "River", "Summit", "Titan", "Union", "Vertex",
+          "Willow", "Zenith")
+_NOUNS = ("Bio", "Energy", "Systems", "Capital", "Foods", "Networks", "Motors",
+          "Health", "Labs", "Minerals", "Logistics", "Software", "Semiconductor")
+_SUFFIXES = ("Inc.", "Corp.", "Holdings", "Group", "Ltd.", "Trust")
+
+# scenario -> share of client iterations
+MIX = {
+    "autocomplete": 0.40,
+    "watchlist":    0.25,
+    "detail":       0.20,
+    "chart":        0.15,
+}
+
+
+def universe(size, seed=SEED):
+    """``[(symbol, name)]`` of ``size`` distinct synthetic listings, sorted."""
+    rng = random.Random(seed)
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    seen = {}
+    while len(seen) < size:
+        symbol = "".join(rng.choice(letters) for _ in range(rng.choice((2, 3, 3, 4, 4, 4))))
+        if symbol not in seen:
+            seen[symbol] = f"{rng.choice(_WORDS)} {rng.choice(_NOUNS)} {rng.choice(_SUFFIXES)}"
+    return sorted(seen.items())
+
+
+class Mix:
+    """Turns one client's random stream into request paths."""
+
+    def __init__(self, listing, hydrated, watchlist_id, mix=MIX):
+        self.listing = listing
+        self.hydrated = hydrated
+        self.watchlist_id = watchlist_id
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+
+    def next(self, rng):
+        """``(scenario, [path, ...])``; the paths run back to back."""
+        scenario = rng.choices(self.names, self.weights)[0]
+        if scenario == "autocomplete":
+            # one request per keystroke of a symbol or a name word
+            symbol, name = rng.choice(self.listing)
+            term = symbol if rng.random() < 0.6 else rng.choice(name.split()[:2])
+            return scenario, [f"/tickers?search={term[:i]}" for i in range(1, len(term) + 1)]
+        if scenario == "watchlist":
+            return scenario, [f"/watchlists/{self.watchlist_id}/tickers/overview"]
+        symbol = rng.choice(self.hydrated)
+        if scenario == "detail":
+            return scenario, [f"/tickers/{symbol}"]
+        return scenario, [f"/tickers/{symbol}/chart?period=1y&interval=1d"]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors":   errors,
+        "rps":      round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms":   round(1000 * percentile(latencies, 0.50), 2),
+        "p95_ms":   round(1000 * percentile(latencies, 0.95), 2),
+        "p99_ms":   round(1000 * percentile(latencies, 0.99), 2),
+    }
+
+
+def drive(base_url, mix, concurrency, duration, headers, seed=SEED):
+    """Closed loop: ``concurrency`` clients run scenarios for ``duration`` s.
+
+    Returns ``{scenario: summary}`` plus an ``"all"`` entry. A status of
+    400 or above, or a transport error, counts as an error.
+    """
+    samples = {name: [] for name in mix.names}
+    errors = dict.fromkeys(mix.names, 0)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(i):
+        rng = random.Random(seed * 1000 + i)
+        session = requests.Session()
+        session.headers.update(headers)
+        local = {name: [] for name in mix.names}
+        failed = dict.fromkeys(mix.names, 0)
+        while time.monotonic() < deadline:
+            scenario, paths = mix.next(rng)
+            for path in paths:
+                started = time.perf_counter()
+                try:
+                    ok = session.get(base_url + path, timeout=30).status_code < 400
+                except requests.RequestException:
+                    ok = False
+                local[scenario].append(time.perf_counter() - started)
+                failed[scenario] += not ok
+        with lock:
+            for name in mix.names:
+                samples[name].extend(local[name])
+                errors[name] += failed[name]
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True)
+               for i in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    out = {name: summarize(samples[name], errors[name], elapsed) for name in mix.names}
+    out["all"] = summarize([x for name in mix.names for x in samples[name]],
+                           sum(errors.values()), elapsed)
+    return out
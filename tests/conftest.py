@@ -0,0 +1,5 @@
+"""Unit tests import the backend the way the app does: from ``src/backend``."""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "backend"))
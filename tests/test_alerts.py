@@ -0,0 +1,186 @@
+"""ThresholdIndex crossings and Outbox retry/backoff, without a database."""
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+from services.alert_channels import DeliveryError, Message, Outbox, StubSink
+from services.alerts import AlertEngine, ThresholdIndex
+from services.pricefeed import quote_of
+
+
+def _brute_force(rules, prev, new):
+    fired = []
+    for threshold, rule_id, upward in rules:
+        if upward and prev < threshold <= new:
+            fired.append(rule_id)
+        elif not upward and new <= threshold < prev:
+            fired.append(rule_id)
+    return sorted(fired)
+
+
+def test_crossings_match_brute_force():
+    rng = random.Random(3)
+    rules = [(rng.choice([rng.uniform(90, 110), 100.0]), i, rng.random() < 0.5)
+             for i in range(300)]
+    index = ThresholdIndex()
+    for rule in rules:
+        index.add(*rule)
+    assert len(index) == len(rules)
+    for _ in range(500):
+        prev, new = rng.uniform(85, 115), rng.choice([rng.uniform(85, 115), 100.0])
+        assert sorted(index.crossed(prev, new)) == _brute_force(rules, prev, new)
+
+
+def test_crossing_edges():
+    index = ThresholdIndex()
+    index.add(100.0, "up", True)
+    index.add(100.0, "down", False)
+    assert index.crossed(99.0, 100.0) == ["up"]        # reaching it fires upward
+    assert index.crossed(100.0, 101.0) == []           # starting on it does not
+    assert index.crossed(101.0, 100.0) == ["down"]
+    assert index.crossed(100.0, 99.0) == []
+    assert index.crossed(100.0, 100.0) == []
+
+
+def test_remove_only_drops_that_rule():
+    index = ThresholdIndex()
+    for rule_id in ("a", "b", "c"):
+        index.add(100.0, rule_id, True)
+    index.remove(100.0, "b", True)
+    index.remove(100.0, "b", False)     # other side: no-op
+    index.remove(50.0, "a", True)       # other threshold: no-op
+    assert len(index) == 2
+    assert index.crossed(99.0, 101.0) == ["a", "c"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _message(text="hi", target="t"):
+    return Message("stub", target, text, 1)
+
+
+def test_outbox_retries_with_exponential_backoff():
+    clock, sink = Clock(), StubSink(fail=2)
+    outbox = Outbox([sink], batch_size=10, max_attempts=5, backoff=2.0, clock=clock)
+    outbox.put(_message())
+
+    assert outbox.flush() == 0                  # attempt 1 fails: retry in 2s
+    clock.now = 1.9
+    assert outbox.flush() == 0 and sink.fail == 1
+    clock.now = 2.0
+    assert outbox.flush() == 0                  # attempt 2 fails: retry in 4s
+    clock.now = 5.9
+    assert outbox.flush() == 0 and outbox.pending() == 1
+    clock.now = 6.0
+    assert outbox.flush() == 1
+    assert sink.sent == [("t", ["hi"])]
+    assert outbox.stats() == {"queued": 1, "sent": 1, "retried": 2, "dropped": 0,
+                              "batches": 3, "pending": 0}
+
+
+def test_outbox_drops_after_max_attempts():
+    clock, sink = Clock(), StubSink(fail=10)
+    outbox = Outbox([sink], batch_size=10, max_attempts=3, backoff=1.0, clock=clock)
+    outbox.put(_message())
+    for _ in range(5):
+        outbox.flush()
+        clock.now += 10
+    assert sink.sent == [] and outbox.pending() == 0
+    assert outbox.counts["retried"] == 2 and outbox.counts["dropped"] == 1
+
+
+def test_outbox_honours_retry_after_and_non_retryable():
+    class Channel:
+        name = "stub"
+
+        def __init__(self, errors):
+            self.errors = errors
+
+        def send(self, target, texts):
+            raise self.errors.pop(0)
+
+    clock = Clock()
+    outbox = Outbox([Channel([DeliveryError("429", retry_after=30.0),
+                              DeliveryError("bad webhook", retryable=False)])],
+                    max_attempts=5, backoff=2.0, clock=clock)
+    outbox.put(_message())
+    outbox.flush()
+    clock.now = 29.0
+    outbox.flush()
+    assert outbox.counts["batches"] == 1        # still waiting out Retry-After
+    clock.now = 30.0
+    outbox.flush()
+    assert outbox.counts["dropped"] == 1 and outbox.pending() == 0
+
+
+def test_outbox_counts_partial_delivery():
+    class Partial:
+        name = "stub"
+
+        def __init__(self):
+            self.calls = []
+
+        def send(self, target, texts):
+            self.calls.append(list(texts))
+            if len(self.calls) == 1:
+                raise DeliveryError("second chunk failed", delivered=1)
+
+    clock, channel = Clock(), Partial()
+    outbox = Outbox([channel], batch_size=10, backoff=1.0, clock=clock)
+    outbox.put(_message("a"))
+    outbox.put(_message("b"))
+    assert outbox.flush() == 1
+    clock.now = 1.0
+    assert outbox.flush() == 1
+    assert channel.calls == [["a", "b"], ["b"]]
+
+
+def test_outbox_batches_by_channel_and_target():
+    sink = StubSink()
+    outbox = Outbox([sink], batch_size=10, clock=Clock())
+    for target, text in (("x", "1"), ("y", "2"), ("x", "3")):
+        outbox.put(_message(text, target))
+    outbox.put(Message("discord", "z", "4", 2))    # not configured here
+    assert outbox.flush() == 3
+    assert sorted(sink.sent) == [("x", ["1", "3"]), ("y", ["2"])]
+    assert outbox.counts["dropped"] == 1
+
+
+def _quote(price):
+    return quote_of({"current_price": price, "previous_close": 100.0,
+                     "day_high": price, "day_low": price, "volume": 1000})
+
+
+def test_rsi_history_loads_off_the_evaluation_lock():
+    release = threading.Event()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    closes = [100.0 + (i % 2) for i in range(40)]
+
+    def history(symbol):
+        assert release.wait(5)
+        ts = [start + timedelta(days=i) for i in range(len(closes))]
+        return ts, closes, closes, closes, closes, [1000] * len(closes)
+
+    outbox = Outbox([StubSink()], clock=Clock())
+    engine = AlertEngine(outbox, cooldown=0, history=history, clock=Clock())
+    engine.add({"id": 1, "symbol": "AAA", "kind": "rsi_above", "threshold": 80.0,
+                "channel": "stub", "target": "t"})
+    engine.add({"id": 2, "symbol": "AAA", "kind": "price_above", "threshold": 105.0,
+                "channel": "stub", "target": "t"})
+
+    # the history load is blocked: price rules still evaluate, RSI is skipped
+    engine.evaluate({"AAA": _quote(100.0)}, fire=False)
+    assert [r["id"] for r, _ in engine.evaluate({"AAA": _quote(110.0)})] == [2]
+    engine.remove(3)    # rule edits don't wait on the load either
+
+    release.set()
+    engine._seeding["AAA"].result(5)
+    engine.evaluate({"AAA": _quote(100.0)}, fire=False)
+    hits = engine.evaluate({"AAA": _quote(150.0)})
+    assert 1 in [r["id"] for r, _ in hits]
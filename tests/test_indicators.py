@@ -0,0 +1,67 @@
+"""IndicatorState must agree with the vectorised ``compute_all``."""
+import math
+
+import numpy as np
+import pytest
+
+from services.indicators import IndicatorState, compute_all
+
+
+def _bars(n=120, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1.5, n))
+    high = close + rng.uniform(0, 2, n)
+    low = close - rng.uniform(0, 2, n)
+    volume = rng.integers(1_000, 50_000, n).astype(np.float64)
+    return high, low, close, volume
+
+
+def _assert_matches(streamed, batch, t):
+    for name, series in batch.items():
+        expected = series[t]
+        got = streamed.get(name)
+        if math.isnan(expected):
+            assert got is None, f"{name} at bar {t}: expected no value, got {got}"
+        else:
+            assert got == pytest.approx(expected, rel=1e-9, abs=1e-9), f"{name} at bar {t}"
+
+
+def test_push_matches_batch_at_every_bar():
+    high, low, close, volume = _bars()
+    batch = compute_all(high, low, close, volume)
+    state = IndicatorState()
+    for t in range(len(close)):
+        streamed = state.push(t, high[t], low[t], close[t], volume[t])
+        _assert_matches(streamed, batch, t)
+
+
+def test_revise_matches_batch_of_the_revised_series():
+    high, low, close, volume = _bars()
+    batch = compute_all(high, low, close, volume)
+    state = IndicatorState()
+    for t in range(len(close)):
+        # every bar arrives first as an intraday draft, then as its final value
+        state.push(t, high[t] + 1, low[t] - 1, close[t] + 0.5, volume[t] / 2)
+        state.revise(t, high[t], low[t], close[t] + 0.25, volume[t] * 0.75)
+        streamed = state.revise(t, high[t], low[t], close[t], volume[t])
+        assert state.bars == t + 1
+        _assert_matches(streamed, batch, t)
+
+
+def test_revise_once_windows_are_full():
+    # revising after the rolling windows evict their oldest value
+    high, low, close, volume = _bars(80)
+    state = IndicatorState()
+    for t in range(len(close) - 1):
+        state.push(t, high[t], low[t], close[t], volume[t])
+    t = len(close) - 1
+    state.push(t, high[t], low[t], close[t] * 1.1, volume[t])
+    streamed = state.revise(t, high[t], low[t], close[t], volume[t])
+    _assert_matches(streamed, compute_all(high, low, close, volume), t)
+
+
+def test_revise_without_a_push_is_a_push():
+    state = IndicatorState()
+    values = state.revise(0, 11.0, 9.0, 10.0, 100.0)
+    assert state.bars == 1
+    assert values["vwap"] == pytest.approx(10.0)
@@ -0,0 +1,71 @@
+"""Screener DSL: only whitelisted columns reach SQL; values stay parameters."""
+import pytest
+
+from services import screener
+from services.screener import compile_sql, encode_cursor, parse
+
+
+def test_numeric_and_categorical_filters():
+    screen = parse({"market_cap.gte": "1e10", "trailing_pe.lt": "25.5",
+                    "sector": "Technology, Healthcare,"})
+    assert screen.ranges == [("market_cap", "gte", 10_000_000_000), ("trailing_pe", "lt", 25.5)]
+    assert isinstance(screen.ranges[0][2], int)
+    assert screen.in_lists == {"sector": ["Technology", "Healthcare"]}
+    assert (screen.sort, screen.descending, screen.limit) == ("market_cap", True, 50)
+
+
+@pytest.mark.parametrize("args", [
+    {"name.gt": "1"},                       # not a numeric column
+    {"raw_info": "x"},                      # not a categorical column
+    {"sector.gt": "1"},                     # categorical columns take no operator
+    {"market_cap.like": "1"},               # unknown operator
+    {"market_cap; DROP TABLE tickers.gt": "1"},
+    {"sort": "name"},
+    {"sort": "-market_cap; DROP TABLE tickers"},
+    {"market_cap.gt": "big"},
+    {"market_cap.gt": "nan"},
+    {"market_cap.gt": "inf"},
+    {"limit": "ten"},
+    {"cursor": "not-a-cursor"},
+])
+def test_rejects_anything_off_the_whitelist(args):
+    with pytest.raises(ValueError):
+        parse(args)
+
+
+def test_cursor_must_match_the_sort_order():
+    cursor = encode_cursor("-market_cap", 5, "AAPL")
+    assert parse({"cursor": cursor}).after == (5, "AAPL")
+    with pytest.raises(ValueError):
+        parse({"sort": "trailing_pe", "cursor": cursor})
+
+
+def test_limit_is_clamped():
+    assert parse({"limit": "0"}).limit == 1
+    assert parse({"limit": "100000"}).limit == screener.MAX_LIMIT
+
+
+def test_ignores_control_keys():
+    screen = parse({"mode": "snapshot", "__debug": "1"})
+    assert screen.ranges == [] and screen.in_lists == {}
+
+
+def test_compile_sql_binds_every_value():
+    hostile = "x' OR '1'='1"
+    screen = parse({"sector": hostile, "beta.lte": "1.5", "sort": "-dividend_yield",
+                    "limit": "10", "cursor": encode_cursor("-dividend_yield", 0.03, "KO")})
+    sql, params = compile_sql(screen)
+    assert hostile not in sql
+    assert params == [1.5, [hostile], 0.03, "KO", 11]
+    assert sql.count("%s") == 5
+    assert "beta <= %s" in sql and "sector = ANY(%s)" in sql
+    assert "dividend_yield IS NOT NULL" in sql
+    assert "(dividend_yield, symbol) < (%s, %s)" in sql
+    assert "ORDER BY dividend_yield DESC, symbol DESC" in sql
+
+
+def test_compile_sql_symbol_sort_ascending():
+    screen = parse({"sort": "symbol", "cursor": encode_cursor("symbol", None, "MSFT")})
+    sql, params = compile_sql(screen)
+    assert "symbol > %s" in sql and "ORDER BY symbol ASC" in sql
+    assert params == ["MSFT", screener.DEFAULT_LIMIT + 1]